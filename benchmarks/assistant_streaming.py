@@ -0,0 +1,44 @@
+"""
+Benchmark das respostas do assistente: modo normal vs. streaming.
+
+Usa o servidor local de benchmarks/openai_stub.py e mede o tempo até o texto
+começar a aparecer na sala (primeiro patch), o tempo total e quantos patches
+foram enviados às sessões para a resposta inteira.
+
+    python benchmarks/assistant_streaming.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+os.environ.setdefault("OPENAI_API_KEY", "stub")
+
+from openai import OpenAI
+from openai_stub import REPLY, base_url, start_stub_server
+from assistants.assistants import Assistants
+from assistants.programador import Programador
+from chat.entities.message import Message
+
+
+def run(streaming: bool):
+    assistant = Assistants(nome="Programador", streaming=streaming)
+    message = Message(user_name="bench", text="@programador como faço um Card clicável?",
+                      message_type="chat_message", room_id="programador")
+    patches = []
+    start = time.perf_counter()
+    assistant.stream_message(message, lambda text, done: patches.append((time.perf_counter() - start, len(text))))
+    assert patches[-1][1] == len(REPLY), patches[-1]
+    return patches
+
+
+if __name__ == "__main__":
+    server = start_stub_server()
+    Programador.CLIENT = OpenAI(base_url=base_url(server), api_key="stub")
+    print(f"resposta: {len(REPLY.split())} tokens, patch a cada {Assistants.PATCH_INTERVAL * 1000:.0f} ms")
+
+    for streaming in (False, True):
+        patches = run(streaming)
+        print(f"{'streaming' if streaming else 'normal':>9}: primeiro texto {patches[0][0] * 1000:6.0f} ms, "
+              f"total {patches[-1][0] * 1000:6.0f} ms, {len(patches)} patches")
+    server.shutdown()
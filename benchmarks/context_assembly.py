@@ -0,0 +1,48 @@
+"""
+Benchmark da montagem do contexto do Programador (recuperação + orçamento de tokens).
+
+Com o embedder local de n-gramas e as perguntas de benchmarks/data/flet_queries.json,
+mede o tempo de cada etapa (busca e empacotamento), os tokens usados em relação ao
+orçamento, os chunks descartados por serem duplicados e quantas perguntas têm
+no contexto um chunk do tópico esperado.
+
+    python benchmarks/context_assembly.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import numpy as np
+from local_embeddings import is_hit, load_queries
+from assistants.knowledge.context import ContextBuilder
+from assistants.knowledge.corpus import load_corpus_documents
+from assistants.knowledge.index import KnowledgeIndex
+from assistants.knowledge.local_embeddings import HashingEmbeddings
+from assistants.knowledge.retriever import HybridRetriever
+
+
+if __name__ == "__main__":
+    documents = load_corpus_documents()
+    queries = load_queries()
+    builder = ContextBuilder(HybridRetriever(KnowledgeIndex.build(documents, HashingEmbeddings(), "bench")))
+
+    stages: dict[str, list[float]] = {"retrieve": [], "pack": []}
+    tokens, kept, hits = [], [], 0
+    for query in queries:
+        timings = {}
+        context = builder.build(query["query"], timings)
+        for stage in stages:
+            stages[stage].append(timings[stage] * 1000)
+        tokens.append(builder.count_tokens(context))
+        rows = builder.retriever.retrieve_rows(query["query"], builder.k)
+        selected = builder.select(rows)
+        kept.append(len(selected) / len(rows) if rows else 1.0)
+        hits += any(is_hit(documents[row], query["topics"]) for row in selected)
+
+    print(f"{len(queries)} perguntas, top-{builder.k}, orçamento de {builder.token_budget} tokens")
+    for stage, values in stages.items():
+        print(f"   {stage:>8}: p50 {np.percentile(values, 50):6.2f} ms   p95 {np.percentile(values, 95):6.2f} ms")
+    print(f"   tokens do contexto: média {np.mean(tokens):.0f}, máx. {max(tokens)}")
+    print(f"   chunks mantidos (sem duplicados, dentro do orçamento): {np.mean(kept):.0%}")
+    print(f"   perguntas com o tópico esperado no contexto: {hits / len(queries):.0%}")
@@ -0,0 +1,55 @@
+"""
+Benchmark da eliminação de quase-duplicados (MinHash/LSH) no corpus Flet.
+
+Compara o corpus com e sem deduplicação: número de chunks, texto e tokens
+enviados ao modelo de embeddings, tamanho do índice (vetores de 1536 dimensões,
+como o text-embedding-3-small), tempo da etapa, e o recall@5 e os resultados
+repetidos (quase-duplicados de outro resultado no top-5) da busca híbrida
+com o embedder local.
+
+    python benchmarks/corpus_dedup.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from local_embeddings import is_hit, load_queries
+from assistants.knowledge.chunker import token_counter
+from assistants.knowledge.corpus import load_corpus_documents
+from assistants.knowledge.dedup import MinHashDeduplicator
+from assistants.knowledge.index import KnowledgeIndex
+from assistants.knowledge.local_embeddings import HashingEmbeddings
+from assistants.knowledge.retriever import HybridRetriever
+
+K = 5
+DIM = 1536
+
+
+def report(name: str, documents, queries, count_tokens, deduplicator: MinHashDeduplicator):
+    retriever = HybridRetriever(KnowledgeIndex.build(documents, HashingEmbeddings(), "bench"))
+    hits, repeated = 0, 0
+    for query in queries:
+        found = retriever.retrieve(query["query"], K)
+        hits += any(is_hit(d, query["topics"]) for d in found)
+        repeated += sum(len(group) - 1 for group in deduplicator.groups([d.page_content for d in found]))
+    tokens = sum(count_tokens(d.page_content) for d in documents)
+    print(f"{name:>10}: {len(documents):5d} chunks, {tokens:7d} tokens para embeddings, "
+          f"índice {len(documents) * DIM * 4 / 1e6:5.1f} MB, recall@{K} {hits / len(queries):4.0%}, "
+          f"{repeated / len(queries):.2f} repetidos no top-{K}")
+
+
+if __name__ == "__main__":
+    documents = load_corpus_documents(dedup=False)
+    queries = load_queries()
+    count_tokens = token_counter()
+
+    deduplicator = MinHashDeduplicator()
+    start = time.perf_counter()
+    unique = deduplicator.deduplicate([d.model_copy(deep=True) for d in documents])
+    print(f"deduplicação de {len(documents)} chunks em {time.perf_counter() - start:.2f}s: "
+          f"{len(documents) - len(unique)} removidos ({1 - len(unique) / len(documents):.1%})\n")
+
+    report("original", documents, queries, count_tokens, deduplicator)
+    report("dedup", unique, queries, count_tokens, deduplicator)
@@ -0,0 +1,80 @@
+"""
+Benchmark do cliente de embeddings usado na construção do índice.
+
+Usa o servidor local de benchmarks/openai_stub.py (latência por pedido e por
+texto, 5% de respostas 429) e gera os embeddings dos chunks do corpus Flet:
+  - um texto por pedido, um pedido de cada vez (amostra de 200 chunks);
+  - lotes limitados por tokens com 1, 4 e 8 pedidos em paralelo.
+No fim interrompe uma construção no meio e a retoma a partir do checkpoint.
+
+    python benchmarks/embedding_throughput.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+os.environ.setdefault("OPENAI_API_KEY", "stub")
+
+from openai import OpenAI
+from openai_stub import OpenAIStubHandler, base_url, start_stub_server
+from assistants.knowledge.corpus import load_corpus_documents
+from assistants.knowledge.embeddings import EmbeddingClient
+
+
+class FlakyHandler(OpenAIStubHandler):
+    rate_limit_rate = 0.05
+
+
+class BrokenHandler(OpenAIStubHandler):
+    """Deixa de responder (erro 400, não transitório) a partir do 6.º pedido."""
+    def embeddings(self, body: dict):
+        if OpenAIStubHandler.requests >= 5:
+            self.send_json({"error": {"message": "interrupted", "type": "invalid_request_error"}}, 400)
+            return
+        super().embeddings(body)
+
+
+def make_client(server, **kwargs) -> EmbeddingClient:
+    client = OpenAI(base_url=base_url(server), api_key="stub", max_retries=0)
+    return EmbeddingClient(client=client, backoff=0.05, max_backoff=1, **kwargs)
+
+
+def run(server, texts: list[str], label: str, **kwargs):
+    embedding = make_client(server, **kwargs)
+    start = time.perf_counter()
+    vectors = embedding.embed_documents(texts)
+    elapsed = time.perf_counter() - start
+    assert len(vectors) == len(texts) and all(v is not None for v in vectors)
+    print(f"{label:>32}: {len(texts) / elapsed:8.0f} textos/s, {embedding.requests:5d} pedidos, {elapsed:6.2f} s")
+
+
+def resume(texts: list[str]):
+    checkpoint = os.path.join(tempfile.mkdtemp(), "embeddings.checkpoint")
+    OpenAIStubHandler.requests = 0
+    broken = start_stub_server(handler=BrokenHandler)
+    try:
+        make_client(broken, concurrency=1, checkpoint_path=checkpoint).embed_documents(texts)
+    except Exception as e:
+        print(f"construção interrompida: {type(e).__name__}")
+    broken.shutdown()
+
+    healthy = start_stub_server()
+    embedding = make_client(healthy, checkpoint_path=checkpoint)
+    embedding.embed_documents(texts)
+    print(f"retoma: {embedding.requests} pedidos para terminar, checkpoint removido: {not os.path.exists(checkpoint)}")
+    healthy.shutdown()
+
+
+if __name__ == "__main__":
+    texts = [d.page_content for d in load_corpus_documents()]
+    print(f"{len(texts)} chunks")
+    server = start_stub_server(handler=FlakyHandler)
+
+    run(server, texts[:200], "1 texto/pedido, sequencial (200)", max_batch_size=1, concurrency=1)
+    for concurrency in (1, 4, 8):
+        run(server, texts, f"lotes, {concurrency} em paralelo", concurrency=concurrency)
+    server.shutdown()
+
+    resume(texts)
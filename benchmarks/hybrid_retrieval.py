@@ -0,0 +1,77 @@
+"""
+Benchmark da busca híbrida (BM25 + vetores com RRF) no corpus Flet.
+
+Com o embedder local de n-gramas e as perguntas de benchmarks/data/flet_queries.json,
+compara o recall@5 de só vetores, só BM25 e híbrido. Depois repete as
+perguntas com um embedder que simula a latência da API (50 ms), para mostrar
+o ganho de executar as duas buscas em paralelo e de pular o embedding nas
+perguntas só com identificadores (ex.: ft.CupertinoSlidingSegmentedButton).
+O modo híbrido inclui o índice de controles (ft.<Nome> -> chunks).
+
+    python benchmarks/hybrid_retrieval.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from local_embeddings import is_hit, load_queries
+from assistants.knowledge.bm25 import BM25Index
+from assistants.knowledge.corpus import load_corpus_documents
+from assistants.knowledge.index import KnowledgeIndex
+from assistants.knowledge.local_embeddings import HashingEmbeddings
+from assistants.knowledge.retriever import HybridRetriever
+from assistants.knowledge.symbols import SymbolIndex
+
+K = 5
+API_LATENCY = 0.05
+
+
+class SlowEmbeddings(HashingEmbeddings):
+    """Vetores locais com a latência de um pedido à API."""
+    def embed_query(self, text: str) -> list[float]:
+        time.sleep(API_LATENCY)
+        return super().embed_query(text)
+
+
+def recall(retriever: HybridRetriever, queries: list[dict], mode: str) -> float:
+    hits = 0
+    for query in queries:
+        documents = retriever.retrieve(query["query"], K, mode=mode)
+        hits += any(is_hit(d, query["topics"]) for d in documents)
+    return hits / len(queries)
+
+
+def latency(retriever: HybridRetriever, queries: list[dict], mode: str) -> float:
+    start = time.perf_counter()
+    for query in queries:
+        retriever.retrieve(query["query"], K, mode=mode)
+    return (time.perf_counter() - start) / len(queries)
+
+
+if __name__ == "__main__":
+    documents = load_corpus_documents()
+    queries = load_queries()
+
+    start = time.perf_counter()
+    bm25 = BM25Index(documents)
+    print(f"BM25 de {len(documents)} chunks construído em {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    start = time.perf_counter()
+    symbols = SymbolIndex(documents)
+    named = [q for q in queries if symbols.mentions(q["query"])]
+    print(f"índice de {len(symbols)} controles construído em {(time.perf_counter() - start) * 1000:.0f} ms "
+          f"({len(named)} perguntas nomeiam um controle)")
+
+    retriever = HybridRetriever(KnowledgeIndex.build(documents, HashingEmbeddings(), "bench"), bm25, symbols)
+    for mode in (HybridRetriever.VECTOR, HybridRetriever.LEXICAL, HybridRetriever.HYBRID):
+        print(f"{mode:>8}: recall@{K} {recall(retriever, queries, mode):5.0%}")
+
+    slow = HybridRetriever(KnowledgeIndex(retriever.index.vectors, documents, {}, SlowEmbeddings()), bm25, symbols)
+    lexical = [q for q in queries if HybridRetriever.is_lexical_query(q["query"])]
+    print(f"\ncom {API_LATENCY * 1000:.0f} ms por embedding ({len(lexical)} perguntas só com identificadores):")
+    print(f"   vetores:  {latency(slow, queries, HybridRetriever.VECTOR) * 1000:6.1f} ms/pergunta")
+    print(f"   híbrido:  {latency(slow, queries, HybridRetriever.HYBRID) * 1000:6.1f} ms/pergunta")
+    if lexical:
+        print(f"   híbrido, só identificadores: {latency(slow, lexical, HybridRetriever.HYBRID) * 1000:6.1f} ms/pergunta")
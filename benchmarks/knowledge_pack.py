@@ -0,0 +1,85 @@
+"""
+Benchmark da inicialização com o pacote de conhecimento (documents.pack).
+
+Compara três formas de ter os documentos disponíveis em um processo novo:
+    corpus  ler e dividir os arquivos de data/knowledge (o que o build faz)
+    json    carregar todos os documentos de um JSON (o formato anterior do índice)
+    pack    abrir o documents.pack com mmap e ler só os chunks pedidos por id
+
+Cada modo roda em um subprocesso, para medir o tempo e a memória (RSS) de uma
+inicialização a frio, sem o que foi carregado pelos outros.
+
+    python benchmarks/knowledge_pack.py
+"""
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from langchain_core.documents import Document
+import orjson
+from assistants.knowledge.chunker import token_counter
+from assistants.knowledge.corpus import load_corpus_documents
+from assistants.knowledge.pack import KnowledgePack
+
+LOOKUPS = 5
+MODES = ("corpus", "json", "pack")
+
+
+def rss_mb() -> float:
+    """RSS atual (Linux); em outros sistemas, o pico de ru_maxrss (em bytes no macOS)."""
+    if os.path.exists("/proc/self/statm"):
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2 ** 20
+
+
+def run(mode: str, folder: str):
+    with open(os.path.join(folder, "ids.json"), encoding="utf-8") as f:
+        ids = json.load(f)
+    before = rss_mb()
+    start = time.perf_counter()
+    if mode == "corpus":
+        documents = {d.metadata["chunk_id"]: d for d in load_corpus_documents()}
+        found = [documents[i] for i in ids]
+    elif mode == "json":
+        with open(os.path.join(folder, "documents.json"), "rb") as f:
+            documents = {d["metadata"]["chunk_id"]: Document(page_content=d["page_content"], metadata=d["metadata"])
+                         for d in orjson.loads(f.read())}
+        found = [documents[i] for i in ids]
+    else:
+        pack = KnowledgePack(os.path.join(folder, "documents.pack"))
+        found = [pack.get_by_id(i) for i in ids]
+        assert all(pack.token_count(pack.row_of(i)) > 0 for i in ids)
+    elapsed = time.perf_counter() - start
+    assert len(found) == len(ids)
+    print(json.dumps({"seconds": elapsed, "rss_mb": rss_mb() - before}))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3:
+        run(sys.argv[1], sys.argv[2])
+        sys.exit()
+
+    documents = load_corpus_documents()
+    with tempfile.TemporaryDirectory() as folder:
+        start = time.perf_counter()
+        KnowledgePack.compile(documents, os.path.join(folder, "documents.pack"), "bench", token_counter())
+        print(f"pack de {len(documents)} chunks compilado em {time.perf_counter() - start:.2f}s "
+              f"({os.path.getsize(os.path.join(folder, 'documents.pack')) / 1e6:.1f} MB)")
+        with open(os.path.join(folder, "documents.json"), "wb") as f:
+            f.write(orjson.dumps([{"page_content": d.page_content, "metadata": d.metadata} for d in documents]))
+        with open(os.path.join(folder, "ids.json"), "w", encoding="utf-8") as f:
+            json.dump([d.metadata["chunk_id"] for d in random.Random(0).sample(documents, LOOKUPS)], f)
+
+        print(f"\ninicialização a frio + {LOOKUPS} documentos por id:")
+        for mode in MODES:
+            output = subprocess.run([sys.executable, __file__, mode, folder], capture_output=True, text=True, check=True)
+            result = json.loads(output.stdout.strip().splitlines()[-1])
+            print(f"   {mode:>6}: {result['seconds'] * 1000:8.1f} ms   +{result['rss_mb']:6.1f} MB RSS")
@@ -0,0 +1,87 @@
+"""
+Benchmark dos embeddings locais contra o embedder remoto.
+
+Constrói o índice do corpus Flet com cada embedder e mede, sobre o conjunto de
+perguntas gravado em benchmarks/data/flet_queries.json:
+  - recall@5: perguntas com pelo menos um chunk do tópico certo nos 5 primeiros;
+  - latência média de embed_query e tempo de construção do índice.
+
+O embedder remoto usa por padrão o servidor de benchmarks/openai_stub.py, que
+dá latências realistas mas vetores aleatórios (sem recall). Com --remote usa a
+API da OpenAI (OPENAI_API_KEY) e mede também o recall.
+
+    python benchmarks/local_embeddings.py [--remote]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+os.environ.setdefault("OPENAI_API_KEY", "stub")
+
+from openai import OpenAI
+from openai_stub import base_url, start_stub_server
+from assistants.knowledge.corpus import load_corpus_documents
+from assistants.knowledge.embeddings import EmbeddingClient
+from assistants.knowledge.index import KnowledgeIndex
+from assistants.knowledge.local_embeddings import HashingEmbeddings, TfidfSvdEmbeddings
+
+QUERIES = os.path.join(os.path.dirname(__file__), "data", "flet_queries.json")
+K = 5
+
+
+def source_topic(source: str) -> str:
+    """docs_controls_card para __generated_json/docs_controls_card.json, .../docs_controls_card_json.py, etc."""
+    name = os.path.splitext(os.path.basename(source))[0]
+    return name[:-len("_json")] if name.endswith("_json") else name
+
+
+def is_hit(document, topics: list[str]) -> bool:
+    """O chunk é de um dos tópicos esperados, ou é o canônico de um duplicado que o é."""
+    sources = document.metadata.get("sources") or [document.metadata["source"]]
+    return any(source_topic(source) in topics for source in sources)
+
+
+def load_queries() -> list[dict]:
+    with open(QUERIES, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def evaluate(name: str, embedding, documents, queries, recall: bool = True):
+    start = time.perf_counter()
+    index = KnowledgeIndex.build(documents, embedding, "bench")
+    build = time.perf_counter() - start
+
+    hits, latency = 0, 0.0
+    for query in queries:
+        start = time.perf_counter()
+        vector = embedding.embed_query(query["query"])
+        latency += time.perf_counter() - start
+        rows = index.search_by_vector(vector, K)
+        if any(is_hit(documents[row], query["topics"]) for row, _ in rows):
+            hits += 1
+    recall_text = f"{hits / len(queries):9.0%}" if recall else f"{'n/d':>9}"
+    print(f"{name:>20}: recall@{K} {recall_text}, query {latency / len(queries) * 1e6:9.0f} µs, build {build:6.1f} s")
+
+
+if __name__ == "__main__":
+    documents = load_corpus_documents()
+    queries = load_queries()
+    print(f"{len(documents)} chunks, {len(queries)} perguntas")
+
+    evaluate("hashing", HashingEmbeddings(), documents, queries)
+
+    start = time.perf_counter()
+    tfidf = TfidfSvdEmbeddings().fit([d.page_content for d in documents])
+    print(f"{'':>20}  (fit TF-IDF+SVD: {time.perf_counter() - start:.1f} s)")
+    evaluate("tfidf-svd", tfidf, documents, queries)
+
+    if "--remote" in sys.argv:
+        evaluate("openai", EmbeddingClient(), documents, queries)
+    else:
+        server = start_stub_server()
+        client = OpenAI(base_url=base_url(server), api_key="stub", max_retries=0)
+        evaluate("remoto (stub)", EmbeddingClient(client=client), documents, queries, recall=False)
+        server.shutdown()
@@ -0,0 +1,71 @@
+"""
+Benchmark de replay do log de mensagens do ChatApp.
+
+Grava um log com 1M de mensagens e mede o tempo de leitura dos registros
+(verificação de checksum incluída) e da reconstrução completa do ChatApp.
+
+    python benchmarks/message_log_replay.py [n_mensagens]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from chat.chat_app import ChatApp
+from chat.entities.message import Message
+from chat.storage.memory import MemoryStorage
+from chat.utils.message_log import MessageLog, message_to_record
+
+ROOMS = ["geral", "casual", "estudos", "programador"]
+
+
+def write_log(log_dir: str, n_messages: int):
+    log = MessageLog(log_dir)
+    for room_id in ROOMS:
+        log.append({"type": "room", "room_id": room_id, "room_name": ChatApp.DEFAULT_ROOMS[room_id],
+                    "owner": "system", "current_users": None, "private": False})
+
+    start = time.perf_counter()
+    for i in range(n_messages):
+        message = Message(user_name=f"user{i % 100}",
+                          text=f"mensagem número {i}",
+                          message_type="chat_message",
+                          room_id=ROOMS[i % len(ROOMS)],
+                          seq=i // len(ROOMS) + 1)
+        log.append(message_to_record(message), wait=False)
+    log.close()
+    elapsed = time.perf_counter() - start
+    size = sum(os.path.getsize(p) for p in log.list_segments())
+    print(f"write:   {elapsed:.2f}s  ({n_messages / elapsed:,.0f} rec/s, {size / 2**20:.1f} MiB)")
+
+
+def replay_records(log_dir: str, n_messages: int):
+    log = MessageLog(log_dir)
+    start = time.perf_counter()
+    count = sum(1 for _ in log.replay())
+    elapsed = time.perf_counter() - start
+    log.close()
+    assert count == n_messages + len(ROOMS), count
+    print(f"replay:  {elapsed:.2f}s  ({count / elapsed:,.0f} rec/s)")
+
+
+def replay_chat_app(log_dir: str, n_messages: int):
+    start = time.perf_counter()
+    chat_app = ChatApp(storage=MemoryStorage(log_dir=log_dir))
+    elapsed = time.perf_counter() - start
+    chat_app.storage.close()
+    print(f"ChatApp: {elapsed:.2f}s  ({n_messages / elapsed:,.0f} msg/s)")
+
+
+if __name__ == "__main__":
+    n_messages = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    log_dir = tempfile.mkdtemp(prefix="chat_log_")
+    try:
+        write_log(log_dir, n_messages)
+        replay_records(log_dir, n_messages)
+        replay_chat_app(log_dir, n_messages)
+    finally:
+        shutil.rmtree(log_dir)
@@ -0,0 +1,139 @@
+"""
+Servidor local compatível com a API da OpenAI, para testes e benchmarks offline.
+
+Responde a /v1/chat/completions (normal e stream=True, em SSE) com um texto
+fixo dividido em tokens, com um atraso configurável entre tokens, e a
+/v1/embeddings com vetores determinísticos (hash do texto), com latência por
+pedido e uma taxa configurável de erros 429 para exercitar as tentativas.
+
+    python benchmarks/openai_stub.py [porta]
+
+e depois OPENAI_BASE_URL=http://127.0.0.1:<porta>/v1 OPENAI_API_KEY=stub
+"""
+import base64
+import hashlib
+import json
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+
+REPLY = ("Claro! Para tornar um ft.Card clicável, envolva o conteúdo em um ft.Container "
+         "com on_click e ink=True. Assim o Card continua desenhando a elevação e o "
+         "Container cuida do clique. ") * 3
+
+
+class OpenAIStubHandler(BaseHTTPRequestHandler):
+    token_delay = 0.01     # Segundos entre dois tokens no modo stream
+    first_token_delay = 0.2
+    embedding_dim = 256
+    embedding_delay = 0.05      # Latência fixa de um pedido de embeddings
+    embedding_input_delay = 0.0005  # Latência por texto do pedido
+    rate_limit_rate = 0.0       # Fração de pedidos de embeddings respondidos com 429
+    requests = 0                # Pedidos de embeddings recebidos (incluindo os 429)
+    lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+
+        if self.path.endswith("/chat/completions"):
+            if body.get("stream"):
+                self.stream_completion(body)
+            else:
+                self.send_json(self.completion(body))
+        elif self.path.endswith("/embeddings"):
+            self.embeddings(body)
+        else:
+            self.send_error(404)
+
+    def completion(self, body: dict) -> dict:
+        time.sleep(self.first_token_delay + self.token_delay * len(REPLY.split()))
+        return {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": REPLY}}],
+        }
+
+    def stream_completion(self, body: dict):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+
+        time.sleep(self.first_token_delay)
+        for token in re.findall(r"\S+\s*", REPLY):
+            self.send_event({
+                "id": "chatcmpl-stub",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": body.get("model", "stub"),
+                "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}],
+            })
+            time.sleep(self.token_delay)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def embeddings(self, body: dict):
+        with OpenAIStubHandler.lock:
+            OpenAIStubHandler.requests += 1
+        inputs = body.get("input")
+        inputs = [inputs] if isinstance(inputs, str) else inputs
+        time.sleep(self.embedding_delay + self.embedding_input_delay * len(inputs))
+        if random.random() < self.rate_limit_rate:
+            self.send_json({"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}}, 429)
+            return
+
+        data = []
+        for i, text in enumerate(inputs):
+            vector = self.embed(str(text))
+            if body.get("encoding_format") == "base64":
+                embedding = base64.b64encode(vector.tobytes()).decode()
+            else:
+                embedding = vector.tolist()
+            data.append({"object": "embedding", "index": i, "embedding": embedding})
+        self.send_json({"object": "list", "data": data, "model": body.get("model", "stub"),
+                        "usage": {"prompt_tokens": 0, "total_tokens": 0}})
+
+    @classmethod
+    def embed(cls, text: str) -> np.ndarray:
+        seed = int.from_bytes(hashlib.sha256(text.encode()).digest()[:8], "little")
+        vector = np.random.default_rng(seed).standard_normal(cls.embedding_dim).astype(np.float32)
+        return vector / np.linalg.norm(vector)
+
+    def send_event(self, data: dict):
+        self.wfile.write(b"data: " + json.dumps(data).encode() + b"\n\n")
+        self.wfile.flush()
+
+    def send_json(self, data: dict, status: int = 200):
+        payload = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def start_stub_server(port: int = 0, handler=OpenAIStubHandler) -> ThreadingHTTPServer:
+    """Inicia o servidor em uma thread e o retorna; a URL base é http://127.0.0.1:<porta>/v1."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def base_url(server: ThreadingHTTPServer) -> str:
+    return f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+if __name__ == "__main__":
+    server = start_stub_server(int(sys.argv[1]) if len(sys.argv) > 1 else 8000)
+    print(f"OpenAI stub em {base_url(server)}")
+    threading.Event().wait()
@@ -0,0 +1,74 @@
+"""
+Benchmark do fan-out de mensagens no pubsub do Flet.
+
+Compara o modelo antigo (send_all + filtro por sala em cada sessão) com o
+roteamento por tópico de sala. Com tópicos o custo por mensagem acompanha o
+número de membros da sala e não o total de sessões no servidor.
+
+    python benchmarks/pubsub_fanout.py
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from flet.core.pubsub.pubsub_hub import PubSubHub
+from chat.chat_app import ChatApp
+from chat.entities.message import Message
+
+MESSAGES = 200
+
+
+def build_hub(total_sessions: int, room_members: int, counter: dict) -> PubSubHub:
+    # Sem executor o hub chama os handlers de forma síncrona
+    hub = PubSubHub(loop=asyncio.new_event_loop())
+    topic = ChatApp.room_topic("geral")
+
+    for i in range(total_sessions):
+        room_id = "geral" if i < room_members else "casual"
+
+        def on_message(message, room_id=room_id):
+            counter["calls"] += 1
+            if message.room_id != room_id:
+                return
+            counter["delivered"] += 1
+
+        def on_room_message(topic, message):
+            counter["calls"] += 1
+            counter["delivered"] += 1
+
+        hub.subscribe(f"broadcast-{i}", on_message)
+        if room_id == "geral":
+            hub.subscribe_topic(f"topic-{i}", topic, on_room_message)
+    return hub
+
+
+def run(total_sessions: int, room_members: int):
+    message = Message(user_name="bench", text="olá", message_type="chat_message", room_id="geral")
+    topic = ChatApp.room_topic("geral")
+    results = {}
+
+    for mode in ("broadcast", "topic"):
+        counter = {"calls": 0, "delivered": 0}
+        hub = build_hub(total_sessions, room_members, counter)
+        start = time.perf_counter()
+        for _ in range(MESSAGES):
+            if mode == "broadcast":
+                hub.send_all(message)
+            else:
+                hub.send_all_on_topic(topic, message)
+        elapsed = time.perf_counter() - start
+        results[mode] = (elapsed / MESSAGES * 1e6, counter["calls"] // MESSAGES)
+    return results
+
+
+if __name__ == "__main__":
+    print(f"{'sessões':>8} {'membros':>8} | {'broadcast µs/msg':>17} {'callbacks':>9} | {'tópico µs/msg':>14} {'callbacks':>9}")
+    for total_sessions in (100, 1_000, 10_000):
+        for room_members in (10, 100):
+            r = run(total_sessions, room_members)
+            print(f"{total_sessions:>8} {room_members:>8} | "
+                  f"{r['broadcast'][0]:>17.1f} {r['broadcast'][1]:>9} | "
+                  f"{r['topic'][0]:>14.1f} {r['topic'][1]:>9}")
@@ -0,0 +1,50 @@
+"""
+Benchmark da cache de respostas do Programador.
+
+Usa o servidor local de benchmarks/openai_stub.py e mede a latência de uma
+pergunta nova (chamada à API), de uma repetida servida pela memória e de uma
+servida pelo arquivo em disco depois que a memória é limpa.
+
+    python benchmarks/response_cache.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+os.environ.setdefault("OPENAI_API_KEY", "stub")
+os.environ["RESPONSE_CACHE_PATH"] = ""
+
+from openai import OpenAI
+from openai_stub import REPLY, base_url, start_stub_server
+from assistants.programador import Programador
+from assistants.utils.response_cache import ResponseCache
+
+QUESTIONS = 20
+
+
+def timed(programador: Programador, question: str) -> float:
+    start = time.perf_counter()
+    assert programador.get_response(question, conversation_history=[]) == REPLY
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    server = start_stub_server()
+    Programador.CLIENT = OpenAI(base_url=base_url(server), api_key="stub")
+    with tempfile.TemporaryDirectory() as tmp:
+        Programador.CACHE = ResponseCache(disk_path=os.path.join(tmp, "responses.db"))
+        programador = Programador()
+        questions = [f"Como faço um Card clicável? ({i})" for i in range(QUESTIONS)]
+
+        miss = [timed(programador, q) for q in questions]
+        memory = [timed(programador, q.upper() + "  ") for q in questions]
+        Programador.CACHE.entries.clear()
+        disk = [timed(programador, q) for q in questions]
+
+        for name, times in (("API", miss), ("memória", memory), ("disco", disk)):
+            print(f"{name:>8}: média {sum(times) / len(times) * 1e6:10.1f} µs")
+        print(Programador.CACHE.stats())
+        Programador.CACHE.close()
+    server.shutdown()
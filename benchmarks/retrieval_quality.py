@@ -0,0 +1,154 @@
+"""
+Benchmark de qualidade e latência da busca no corpus Flet.
+
+Roda as perguntas rotuladas de benchmarks/data/flet_queries.json contra cada
+configuração de busca e mostra, por configuração:
+    recall@1/5/10 e MRR@10  (um resultado é relevante se for de um dos tópicos da pergunta)
+    latência p50/p95/p99 por pergunta
+    tempo de construção do índice
+    memória (RSS adicionado pela construção)
+
+Tudo roda sem rede, com embedders locais determinísticos, para que os números
+sejam comparáveis entre alterações. Com --json <arquivo> salva os resultados;
+com --compare <arquivo> mostra a diferença em relação a uma execução anterior.
+
+    python benchmarks/retrieval_quality.py [--configs bm25,hybrid-hashing] [--json out.json] [--compare out.json]
+
+A configuração faiss-hashing (o caminho FAISS do DataStore, com o embedder local)
+precisa do pacote faiss-cpu; sem ele é ignorada.
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import numpy as np
+from knowledge_pack import rss_mb
+from local_embeddings import is_hit, load_queries
+from assistants.knowledge.bm25 import BM25Index
+from assistants.knowledge.corpus import load_corpus_documents
+from assistants.knowledge.index import KnowledgeIndex
+from assistants.knowledge.local_embeddings import HashingEmbeddings, TfidfSvdEmbeddings
+from assistants.knowledge.retriever import HybridRetriever
+
+RECALL_AT = (1, 5, 10)
+MRR_AT = 10
+
+
+def faiss_search(documents):
+    from langchain_community.vectorstores.faiss import FAISS
+    store = FAISS.from_documents(documents, embedding=HashingEmbeddings())
+    return lambda query, k: store.similarity_search(query, k)
+
+
+def bm25_search(documents):
+    bm25 = BM25Index(documents)
+    return lambda query, k: [documents[row] for row, _ in bm25.search(query, k)]
+
+
+def vector_search(embedding):
+    def build(documents):
+        index = KnowledgeIndex.build(documents, embedding(documents), "bench")
+        return lambda query, k: index.similarity_search(query, k)
+    return build
+
+
+def hybrid_search(embedding):
+    def build(documents):
+        retriever = HybridRetriever(KnowledgeIndex.build(documents, embedding(documents), "bench"))
+        return lambda query, k: retriever.retrieve(query, k)
+    return build
+
+
+def hashing(documents):
+    return HashingEmbeddings()
+
+
+def tfidf(documents):
+    return TfidfSvdEmbeddings().fit([d.page_content for d in documents])
+
+
+CONFIGS = {
+    "faiss-hashing": faiss_search,
+    "bm25": bm25_search,
+    "vector-hashing": vector_search(hashing),
+    "vector-tfidf": vector_search(tfidf),
+    "hybrid-hashing": hybrid_search(hashing),
+    "hybrid-tfidf": hybrid_search(tfidf),
+}
+
+
+def evaluate(build, documents, queries) -> dict:
+    gc.collect()
+    memory = rss_mb()
+    start = time.perf_counter()
+    search = build(documents)
+    build_time = time.perf_counter() - start
+    memory = rss_mb() - memory
+
+    search(queries[0]["query"], MRR_AT)     # Aquecimento (threads, caches do NumPy)
+    latencies, ranks = [], []
+    for query in queries:
+        start = time.perf_counter()
+        found = search(query["query"], max(MRR_AT, *RECALL_AT))
+        latencies.append((time.perf_counter() - start) * 1000)
+        ranks.append(next((rank for rank, d in enumerate(found, start=1) if is_hit(d, query["topics"])), None))
+
+    result = {f"recall@{k}": float(np.mean([r is not None and r <= k for r in ranks])) for k in RECALL_AT}
+    result[f"mrr@{MRR_AT}"] = float(np.mean([1 / r if r is not None and r <= MRR_AT else 0 for r in ranks]))
+    for p in (50, 95, 99):
+        result[f"p{p}_ms"] = float(np.percentile(latencies, p))
+    result["build_s"] = build_time
+    result["memory_mb"] = memory
+    return result
+
+
+def print_row(name: str, result: dict, previous: dict = None):
+    def delta(key: str, scale: float = 1, unit: str = "", digits: int = 1) -> str:
+        if not previous or key not in previous:
+            return ""
+        return f" ({(result[key] - previous[key]) * scale:+.{digits}f}{unit})"
+
+    recalls = "  ".join(f"R@{k} {result[f'recall@{k}']:4.0%}{delta(f'recall@{k}', 100, 'pp')}" for k in RECALL_AT)
+    print(f"{name:>15}: {recalls}  MRR {result[f'mrr@{MRR_AT}']:.3f}{delta(f'mrr@{MRR_AT}', digits=3)}  "
+          f"p50/p95/p99 {result['p50_ms']:.2f}/{result['p95_ms']:.2f}/{result['p99_ms']:.2f} ms{delta('p95_ms', unit=' ms', digits=2)}  "
+          f"build {result['build_s']:.2f}s  +{result['memory_mb']:.1f} MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--configs", default=",".join(CONFIGS), help="configurações a executar, separadas por vírgulas")
+    parser.add_argument("--json", help="salva os resultados neste arquivo")
+    parser.add_argument("--compare", help="resultados de uma execução anterior (--json) para comparar")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.configs.split(",") if name.strip()]
+    unknown = [name for name in names if name not in CONFIGS]
+    if unknown:
+        parser.error(f"configurações desconhecidas: {', '.join(unknown)} (disponíveis: {', '.join(CONFIGS)})")
+    previous = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)["results"]
+
+    documents = load_corpus_documents()
+    queries = load_queries()
+    print(f"{len(queries)} perguntas, {len(documents)} chunks\n")
+
+    results = {}
+    for name in names:
+        try:
+            results[name] = evaluate(CONFIGS[name], documents, queries)
+        except ImportError as e:
+            print(f"{name:>15}: ignorada ({e})")
+            continue
+        print_row(name, results[name], previous.get(name))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"queries": len(queries), "chunks": len(documents), "results": results}, f, indent=2)
+        print(f"\nresultados salvos em {args.json}")
@@ -0,0 +1,85 @@
+"""
+Benchmark da cache semântica do assistente.
+
+Com o embedder local (HashingEmbeddings: palavras e n-gramas com hash),
+preenche a cache com perguntas sobre Flet e a consulta com paráfrases (devem
+encontrar a pergunta certa) e com perguntas diferentes (não devem acertar).
+Para cada limiar mostra a taxa de acertos certos e a taxa de falsos acertos,
+e no fim a latência da busca.
+
+    python benchmarks/semantic_cache.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from assistants.knowledge.local_embeddings import HashingEmbeddings
+from assistants.utils.semantic_cache import SemanticCache
+
+embed = HashingEmbeddings().embed_query
+
+CACHED = [
+    "como faço um Card clicável",
+    "como mudo a cor de fundo de um Container",
+    "como abro um arquivo com o FilePicker",
+    "como mostro uma SnackBar depois de salvar",
+    "como faço scroll automático em uma ListView",
+    "como centralizo um Text dentro de uma Row",
+]
+
+# (pergunta, índice da pergunta equivalente em CACHED ou None)
+PROBES = [
+    ("Como faço um Card clicável?", 0),
+    ("como fazer um card clicavel", 0),
+    ("Card clicável, como faço?", 0),
+    ("como mudar a cor de fundo do Container", 1),
+    ("cor de fundo em um Container, como mudo", 1),
+    ("como abrir um arquivo com FilePicker", 2),
+    ("mostrar uma SnackBar depois de salvar", 3),
+    ("scroll automático na ListView, como faço", 4),
+    ("como centralizar um Text em uma Row", 5),
+    ("como faço uma Row clicável", None),
+    ("como mudo a cor do texto de um Card", None),
+    ("como salvo um arquivo no servidor", None),
+    ("como faço scroll em uma Column", None),
+    ("como mostro um AlertDialog", None),
+    ("como centralizo uma Image dentro de uma Column", None),
+]
+
+THRESHOLDS = [0.5, 0.6, 0.7, 0.8, 0.85, 0.9, 0.95]
+
+
+def sweep():
+    cache = SemanticCache(embed=embed, threshold=0.0)
+    for index, question in enumerate(CACHED):
+        cache.add(question, str(index))
+    scored = []
+    for question, expected in PROBES:
+        slot, score = cache.search(cache.vector(question))
+        scored.append((expected, int(cache.answers[slot]), score))
+
+    paraphrases = sum(1 for expected, _, _ in scored if expected is not None)
+    print(f"{'limiar':>7} {'acertos':>8} {'falsos':>7}")
+    for threshold in THRESHOLDS:
+        hits = [(expected, found) for expected, found, score in scored if score >= threshold]
+        true_hits = sum(1 for expected, found in hits if expected == found)
+        false_hits = len(hits) - true_hits
+        print(f"{threshold:7.2f} {true_hits / paraphrases:8.0%} {false_hits / len(hits) if hits else 0.0:7.0%}")
+
+
+def lookup_latency(entries: int = SemanticCache.MAX_ENTRIES, rounds: int = 1000):
+    cache = SemanticCache(embed=embed, max_entries=entries)
+    for i in range(entries):
+        cache.add(f"pergunta número {i} sobre o controle {i % 37}", str(i))
+    vector = cache.vector("pergunta sobre o controle 5")
+    start = time.perf_counter()
+    for _ in range(rounds):
+        cache.lookup("", vector)
+    print(f"busca em {entries} perguntas: {(time.perf_counter() - start) / rounds * 1e6:.1f} µs")
+
+
+if __name__ == "__main__":
+    sweep()
+    lookup_latency()
@@ -1,5 +1,8 @@
-from fastapi import FastAPI
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, Request
+from fastapi.responses import FileResponse, Response
+from starlette.concurrency import run_in_threadpool
+from email.utils import formatdate, parsedate_to_datetime
+import hashlib
 import os
 
 app = FastAPI()
@@ -7,18 +10,69 @@ app = FastAPI()
 UPLOAD_DIR = "src/uploads"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
-@app.get("/download/{filename}")
-async def download_file(filename: str):
-    """Endpoint para baixar arquivos da pasta uploads"""
+# Clientes e proxies podem armazenar os arquivos, mas sempre revalidam (ETag / Last-Modified)
+CACHE_CONTROL = "public, no-cache"
+HASH_BLOCK = 1024 * 1024
+# ETag de cada arquivo, por (mtime, tamanho): o conteúdo só é lido novamente quando o arquivo muda
+etags: dict[str, tuple[tuple[int, int], str]] = {}
+
+
+def file_etag(file_path: str, stat_result: os.stat_result) -> str:
+    """ETag forte: hash SHA-256 do conteúdo do arquivo."""
+    version = (stat_result.st_mtime_ns, stat_result.st_size)
+    cached = etags.get(file_path)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b""):
+            digest.update(block)
+    etag = f'"{digest.hexdigest()}"'
+    etags[file_path] = (version, etag)
+    return etag
+
+
+def is_not_modified(request: Request, etag: str, mtime: float) -> bool:
+    """GET condicional: If-None-Match (comparação fraca) e, na sua falta, If-Modified-Since."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+@app.api_route("/download/{filename}", methods=["GET", "HEAD"])
+async def download_file(filename: str, request: Request):
+    """
+    Endpoint para baixar arquivos da pasta uploads
+
+    Suporta pedidos parciais (Range / If-Range -> 206, tratados pelo FileResponse)
+    e GET condicional (If-None-Match / If-Modified-Since -> 304).
+    """
     filename.replace("%", " ")
     print("Download filename: ", filename)
 
     file_path = os.path.join(UPLOAD_DIR, filename)
 
-    if os.path.exists(file_path):
-        return FileResponse(file_path, media_type="application/octet-stream", filename=filename)
+    if os.path.isfile(file_path):
+        stat_result = os.stat(file_path)
+        etag = await run_in_threadpool(file_etag, file_path, stat_result)
+        headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL, "Accept-Ranges": "bytes"}
+        if is_not_modified(request, etag, stat_result.st_mtime):
+            headers["Last-Modified"] = formatdate(stat_result.st_mtime, usegmt=True)
+            return Response(status_code=304, headers=headers)
+        return FileResponse(file_path, media_type="application/octet-stream", filename=filename,
+                            headers=headers, stat_result=stat_result)
     return {"error": "Arquivo não encontrado"}
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, port=3000) #, host="0.0.0.0")  # Replit
\ No newline at end of file
+    uvicorn.run(app, port=3000) #, host="0.0.0.0")  # Replit
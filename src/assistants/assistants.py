@@ -1,34 +1,145 @@
 
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import BoundedSemaphore
+from typing import Callable, Optional
+import numpy as np
 from chat.entities.message import Message
+from assistants.knowledge.context import load_context_builder
 from assistants.programador import Programador
-from langchain.schema import HumanMessage, AIMessage    #, SystemMessage
+from assistants.utils.conversation_memory import ConversationMemory
+from assistants.utils.semantic_cache import SemanticCache
 # nomes = ["Programador", "assistente"]
 
 class Assistants:
-    def __init__(self, nome: str = "Programador"):
+    MAX_WORKERS = 4         # Assistant calls running at the same time
+    MAX_PENDING = 16        # Calls accepted (running + queued) before new ones are refused
+    PATCH_INTERVAL = 0.075  # Seconds between two text patches of a streamed reply
+    THINKING_TEXT = "Pensando…"
+    BUSY_TEXT = "Estou com muitas perguntas ao mesmo tempo, tente novamente daqui a pouco."
+    EMBEDDING_MODEL = "text-embedding-3-small"
+    EMBEDDING_TIMEOUT = 5.0   # Seconds; the question is embedded before answering, so a slow API must fail fast
+
+    def __init__(self, nome: str = "Programador", streaming: bool = True,
+                 embed: Optional[Callable[[str], np.ndarray]] = None):
         self.nome = nome
-        self.specialist = Programador() if nome == "Programador" else None
+        self.streaming = streaming
+        # Answers are grounded on the Flet knowledge index when it has been built
+        self.specialist = Programador(context_builder=load_context_builder()) if nome == "Programador" else None
         self.call = str(f"@{self.nome}").lower()
-        self.chat_history = []
+        self.memory = ConversationMemory(model=Programador.MODEL)
+        # Paraphrases of questions already answered skip the specialist; embed can be a local function
+        self.semantic_cache = SemanticCache(embed=embed or self.embed_question)
+        self.executor = ThreadPoolExecutor(max_workers=self.MAX_WORKERS, thread_name_prefix=f"assistant-{nome}")
+        self.slots = BoundedSemaphore(self.MAX_PENDING)
 
-    def process_message(self, message: Message):
-        self.chat_history.append(HumanMessage(content=message.text, user=message.user_name))
-        print(self.chat_history)
+    def is_called(self, message: Message) -> bool:
+        return self.call in message.text.lower()
+
+    def question_of(self, message: Message) -> str:
+        return re.sub(re.escape(self.call), "", message.text, flags=re.IGNORECASE).strip()
+
+    def embed_question(self, question: str) -> np.ndarray:
+        client = Programador.CLIENT.with_options(timeout=self.EMBEDDING_TIMEOUT, max_retries=1)
+        response = client.embeddings.create(model=self.EMBEDDING_MODEL, input=question)
+        return np.asarray(response.data[0].embedding, dtype=np.float32)
+
+    def cached_answer(self, message: Message) -> tuple[Optional[str], Optional[np.ndarray]]:
+        """
+        Answer from the exact-match cache, then from the semantic cache.
+
+        Returns:
+            tuple: The cached answer (None on a miss) and the question vector,
+                None when the exact-match cache answered before any embedding.
+        """
+        cached = self.specialist.cached_response(message.text)
+        if cached is not None:
+            return cached, None
+        question = self.question_of(message)
+        vector = self.semantic_cache.vector(question)
+        if vector is None:
+            return None, None
+        # Answers depend on the knowledge base, not on the room history, which changes with every message
+        return self.semantic_cache.lookup(question, vector, context=self.specialist.knowledge_version()), vector
+
+    def remember_answer(self, message: Message, answer: str, vector: Optional[np.ndarray]):
+        if vector is not None and answer and answer != Programador.ERROR_RESPONSE:
+            self.semantic_cache.add(self.question_of(message), answer, vector, context=self.specialist.knowledge_version())
+
+    def submit_stream(self, message: Message, on_patch: Callable[[str, bool], None]) -> bool:
+        """
+        Answer the message on the worker pool, calling on_patch(text, done) with the reply so far.
+
+        Returns:
+            bool: False when the pool is saturated and the message was not accepted.
+        """
+        if not self.slots.acquire(blocking=False):
+            return False
 
-        if self.call in message.text.lower():
+        def done(future):
+            self.slots.release()
+            try:
+                future.result()
+            except Exception as e:
+                print(f"Assistants - submit_stream() Error: {e}")
+                on_patch(Programador.ERROR_RESPONSE, True)
+
+        self.executor.submit(self.stream_message, message, on_patch).add_done_callback(done)
+        return True
+
+    def stream_message(self, message: Message, on_patch: Callable[[str, bool], None]) -> str:
+        """Stream the specialist reply, coalescing tokens into one patch every PATCH_INTERVAL."""
+        history = self.memory.get_messages(message.room_id)
+        cached, vector = self.cached_answer(message)
+        if cached is not None:
+            chunks = [cached]
+        elif self.streaming:
+            chunks = self.specialist.stream_response(input=message.text, conversation_history=history, lookup_cache=False)
+        else:
+            chunks = [self.specialist.get_response(input=message.text, conversation_history=history, lookup_cache=False)]
+        self.remember_message(message)
+
+        parts = []
+        last_patch = 0.0
+        for chunk in chunks:
+            parts.append(chunk)
+            now = time.monotonic()
+            if self.streaming and now - last_patch >= self.PATCH_INTERVAL:
+                on_patch("".join(parts), False)
+                last_patch = now
+
+        text = "".join(parts)
+        if cached is None:
+            self.remember_answer(message, text, vector)
+        self.memory.append(message.room_id, "assistant", text)
+        on_patch(text, True)
+        return text
+
+    def process_message(self, message: Message):
+        if self.is_called(message):
             print(self.call, message.text.lower())
             response = self.get_response_from_specialist(message)
-            self.chat_history.append(AIMessage(content=message.text))
-            print(self.chat_history)
+            self.remember_message(message)
+            self.memory.append(message.room_id, "assistant", response)
             return self.format_response(response)
         
+        self.remember_message(message)
         return None
+
+    def remember_message(self, message: Message):
+        self.memory.append(message.room_id, "user", f"{message.user_name}: {message.text}")
     
     def get_response_from_specialist(self, message: Message) -> str:
-        return self.specialist.get_response(
-            input=message.text, 
-            conversation_history=self.chat_history)
+        history = self.memory.get_messages(message.room_id)
+        cached, vector = self.cached_answer(message)
+        if cached is not None:
+            return cached
+
+        response = self.specialist.get_response(input=message.text, conversation_history=history, lookup_cache=False)
+        self.remember_answer(message, response, vector)
+        return response
     
     def format_response(self, message: Message):
         return Message(user_name=self.nome, text=message, message_type="chat_message")
-    
\ No newline at end of file
+    
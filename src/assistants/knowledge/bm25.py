@@ -0,0 +1,98 @@
+import re
+from collections import defaultdict
+from collections.abc import Sequence
+import numpy as np
+from langchain_core.documents import Document
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercased words; snake_case identifiers also count as their parts (on_long_press -> on, long, press)."""
+    tokens = []
+    for word in TOKEN_PATTERN.findall(text.lower()):
+        tokens.append(word)
+        if "_" in word:
+            tokens.extend(part for part in word.split("_") if part)
+    return tokens
+
+
+class BM25Index:
+    """
+    In-memory BM25 inverted index over the knowledge chunks.
+
+    Postings are stored flat (CSR): the document rows and term frequencies of
+    every term in two NumPy arrays, the term's slice given by `offsets`, so
+    scoring a query is one vectorized update per query term. save() and load()
+    keep them next to the knowledge index, so startup does not tokenize the corpus.
+    """
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self, documents: Sequence[Document] = (), k1: float = K1, b: float = B):
+        self.k1 = k1
+        self.b = b
+
+        postings: dict[str, dict[int, int]] = defaultdict(dict)
+        lengths = np.zeros(len(documents), dtype=np.float32)
+        for row, document in enumerate(documents):
+            tokens = tokenize(document.page_content)
+            lengths[row] = len(tokens)
+            for token in tokens:
+                postings[token][row] = postings[token].get(row, 0) + 1
+
+        self.terms = {token: term for term, token in enumerate(postings)}
+        self.offsets = np.zeros(len(postings) + 1, dtype=np.int64)
+        self.offsets[1:] = np.cumsum([len(rows) for rows in postings.values()])
+        total = int(self.offsets[-1])
+        self.rows = np.fromiter((row for rows in postings.values() for row in rows), dtype=np.int32, count=total)
+        self.tfs = np.fromiter((tf for rows in postings.values() for tf in rows.values()), dtype=np.float32, count=total)
+        self.lengths = lengths
+        self.finalize()
+
+    def finalize(self):
+        """Derives the IDF of each term and the length normalization of each document from the postings."""
+        count = len(self.lengths)
+        frequencies = np.diff(self.offsets).astype(np.float32)
+        self.idf = np.log(1 + (count - frequencies + 0.5) / (frequencies + 0.5)).astype(np.float32)
+        average = float(self.lengths.mean()) if count else 0.0
+        self.norms = self.k1 * (1 - self.b + self.b * self.lengths / average) if average \
+            else np.full(count, self.k1, dtype=np.float32)
+
+    def save(self, path: str):
+        # Terms are \w+ words, so they can be stored as one newline-separated string
+        np.savez(path, terms=np.array("\n".join(self.terms)), offsets=self.offsets, rows=self.rows, tfs=self.tfs,
+                 lengths=self.lengths, params=np.array([self.k1, self.b]))
+
+    @classmethod
+    def load(cls, path: str) -> "BM25Index":
+        data = np.load(path)
+        k1, b = data["params"].tolist()
+        bm25 = cls(k1=k1, b=b)
+        terms = str(data["terms"])
+        bm25.terms = {token: term for term, token in enumerate(terms.split("\n"))} if terms else {}
+        bm25.offsets = data["offsets"]
+        bm25.rows = data["rows"]
+        bm25.tfs = data["tfs"]
+        bm25.lengths = data["lengths"]
+        bm25.finalize()
+        return bm25
+
+    def search(self, query: str, k: int = 4) -> list[tuple[int, float]]:
+        """Returns (row, BM25 score) of the k best documents, best first; documents without any query term are left out."""
+        scores = np.zeros(len(self.lengths), dtype=np.float32)
+        for token in set(tokenize(query)):
+            term = self.terms.get(token)
+            if term is None:
+                continue
+            start, end = self.offsets[term], self.offsets[term + 1]
+            rows, tf = self.rows[start:end], self.tfs[start:end]
+            scores[rows] += self.idf[term] * tf * (self.k1 + 1) / (tf + self.norms[rows])
+
+        matched = np.flatnonzero(scores)
+        if len(matched) == 0:
+            return []
+        k = min(k, len(matched))
+        top = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+        top = top[np.argsort(-scores[top])]
+        return [(int(row), float(scores[row])) for row in top]
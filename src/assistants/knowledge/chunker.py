@@ -0,0 +1,223 @@
+import ast
+import re
+import textwrap
+from functools import lru_cache
+from typing import Callable, Optional
+import tiktoken
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+CHUNKER_VERSION = 1     # Part of the corpus fingerprint: bump when chunk boundaries change
+MAX_CHUNK_TOKENS = 512
+MAX_LOOKAHEAD = 40      # Blocks tried when growing a code region
+FENCE_PATTERN = re.compile(r"^\s*```")
+# Code whose newlines were stripped: split before definitions, then at indentation runs
+FLAT_CODE_SEPARATORS = ["import flet as ft", "def ", "class ", "    ", " ", ""]
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model: str) -> Optional[tiktoken.Encoding]:
+    """Tokenizer of the model, or None when its files are unavailable (cached: the download is tried once)."""
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        print(f"get_encoding() Error: {e}")
+        return None
+
+
+def token_counter(model: str = "gpt-3.5-turbo") -> Callable[[str], int]:
+    encoding = get_encoding(model)
+    if encoding is None:
+        return lambda text: len(text) // 4 + 1
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+
+class CodeChunker:
+    """
+    Splits Python examples at module, function and control-tree boundaries.
+
+    A parseable file is cut at top-level statements: each example (its imports,
+    functions and the ft.app call) stays in one chunk when it fits in
+    `max_tokens`. Larger statements are split along their AST children (function
+    bodies, then the arguments and list items of control constructors such as
+    page.add(ft.Column([...]))), and continuation chunks repeat the first line of
+    their definition.
+
+    Files that do not parse (code mixed with markdown) are scanned for the
+    longest runs of blank-line separated blocks that do parse; those are chunked
+    as code and packed, in file order, with the prose around them up to the
+    token cap. Code whose newlines were stripped falls back to a character splitter.
+    """
+
+    def __init__(self, max_tokens: int = MAX_CHUNK_TOKENS, count_tokens: Optional[Callable[[str], int]] = None):
+        self.max_tokens = max_tokens
+        self.count_tokens = count_tokens or token_counter()
+        self.flat_splitter = RecursiveCharacterTextSplitter(separators=FLAT_CODE_SEPARATORS, keep_separator="start",
+                                                            chunk_size=max_tokens, chunk_overlap=0,
+                                                            length_function=self.count_tokens)
+
+    def split_text(self, text: str) -> list[str]:
+        tree = self.parse(text)
+        if tree is not None:
+            return self.split_module(text, tree)
+        if text.count("\n") < 2:
+            return [c for c in self.flat_splitter.split_text(text) if c.strip()]
+
+        # Explanations stay next to the snippets they describe, as long as both fit
+        pieces = []
+        for is_code, region in self.regions(text):
+            pieces.extend(self.split_module(region, ast.parse(region)) if is_code else self.cap(region))
+        return self.pack(pieces, separator="\n\n")
+
+    # ========================
+    # Code / prose regions
+    # ========================
+    @staticmethod
+    def parse(text: str) -> Optional[ast.Module]:
+        try:
+            return ast.parse(text)
+        except (SyntaxError, ValueError):
+            return None
+
+    @staticmethod
+    def is_code(tree: Optional[ast.Module]) -> bool:
+        """A lone name or literal (a word of prose) parses, but is not code."""
+        return tree is not None and any(
+            not (isinstance(node, ast.Expr) and isinstance(node.value, (ast.Name, ast.Constant)))
+            for node in tree.body)
+
+    def regions(self, text: str) -> list[tuple[bool, str]]:
+        """(is_code, text) regions of a file mixing code and markdown."""
+        blocks, current = [], []
+        for line in text.splitlines():
+            if not line.strip() or FENCE_PATTERN.match(line):
+                if current:
+                    blocks.append("\n".join(current))
+                    current = []
+                continue
+            current.append(line)
+        if current:
+            blocks.append("\n".join(current))
+
+        regions, i = [], 0
+        while i < len(blocks):
+            end = None
+            for j in range(min(len(blocks), i + MAX_LOOKAHEAD), i, -1):
+                candidate = textwrap.dedent("\n\n".join(blocks[i:j]))
+                if self.is_code(self.parse(candidate)):
+                    end = j
+                    break
+            if end is None:
+                regions.append((False, blocks[i]))
+                i += 1
+            else:
+                regions.append((True, textwrap.dedent("\n\n".join(blocks[i:end]))))
+                i = end
+        return regions
+
+    def cap(self, text: str) -> list[str]:
+        if self.count_tokens(text) <= self.max_tokens:
+            return [text]
+        return self.flat_splitter.split_text(text)
+
+    # ========================
+    # AST chunking
+    # ========================
+    def split_module(self, text: str, tree: ast.Module) -> list[str]:
+        lines = text.splitlines()
+        # Examples: a new run of imports after a definition starts another example
+        examples, current, seen_definition = [], [], False
+        for node in tree.body:
+            if isinstance(node, (ast.Import, ast.ImportFrom)) and seen_definition:
+                examples.append(current)
+                current, seen_definition = [], False
+            current.append(node)
+            seen_definition |= isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))
+        if current:
+            examples.append(current)
+
+        chunks = []
+        for nodes in examples:
+            start = self.span(nodes[0])[0]
+            end = self.span(nodes[-1])[1]
+            if self.count_tokens(self.join(lines, start, end)) <= self.max_tokens:
+                chunks.append(self.join(lines, start, end))
+                continue
+            pieces = []
+            for node in nodes:
+                node_pieces = self.pieces(node, lines)
+                header = lines[self.span(node)[0] - 1]
+                pieces.append(node_pieces[0])
+                # Continuations keep the first line of their definition as context
+                pieces.extend(f"{header}\n    ...\n{piece}" if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))
+                              else piece for piece in node_pieces[1:])
+            chunks.extend(self.pack(pieces))
+        return [chunk for chunk in chunks if chunk.strip()]
+
+    @staticmethod
+    def span(node: ast.AST) -> tuple[int, int]:
+        start = min([node.lineno] + [d.lineno for d in getattr(node, "decorator_list", [])])
+        return start, node.end_lineno
+
+    @staticmethod
+    def join(lines: list[str], start: int, end: int) -> str:
+        return "\n".join(lines[start - 1:end])
+
+    @staticmethod
+    def children(node: ast.AST) -> list[ast.AST]:
+        """Nodes along which an oversized statement is split."""
+        body = []
+        for field in ("body", "handlers", "orelse", "finalbody"):
+            value = getattr(node, field, None)
+            if isinstance(value, list):
+                body.extend(value)
+        if body:
+            return body
+        if isinstance(node, (ast.Expr, ast.Assign, ast.AnnAssign, ast.AugAssign, ast.Return)) and node.value is not None:
+            return CodeChunker.children(node.value) or [node.value]
+        if isinstance(node, ast.Call):
+            return list(node.args) + list(node.keywords)
+        if isinstance(node, ast.keyword):
+            return CodeChunker.children(node.value)
+        if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+            return list(node.elts)
+        if isinstance(node, ast.Dict):
+            return [v for v in node.values if v is not None]
+        return []
+
+    def pieces(self, node: ast.AST, lines: list[str]) -> list[str]:
+        """Line-aligned pieces of a node, each under the token cap when the lines allow it."""
+        start, end = self.span(node)
+        text = self.join(lines, start, end)
+        if self.count_tokens(text) <= self.max_tokens:
+            return [text]
+
+        kids = [kid for kid in self.children(node) if hasattr(kid, "lineno") and kid.lineno >= start]
+        kids = [kid for kid in kids if self.span(kid) != (start, end)] or \
+            [grandchild for kid in kids for grandchild in self.children(kid) if hasattr(grandchild, "lineno")]
+        if not kids:
+            return self.cap(text)
+
+        pieces, cursor = [], start
+        for kid in kids:
+            kid_start, kid_end = self.span(kid)
+            if kid_start < cursor:
+                continue    # Several children on the same line
+            if kid_start > cursor:
+                pieces.append(self.join(lines, cursor, kid_start - 1))
+            pieces.extend(self.pieces(kid, lines))
+            cursor = kid_end + 1
+        if cursor <= end:
+            pieces.append(self.join(lines, cursor, end))
+        return self.pack(pieces)
+
+    def pack(self, pieces: list[str], separator: str = "\n") -> list[str]:
+        """Merges consecutive pieces while they fit in the token cap."""
+        packed = []
+        for piece in pieces:
+            if packed and self.count_tokens(packed[-1] + separator + piece) <= self.max_tokens:
+                packed[-1] = packed[-1] + separator + piece
+            else:
+                packed.append(piece)
+        return packed
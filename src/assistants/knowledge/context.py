@@ -0,0 +1,103 @@
+import os
+import re
+import time
+from typing import Callable, Optional
+from assistants.knowledge.chunker import token_counter
+from assistants.knowledge.embeddings import create_embeddings
+from assistants.knowledge.index import content_hash, load_knowledge_index
+from assistants.knowledge.retriever import HybridRetriever
+
+MENTION_PATTERN = re.compile(r"@\w+")
+
+
+class ContextBuilder:
+    """
+    Retrieval stage of the assistant: finds the knowledge chunks for a question
+    and packs them into a prompt context under a token budget.
+
+    Candidates come from the hybrid retriever, best first. Chunks with the same
+    content, or whose text is contained in a chunk already selected, are
+    dropped; the others are added while they fit in `token_budget`, using the
+    token counts precomputed in the knowledge pack when the index has them.
+
+    Attributes:
+        TOKEN_BUDGET (int): Default tokens of the whole context.
+        TOP_K (int): Default candidates fetched from the retriever.
+    """
+    TOKEN_BUDGET = 1500
+    TOP_K = 8
+    SEPARATOR = "\n\n---\n\n"
+
+    def __init__(self, retriever: HybridRetriever, token_budget: int = TOKEN_BUDGET, k: int = TOP_K,
+                 count_tokens: Optional[Callable[[str], int]] = None):
+        self.retriever = retriever
+        self.token_budget = token_budget
+        self.k = k
+        self.count_tokens = count_tokens or token_counter()
+
+    def token_count(self, row: int) -> int:
+        documents = self.retriever.index.documents
+        tokens = documents.token_count(row) if hasattr(documents, "token_count") else 0
+        return tokens or self.count_tokens(documents[row].page_content)
+
+    def select(self, rows: list[int]) -> list[int]:
+        """Rows kept for the context: no duplicates, within the token budget, in rank order."""
+        documents = self.retriever.index.documents
+        hashes = self.retriever.index.manifest.get("chunks")
+        selected, seen, texts, used = [], set(), [], 0
+        for row in rows:
+            text = documents[row].page_content
+            digest = hashes[row] if hashes else content_hash(text)
+            if digest in seen or any(text in kept for kept in texts):
+                continue
+            seen.add(digest)
+            tokens = self.token_count(row) + self.count_tokens(self.header(documents[row]) + self.SEPARATOR)
+            if used + tokens > self.token_budget:
+                continue    # A shorter chunk further down may still fit
+            selected.append(row)
+            texts.append(text)
+            used += tokens
+        return selected
+
+    @property
+    def version(self) -> str:
+        """Identifies what build() answers from: same version and question, same context."""
+        manifest = self.retriever.index.manifest
+        return f"{manifest.get('embedding_model')}:{manifest.get('corpus_fingerprint')}:{self.token_budget}:{self.k}"
+
+    @staticmethod
+    def header(document) -> str:
+        return f"Fonte: {document.metadata.get('source', '')}\n"
+
+    def build(self, question: str, timings: Optional[dict] = None) -> str:
+        """
+        Returns the context for the question ("" when nothing relevant fits).
+
+        Args:
+            timings: When given, filled with the seconds of each stage
+                (retriever legs, "retrieve" in total and "pack").
+        """
+        timings = {} if timings is None else timings
+        query = MENTION_PATTERN.sub("", question).strip()
+        if not query:
+            return ""
+
+        start = time.perf_counter()
+        rows = self.retriever.retrieve_rows(query, self.k, timings=timings)
+        timings["retrieve"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        documents = self.retriever.index.documents
+        context = self.SEPARATOR.join(self.header(documents[row]) + documents[row].page_content for row in self.select(rows))
+        timings["pack"] = time.perf_counter() - start
+        return context
+
+
+def load_context_builder(backend: Optional[str] = None) -> Optional[ContextBuilder]:
+    """Startup path: a ContextBuilder over the prebuilt knowledge index, or None if it is unavailable."""
+    try:
+        index = load_knowledge_index(create_embeddings(backend or os.getenv("KNOWLEDGE_EMBEDDINGS", "openai")))
+    except Exception as e:
+        print(f"load_context_builder() Error: {e}")
+        return None
+    return ContextBuilder(HybridRetriever(index)) if index is not None else None
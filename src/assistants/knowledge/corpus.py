@@ -0,0 +1,111 @@
+import hashlib
+import json
+import os
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from assistants.knowledge.chunker import CHUNKER_VERSION, CodeChunker
+from assistants.knowledge.dedup import THRESHOLD, MinHashDeduplicator
+
+KNOWLEDGE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "knowledge", "flet")
+
+# Corpus folders and the file extension read from each one
+CORPUS_FOLDERS = {
+    "__generated_json": ".json",
+    "__extracted_code": ".json",
+    "__organized_code": ".py",
+    "__generated_python": ".py",
+}
+# Folders of Python examples, split along the AST instead of by characters
+CODE_FOLDERS = ("__organized_code", "__generated_python")
+CHUNK_SIZE = 750
+CHUNK_OVERLAP = 30
+# Settings that change the chunks: part of both the fingerprint and the signature of the corpus
+SETTINGS = f"chunks:{CHUNK_SIZE}:{CHUNK_OVERLAP}:{CHUNKER_VERSION}:dedup:{THRESHOLD}"
+
+
+def list_corpus_files(knowledge_dir: str = KNOWLEDGE_DIR) -> list[str]:
+    """Corpus files, relative to knowledge_dir, in a stable order."""
+    files = []
+    for folder, extension in CORPUS_FOLDERS.items():
+        path = os.path.join(knowledge_dir, folder)
+        if not os.path.isdir(path):
+            continue
+        files.extend(f"{folder}/{name}" for name in sorted(os.listdir(path)) if name.endswith(extension))
+    return files
+
+
+def corpus_fingerprint(knowledge_dir: str = KNOWLEDGE_DIR) -> str:
+    """Hash of the corpus content and of the chunking and deduplication settings."""
+    digest = hashlib.sha256(SETTINGS.encode())
+    for relpath in list_corpus_files(knowledge_dir):
+        with open(os.path.join(knowledge_dir, relpath), "rb") as f:
+            digest.update(relpath.encode() + b"\0" + hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()
+
+
+def corpus_signature(knowledge_dir: str = KNOWLEDGE_DIR) -> str:
+    """
+    Cheap stand-in for corpus_fingerprint(): hash of the name, size and mtime of
+    each corpus file and of the settings. Only stats the files, so startup can
+    tell an unchanged corpus apart without reading it.
+    """
+    digest = hashlib.sha256(SETTINGS.encode())
+    for relpath in list_corpus_files(knowledge_dir):
+        stat_result = os.stat(os.path.join(knowledge_dir, relpath))
+        digest.update(f"{relpath}\0{stat_result.st_size}\0{stat_result.st_mtime_ns}\0".encode())
+    return digest.hexdigest()
+
+
+def read_source(knowledge_dir: str, relpath: str) -> list[tuple[str, dict]]:
+    """Texts of one corpus file, each with its metadata."""
+    folder = relpath.split("/", 1)[0]
+    with open(os.path.join(knowledge_dir, relpath), encoding="utf-8") as f:
+        if folder == "__generated_json":
+            data = json.load(f)
+            text = f"{data.get('file', '')}\n{data.get('description', '')}\n\n{data.get('examples', '')}"
+            return [(text, {})]
+        if folder == "__extracted_code":
+            data = json.load(f)
+            return [(snippet, {"url": data.get("url"), "snippet": i})
+                    for i, snippet in enumerate(data.get("code_snippets", []))]
+        return [(f.read(), {})]
+
+
+def load_corpus_documents(knowledge_dir: str = KNOWLEDGE_DIR, dedup: bool = True) -> list[Document]:
+    """
+    Reads the corpus and splits it into chunks.
+
+    Each Document's metadata has its source file ("source"), its folder
+    ("kind") and a "chunk_id" that is stable across builds of the same corpus.
+    With `dedup`, near-identical chunks (the same snippet in several folders)
+    are collapsed into one, whose metadata lists the chunk ids it replaces
+    ("duplicates") and all of their source files ("sources").
+    """
+    splitter = RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+    code_chunker = CodeChunker()
+    documents = []
+    for relpath in list_corpus_files(knowledge_dir):
+        try:
+            sources = read_source(knowledge_dir, relpath)
+        except (OSError, ValueError) as e:
+            print(f"load_corpus_documents() - {relpath} skipped: {e}")
+            continue
+        chunk = 0
+        kind = relpath.split("/", 1)[0]
+        for text, metadata in sources:
+            for piece in (code_chunker if kind in CODE_FOLDERS else splitter).split_text(text):
+                documents.append(Document(page_content=piece, metadata={
+                    **metadata,
+                    "source": relpath,
+                    "kind": kind,
+                    "chunk_id": f"{relpath}#{chunk}",
+                }))
+                chunk += 1
+    if not dedup:
+        return documents
+
+    unique = MinHashDeduplicator().deduplicate(documents)
+    if len(unique) < len(documents):
+        print(f"load_corpus_documents() - {len(documents) - len(unique)} near-duplicate chunks merged: "
+              f"{len(documents)} -> {len(unique)} ({1 - len(unique) / len(documents):.1%} smaller)")
+    return unique
@@ -0,0 +1,92 @@
+import re
+import zlib
+from collections import defaultdict
+import numpy as np
+from langchain_core.documents import Document
+
+TOKEN_PATTERN = re.compile(r"\w+")
+SHINGLE_SIZE = 5        # Words per shingle
+NUM_PERM = 128
+BANDS = 16              # LSH bands of NUM_PERM // BANDS rows: candidates from a Jaccard similarity of ~0.7
+THRESHOLD = 0.8         # Estimated Jaccard similarity from which two chunks are the same
+MERSENNE_PRIME = (1 << 61) - 1
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> np.ndarray:
+    """Hashes of the runs of `size` lowercased words of a text (the whole text when it is shorter)."""
+    words = TOKEN_PATTERN.findall(text.lower())
+    if not words:
+        return np.empty(0, dtype=np.uint64)
+    runs = {" ".join(words[i:i + size]) for i in range(max(1, len(words) - size + 1))}
+    return np.fromiter((zlib.crc32(run.encode()) for run in runs), dtype=np.uint64, count=len(runs))
+
+
+class MinHashDeduplicator:
+    """
+    Collapses near-identical chunks with MinHash signatures and LSH banding.
+
+    Each chunk becomes a signature of NUM_PERM minimum hashes of its word
+    shingles. Chunks sharing a band of the signature are candidates; those
+    whose signatures agree on at least `threshold` of the positions (an
+    estimate of the Jaccard similarity of their shingles) are merged. Each
+    group keeps its longest chunk (the last one on ties: the code folders come
+    last in the corpus), which gets the chunk ids and sources of the others in
+    "duplicates" and "sources".
+    """
+
+    def __init__(self, threshold: float = THRESHOLD, num_perm: int = NUM_PERM, bands: int = BANDS, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError(f"MinHashDeduplicator: {num_perm} permutations do not split in {bands} bands")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, MERSENNE_PRIME, num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, MERSENNE_PRIME, num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = shingles(text)
+        if len(hashes) == 0:
+            return np.full(len(self.a), MERSENNE_PRIME, dtype=np.uint64)
+        # Universal hashing (a * x + b) mod p; the uint64 products wrap, which keeps them deterministic
+        return ((np.outer(hashes, self.a) + self.b) % MERSENNE_PRIME).min(axis=0)
+
+    def groups(self, texts: list[str]) -> list[list[int]]:
+        """Groups of near-identical texts (by index, ascending); texts without duplicates are left out."""
+        signatures = np.stack([self.signature(t) for t in texts]) if texts else np.empty((0, len(self.a)), dtype=np.uint64)
+        parent = list(range(len(texts)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for band in range(self.bands):
+            buckets: dict[bytes, list[int]] = defaultdict(list)
+            columns = signatures[:, band * self.rows:(band + 1) * self.rows]
+            for i, row in enumerate(columns):
+                if texts[i].strip():
+                    buckets[row.tobytes()].append(i)
+            for members in buckets.values():
+                for other in members[1:]:
+                    first, second = find(members[0]), find(other)
+                    if first != second and np.mean(signatures[members[0]] == signatures[other]) >= self.threshold:
+                        parent[max(first, second)] = min(first, second)
+
+        clusters: dict[int, list[int]] = defaultdict(list)
+        for i in range(len(texts)):
+            clusters[find(i)].append(i)
+        return [members for members in clusters.values() if len(members) > 1]
+
+    def deduplicate(self, documents: list[Document]) -> list[Document]:
+        """The documents, in their order, with each group of near-duplicates reduced to its canonical chunk."""
+        dropped = set()
+        for members in self.groups([d.page_content for d in documents]):
+            canonical = max(members, key=lambda i: (len(documents[i].page_content), i))
+            others = [i for i in members if i != canonical]
+            metadata = documents[canonical].metadata
+            metadata["duplicates"] = [documents[i].metadata["chunk_id"] for i in others]
+            metadata["sources"] = list(dict.fromkeys(documents[i].metadata["source"] for i in [canonical, *others]))
+            dropped.update(others)
+        return [d for i, d in enumerate(documents) if i not in dropped]
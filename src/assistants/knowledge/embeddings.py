@@ -0,0 +1,190 @@
+import base64
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional
+import numpy as np
+import openai
+import orjson
+from langchain_core.embeddings import Embeddings
+from openai import OpenAI
+from assistants.knowledge.chunker import get_encoding
+from assistants.knowledge.corpus import load_corpus_documents
+from assistants.knowledge.index import INDEX_DIR, content_hash
+from assistants.knowledge.local_embeddings import HashingEmbeddings, TfidfSvdEmbeddings
+from assistants.utils.manager_tools import ManagerTools as mt
+
+
+class EmbeddingClient(Embeddings):
+    """
+    OpenAI embeddings for index builds: token-bounded batches, sent concurrently,
+    retried with jittered exponential backoff and checkpointed to disk.
+
+    Queries are embedded on the chat path, so embed_query() uses its own short
+    policy: `query_timeout` seconds per request and `query_attempts` attempts,
+    so an API outage fails fast and retrieval can fall back.
+
+    With `checkpoint_path`, the vectors of every finished batch are appended to
+    that file; an interrupted embed_documents() call resumes from it and only
+    requests the texts that are missing. The file is removed once all texts
+    are embedded.
+
+    Attributes:
+        MODEL (str): Default embedding model.
+        MAX_BATCH_TOKENS (int): Default token budget of one request.
+        MAX_BATCH_SIZE (int): Default number of texts in one request.
+        MAX_INPUT_TOKENS (int): Longer texts are truncated to this many tokens.
+        CONCURRENCY (int): Default number of requests in flight.
+        MAX_ATTEMPTS (int): Default attempts of a request before giving up.
+        QUERY_TIMEOUT (float): Default seconds of one embed_query() request.
+        QUERY_ATTEMPTS (int): Default attempts of an embed_query() request.
+        TRANSIENT_ERRORS (tuple): Errors that are retried.
+    """
+    MODEL = "text-embedding-3-small"
+    MAX_BATCH_TOKENS = 8000
+    MAX_BATCH_SIZE = 256
+    MAX_INPUT_TOKENS = 8191
+    CONCURRENCY = 4
+    MAX_ATTEMPTS = 6
+    QUERY_TIMEOUT = 5.0
+    QUERY_ATTEMPTS = 2
+    TRANSIENT_ERRORS = (openai.RateLimitError, openai.APIConnectionError,
+                        openai.APITimeoutError, openai.InternalServerError)
+
+    def __init__(self, model: str = MODEL, client: Optional[OpenAI] = None,
+                 concurrency: int = CONCURRENCY, max_batch_tokens: int = MAX_BATCH_TOKENS,
+                 max_batch_size: int = MAX_BATCH_SIZE, max_attempts: int = MAX_ATTEMPTS,
+                 backoff: float = 0.5, max_backoff: float = 20, checkpoint_path: Optional[str] = None,
+                 query_timeout: float = QUERY_TIMEOUT, query_attempts: int = QUERY_ATTEMPTS):
+        self.model = model
+        self.client = client or OpenAI(max_retries=0)   # Retries are done here, with backoff
+        self.query_client = self.client.with_options(timeout=query_timeout)
+        self.concurrency = concurrency
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_size = max_batch_size
+        self.checkpoint_path = checkpoint_path
+        self.encoding = get_encoding(model)
+        self.requests = 0
+        self.lock = threading.Lock()
+        self.request_batch = mt.RETRY(retry_on=self.TRANSIENT_ERRORS, attempts=max_attempts,
+                                      multiplier=backoff, max_wait=max_backoff)(self.request_batch)
+        self.request_query = mt.RETRY(retry_on=self.TRANSIENT_ERRORS, attempts=query_attempts,
+                                      multiplier=backoff, max_wait=backoff)(self.request_query)
+
+    # ========================
+    # Batching
+    # ========================
+    def truncate(self, text: str) -> tuple[str, int]:
+        """Returns the text cut to MAX_INPUT_TOKENS and its token count."""
+        if self.encoding is None:
+            text = text[:self.MAX_INPUT_TOKENS * 3]
+            return text, len(text) // 4 + 1
+        tokens = self.encoding.encode(text, disallowed_special=())
+        if len(tokens) > self.MAX_INPUT_TOKENS:
+            tokens = tokens[:self.MAX_INPUT_TOKENS]
+            text = self.encoding.decode(tokens)
+        return text, len(tokens)
+
+    def make_batches(self, texts: list[str]) -> list[list[int]]:
+        """Groups text positions into requests of at most max_batch_tokens and max_batch_size texts."""
+        batches, batch, batch_tokens = [], [], 0
+        for i, text in enumerate(texts):
+            _, tokens = self.truncate(text)
+            if batch and (batch_tokens + tokens > self.max_batch_tokens or len(batch) >= self.max_batch_size):
+                batches.append(batch)
+                batch, batch_tokens = [], 0
+            batch.append(i)
+            batch_tokens += tokens
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def request_batch(self, texts: list[str]) -> list[list[float]]:
+        with self.lock:
+            self.requests += 1
+        response = self.client.embeddings.create(model=self.model, input=[self.truncate(t)[0] for t in texts])
+        return [d.embedding for d in sorted(response.data, key=lambda d: d.index)]
+
+    def request_query(self, text: str) -> list[float]:
+        with self.lock:
+            self.requests += 1
+        response = self.query_client.embeddings.create(model=self.model, input=[self.truncate(text)[0]])
+        return response.data[0].embedding
+
+    # ========================
+    # Embeddings interface
+    # ========================
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        vectors: list[Optional[list[float]]] = [None] * len(texts)
+        checkpoint = self.load_checkpoint()
+        hashes = [content_hash(text) for text in texts]
+        todo = []
+        for i, h in enumerate(hashes):
+            if h in checkpoint:
+                vectors[i] = checkpoint[h]
+            else:
+                todo.append(i)
+        if checkpoint:
+            print(f"EmbeddingClient - resuming: {len(texts) - len(todo)} of {len(texts)} texts from checkpoint")
+
+        batches = [[todo[i] for i in batch] for batch in self.make_batches([texts[i] for i in todo])]
+        pool = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="embeddings")
+        try:
+            futures = {pool.submit(self.request_batch, [texts[i] for i in batch]): batch for batch in batches}
+            for future in as_completed(futures):
+                batch = futures[future]
+                result = future.result()
+                for i, vector in zip(batch, result):
+                    vectors[i] = vector
+                self.save_checkpoint([(hashes[i], vectors[i]) for i in batch])
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+        if self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+        return vectors
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.request_query(text)
+
+    # ========================
+    # Checkpoint
+    # ========================
+    def load_checkpoint(self) -> dict[str, list[float]]:
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return {}
+        vectors = {}
+        with open(self.checkpoint_path, "rb") as f:
+            for line in f:
+                try:
+                    record = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    break   # Line cut by the interruption
+                if record.get("model") != self.model:
+                    continue
+                vectors[record["hash"]] = np.frombuffer(base64.b64decode(record["vector"]), dtype=np.float32).tolist()
+        return vectors
+
+    def save_checkpoint(self, records: list[tuple[str, list[float]]]):
+        if not self.checkpoint_path:
+            return
+        with open(self.checkpoint_path, "ab") as f:
+            for h, vector in records:
+                f.write(orjson.dumps({"model": self.model, "hash": h,
+                                      "vector": base64.b64encode(np.asarray(vector, dtype=np.float32).tobytes()).decode()}))
+                f.write(b"\n")
+
+
+def create_embeddings(backend: str, checkpoint_path: Optional[str] = None) -> Embeddings:
+    """
+    Embeddings used for the knowledge index, by backend name:
+    "openai" (remote API), "hashing" or "tfidf" (in-process, no network).
+    """
+    if backend == "openai":
+        return EmbeddingClient(checkpoint_path=checkpoint_path)
+    if backend == "hashing":
+        return HashingEmbeddings()
+    if backend == "tfidf":
+        return TfidfSvdEmbeddings.load_or_fit(os.path.join(INDEX_DIR, "tfidf_svd.npz"),
+                                              lambda: [d.page_content for d in load_corpus_documents()])
+    raise ValueError(f"Invalid embeddings backend: {backend}")
@@ -0,0 +1,283 @@
+import hashlib
+import json
+import os
+import time
+from collections.abc import Sequence
+from typing import Optional
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from assistants.knowledge.bm25 import BM25Index
+from assistants.knowledge.chunker import token_counter
+from assistants.knowledge.corpus import KNOWLEDGE_DIR, corpus_fingerprint, corpus_signature, load_corpus_documents
+from assistants.knowledge.pack import KnowledgePack
+from assistants.knowledge.symbols import SymbolIndex
+
+INDEX_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "index", "flet")
+
+
+def embedding_model_name(embedding: Embeddings) -> str:
+    """Identifies the embedding model, so an index is only queried with the model that built it."""
+    return str(getattr(embedding, "model", None) or type(embedding).__name__)
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class KnowledgeIndex:
+    """
+    Vector index of the knowledge corpus, built offline and loaded with mmap.
+
+    Layout of `<index_dir>/v<FORMAT_VERSION>/`:
+        manifest.json   format version, embedding model, corpus fingerprint and signature,
+                        counts and the content hash of each chunk, in row order
+        vectors.npy     float32 matrix of normalized chunk embeddings, one row per document
+        documents.pack  page_content, metadata and token count of each document, in row
+                        order, in a single file read lazily (see KnowledgePack)
+        bm25.npz        BM25 postings of the chunks (see BM25Index)
+        symbols.json    Flet symbol table of the chunks (see SymbolIndex)
+
+    The lexical indexes are saved with the vectors, so loading the index never
+    parses the documents. The manifest is written last, so an interrupted build is never loaded.
+    Rebuilds reuse the vectors of chunks whose content hash is unchanged and
+    only embed new or modified chunks.
+
+    Attributes:
+        FORMAT_VERSION (int): Version of the on-disk layout.
+        FILES (tuple): Files of a version directory besides the manifest.
+    """
+    FORMAT_VERSION = 3
+    FILES = ("vectors.npy", "documents.pack", "bm25.npz", "symbols.json")
+
+    def __init__(self, vectors: np.ndarray, documents: Sequence[Document], manifest: dict, embedding: Embeddings,
+                 bm25: Optional[BM25Index] = None, symbols: Optional[SymbolIndex] = None):
+        self.vectors = vectors
+        self.documents = documents
+        self.manifest = manifest
+        self.embedding = embedding
+        # Only set on saved indexes; in-memory ones leave them to the retriever
+        self.bm25 = bm25
+        self.symbols = symbols
+
+    # ========================
+    # Build / save / load
+    # ========================
+    @classmethod
+    def build(cls, documents: list[Document], embedding: Embeddings, fingerprint: str,
+              previous: Optional["KnowledgeIndex"] = None) -> "KnowledgeIndex":
+        """
+        Embeds the documents into a new index.
+
+        With `previous` (built with the same embedding model), chunks whose content
+        hash is already in it keep their vector and are not sent to the embedding model.
+        """
+        hashes = [content_hash(d.page_content) for d in documents]
+        reusable = previous.rows_by_hash() if previous is not None else {}
+        missing = [i for i, h in enumerate(hashes) if h not in reusable]
+
+        dim = previous.vectors.shape[1] if previous is not None else 0
+        if missing:
+            embedded = np.asarray(embedding.embed_documents([documents[i].page_content for i in missing]), dtype=np.float32)
+            embedded = embedded.reshape(len(missing), -1)
+            norms = np.linalg.norm(embedded, axis=1, keepdims=True)
+            embedded /= np.where(norms == 0, 1, norms)
+            dim = embedded.shape[1]
+
+        vectors = np.empty((len(documents), dim), dtype=np.float32)
+        if missing:
+            vectors[missing] = embedded
+        for i, h in enumerate(hashes):
+            if h in reusable:
+                vectors[i] = previous.vectors[reusable[h]]
+
+        manifest = {
+            "format_version": cls.FORMAT_VERSION,
+            "embedding_model": embedding_model_name(embedding),
+            "corpus_fingerprint": fingerprint,
+            "count": len(documents),
+            "dim": int(dim),
+            "created": time.time(),
+            "embedded": len(missing),
+            "reused": len(documents) - len(missing),
+            "removed": len(set(reusable) - set(hashes)),
+            "merged": sum(len(d.metadata.get("duplicates", [])) for d in documents),
+            "chunks": hashes,
+        }
+        return cls(vectors, documents, manifest, embedding)
+
+    def rows_by_hash(self) -> dict[str, int]:
+        return {h: row for row, h in enumerate(self.manifest.get("chunks", []))}
+
+    @classmethod
+    def version_dir(cls, index_dir: str) -> str:
+        return os.path.join(index_dir, f"v{cls.FORMAT_VERSION}")
+
+    def save(self, index_dir: str = INDEX_DIR):
+        path = self.version_dir(index_dir)
+        os.makedirs(path, exist_ok=True)
+        manifest_path = os.path.join(path, "manifest.json")
+        if os.path.exists(manifest_path):
+            os.remove(manifest_path)
+
+        with open(os.path.join(path, "vectors.npy.tmp"), "wb") as f:
+            np.save(f, np.ascontiguousarray(self.vectors, dtype=np.float32))
+        os.replace(os.path.join(path, "vectors.npy.tmp"), os.path.join(path, "vectors.npy"))
+
+        KnowledgePack.compile(self.documents, os.path.join(path, "documents.pack"),
+                              self.manifest["corpus_fingerprint"], token_counter())
+
+        self.bm25 = self.bm25 or BM25Index(self.documents)
+        self.bm25.save(os.path.join(path, "bm25.tmp.npz"))
+        os.replace(os.path.join(path, "bm25.tmp.npz"), os.path.join(path, "bm25.npz"))
+        self.symbols = self.symbols if self.symbols is not None else SymbolIndex(self.documents)
+        self.symbols.save(os.path.join(path, "symbols.json.tmp"))
+        os.replace(os.path.join(path, "symbols.json.tmp"), os.path.join(path, "symbols.json"))
+
+        self.save_manifest(index_dir)
+
+    def save_manifest(self, index_dir: str = INDEX_DIR):
+        manifest_path = os.path.join(self.version_dir(index_dir), "manifest.json")
+        with open(manifest_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(manifest_path + ".tmp", manifest_path)
+
+    @classmethod
+    def load(cls, embedding: Embeddings, index_dir: str = INDEX_DIR, fingerprint: Optional[str] = None) -> "KnowledgeIndex":
+        """
+        Memory-maps a saved index.
+
+        Raises:
+            ValueError: When the index is missing, incomplete or unreadable, or was built
+                with another embedding model or from another corpus (fingerprint).
+        """
+        path = cls.version_dir(index_dir)
+        manifest_path = os.path.join(path, "manifest.json")
+        if not os.path.exists(manifest_path):
+            raise ValueError(f"KnowledgeIndex: no index at {path}")
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+
+        if manifest.get("format_version") != cls.FORMAT_VERSION:
+            raise ValueError(f"KnowledgeIndex: format version {manifest.get('format_version')} != {cls.FORMAT_VERSION}")
+        if manifest.get("embedding_model") != embedding_model_name(embedding):
+            raise ValueError(f"KnowledgeIndex: built with {manifest.get('embedding_model')}, "
+                             f"not {embedding_model_name(embedding)}")
+        if fingerprint is not None and manifest.get("corpus_fingerprint") != fingerprint:
+            raise ValueError("KnowledgeIndex: corpus changed since the index was built")
+
+        missing = [name for name in cls.FILES if not os.path.isfile(os.path.join(path, name))]
+        if missing:
+            raise ValueError(f"KnowledgeIndex: incomplete index at {path}, missing {', '.join(missing)}")
+        try:
+            vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r")
+            bm25 = BM25Index.load(os.path.join(path, "bm25.npz"))
+            symbols = SymbolIndex.load(os.path.join(path, "symbols.json"))
+            # Documents are parsed on access: startup does not read the corpus
+            documents = KnowledgePack(os.path.join(path, "documents.pack"))
+        except (OSError, EOFError, KeyError) as e:
+            # Unreadable or truncated files (np.load raises EOFError, a npz without an array KeyError)
+            raise ValueError(f"KnowledgeIndex: cannot read the index at {path}: {e}") from e
+        if vectors.shape[0] != manifest["count"] or len(documents) != manifest["count"] \
+                or documents.fingerprint != manifest["corpus_fingerprint"] or len(bm25.lengths) != manifest["count"]:
+            documents.close()
+            raise ValueError("KnowledgeIndex: index files do not match the manifest")
+        return cls(vectors, documents, manifest, embedding, bm25, symbols)
+
+    def close(self):
+        """Releases the mapped files of a loaded index."""
+        self.vectors = None
+        if hasattr(self.documents, "close"):
+            self.documents.close()
+
+    # ========================
+    # Search
+    # ========================
+    def search_by_vector(self, vector: np.ndarray, k: int = 4) -> list[tuple[int, float]]:
+        """Returns (row, cosine similarity) of the k closest documents, best first."""
+        if len(self.documents) == 0:
+            return []
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        scores = self.vectors @ (vector / norm if norm else vector)
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(row), float(scores[row])) for row in top]
+
+    def similarity_search_with_score(self, query: str, k: int = 4) -> list[tuple[Document, float]]:
+        vector = self.embedding.embed_query(query)
+        return [(self.documents[row], score) for row, score in self.search_by_vector(vector, k)]
+
+    def similarity_search(self, query: str, k: int = 4) -> list[Document]:
+        return [document for document, _ in self.similarity_search_with_score(query, k)]
+
+
+def build_knowledge_index(embedding: Embeddings, knowledge_dir: str = KNOWLEDGE_DIR, index_dir: str = INDEX_DIR,
+                          incremental: bool = True) -> KnowledgeIndex:
+    """
+    Offline build: chunks the corpus, embeds it and saves the index.
+
+    When `incremental`, the saved index (if built with the same embedding model)
+    provides the vectors of unchanged chunks, and nothing is rebuilt if the
+    corpus fingerprint did not change.
+    """
+    start = time.perf_counter()
+    fingerprint = corpus_fingerprint(knowledge_dir)
+    signature = corpus_signature(knowledge_dir)
+    previous = None
+    if incremental:
+        try:
+            previous = KnowledgeIndex.load(embedding, index_dir)
+        except ValueError as e:
+            print(f"build_knowledge_index() - full build: {e}")
+    if previous is not None and previous.manifest.get("corpus_fingerprint") == fingerprint:
+        if previous.manifest.get("corpus_signature") != signature:
+            # Same content, touched files: record the new signature so startup does not hash the corpus again
+            previous.manifest["corpus_signature"] = signature
+            previous.save_manifest(index_dir)
+        print(f"KnowledgeIndex - corpus unchanged, {previous.manifest['count']} chunks up to date")
+        return previous
+
+    index = KnowledgeIndex.build(load_corpus_documents(knowledge_dir), embedding, fingerprint, previous)
+    index.manifest["corpus_signature"] = signature
+    if previous is not None:
+        # Vectors were copied out of the mapped files; release them before replacing them
+        previous.close()
+    index.save(index_dir)
+    manifest = index.manifest
+    print(f"KnowledgeIndex - {manifest['count']} chunks at {index_dir}: {manifest['embedded']} embedded, "
+          f"{manifest['reused']} skipped (unchanged), {manifest['removed']} removed, "
+          f"{manifest['merged']} near-duplicates merged, "
+          f"in {time.perf_counter() - start:.1f}s")
+    return index
+
+
+def load_knowledge_index(embedding: Embeddings, knowledge_dir: str = KNOWLEDGE_DIR, index_dir: str = INDEX_DIR) -> Optional[KnowledgeIndex]:
+    """
+    Startup path: maps the prebuilt index, or returns None if it is missing or stale.
+
+    Staleness is checked with the corpus signature in the manifest, which only
+    stats the corpus files; the corpus is read and hashed only when it differs.
+    """
+    try:
+        index = KnowledgeIndex.load(embedding, index_dir)
+        if index.manifest.get("corpus_signature") != corpus_signature(knowledge_dir) \
+                and index.manifest["corpus_fingerprint"] != corpus_fingerprint(knowledge_dir):
+            index.close()
+            raise ValueError("KnowledgeIndex: corpus changed since the index was built")
+        return index
+    except ValueError as e:
+        print(f"load_knowledge_index() - {e}; run `python -m assistants.knowledge.index` to build it")
+        return None
+
+
+if __name__ == "__main__":
+    import sys
+    from dotenv import load_dotenv
+    from assistants.knowledge.embeddings import create_embeddings
+    load_dotenv(".env")
+    os.makedirs(INDEX_DIR, exist_ok=True)
+    embedding = create_embeddings(os.getenv("KNOWLEDGE_EMBEDDINGS", "openai"),
+                                  checkpoint_path=os.path.join(INDEX_DIR, "embeddings.checkpoint"))
+    build_knowledge_index(embedding, incremental="--full" not in sys.argv)
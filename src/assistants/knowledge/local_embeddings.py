@@ -0,0 +1,169 @@
+import hashlib
+import os
+import re
+import zlib
+from typing import Callable, Optional
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+class HashingEmbeddings(Embeddings):
+    """
+    In-process embeddings from hashed words and character n-grams.
+
+    Each text becomes a bag of its lowercased words, the parts of snake_case
+    words and the character 3/4-grams of every word, hashed into `dim` buckets.
+    Counts are log-scaled and the vector is L2-normalized. There is no model
+    to fit or download, and the same text always gets the same vector.
+    """
+    DIM = 1024
+    NGRAMS = (3, 4)
+    NGRAM_WEIGHT = 0.5      # Words count more than their n-grams
+
+    def __init__(self, dim: int = DIM):
+        self.dim = dim
+        self.model = f"local-hashing-{dim}"
+
+    def features(self, text: str) -> tuple[list[int], list[int]]:
+        """Hashed bucket ids of the words and of the n-grams of a text."""
+        words, ngrams = [], []
+        for word in TOKEN_PATTERN.findall(text.lower()):
+            words.append(zlib.crc32(word.encode()) % self.dim)
+            if "_" in word:
+                words.extend(zlib.crc32(part.encode()) % self.dim for part in word.split("_") if part)
+            padded = f"<{word}>"
+            for n in self.NGRAMS:
+                ngrams.extend(zlib.crc32(padded[i:i + n].encode()) % self.dim for i in range(len(padded) - n + 1))
+        return words, ngrams
+
+    def counts(self, text: str) -> np.ndarray:
+        words, ngrams = self.features(text)
+        vector = np.bincount(words, minlength=self.dim).astype(np.float32)
+        if ngrams:
+            vector += self.NGRAM_WEIGHT * np.bincount(ngrams, minlength=self.dim)
+        return vector
+
+    def transform(self, texts: list[str]) -> np.ndarray:
+        matrix = np.empty((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            matrix[row] = np.log1p(self.counts(text))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1, norms)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.transform(texts).tolist()
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.transform([text])[0].tolist()
+
+
+class TfidfSvdEmbeddings(Embeddings):
+    """
+    In-process dense embeddings: TF-IDF over hashed features, reduced with a
+    truncated SVD (latent semantic analysis) fitted on the corpus.
+
+    fit() learns the IDF weights and the `components` projection with a
+    randomized SVD in NumPy; the model name includes a hash of both, so an
+    index built with one fit is refused by another.
+    """
+    FEATURES = 2 ** 15
+    COMPONENTS = 256
+
+    def __init__(self, features: int = FEATURES, components: int = COMPONENTS):
+        self.hashing = HashingEmbeddings(dim=features)
+        self.n_components = components
+        self.idf: Optional[np.ndarray] = None
+        self.components: Optional[np.ndarray] = None
+        self.projection: Optional[np.ndarray] = None
+        self.model = "local-tfidf-svd-unfitted"
+
+    def sparse_rows(self, texts: list[str]) -> list[tuple[np.ndarray, np.ndarray]]:
+        """Sublinear term counts of each text as (feature ids, values)."""
+        rows = []
+        for text in texts:
+            counts = self.hashing.counts(text)
+            idx = np.flatnonzero(counts)
+            rows.append((idx, np.log1p(counts[idx])))
+        return rows
+
+    def weight(self, rows: list[tuple[np.ndarray, np.ndarray]]) -> list[tuple[np.ndarray, np.ndarray]]:
+        weighted = []
+        for idx, values in rows:
+            values = values * self.idf[idx]
+            norm = np.linalg.norm(values)
+            weighted.append((idx, values / norm if norm else values))
+        return weighted
+
+    def fit(self, texts: list[str], power_iterations: int = 2, oversampling: int = 10, seed: int = 0) -> "TfidfSvdEmbeddings":
+        rows = self.sparse_rows(texts)
+        df = np.zeros(self.hashing.dim, dtype=np.float32)
+        for idx, _ in rows:
+            df[idx] += 1
+        self.idf = (np.log((1 + len(rows)) / (1 + df)) + 1).astype(np.float32)
+        rows = self.weight(rows)
+
+        def times(matrix: np.ndarray) -> np.ndarray:       # X @ matrix
+            return np.stack([values @ matrix[idx] for idx, values in rows])
+
+        def times_transposed(matrix: np.ndarray) -> np.ndarray:    # X.T @ matrix
+            out = np.zeros((self.hashing.dim, matrix.shape[1]), dtype=np.float32)
+            for row, (idx, values) in enumerate(rows):
+                out[idx] += np.outer(values, matrix[row])
+            return out
+
+        # Randomized SVD (Halko et al.): range of X from random projections, then an exact SVD of a small matrix
+        k = min(self.n_components + oversampling, len(rows))
+        rng = np.random.default_rng(seed)
+        q, _ = np.linalg.qr(times(rng.standard_normal((self.hashing.dim, k)).astype(np.float32)))
+        for _ in range(power_iterations):
+            q, _ = np.linalg.qr(times_transposed(q))
+            q, _ = np.linalg.qr(times(q))
+        _, _, vt = np.linalg.svd(times_transposed(q).T, full_matrices=False)
+        self.components = np.ascontiguousarray(vt[:self.n_components], dtype=np.float32)
+        self.finalize()
+        return self
+
+    def finalize(self):
+        """Derives the projection and the model name from the fitted IDF and components."""
+        # Feature-major copy: projecting a text gathers contiguous rows
+        self.projection = np.ascontiguousarray(self.components.T)
+        digest = hashlib.sha256(self.idf.tobytes() + self.components.tobytes()).hexdigest()[:12]
+        self.model = f"local-tfidf-svd-{self.components.shape[0]}-{digest}"
+
+    def transform(self, texts: list[str]) -> np.ndarray:
+        if self.components is None:
+            raise ValueError("TfidfSvdEmbeddings: fit() or load() before embedding")
+        matrix = np.stack([values @ self.projection[idx] for idx, values in self.weight(self.sparse_rows(texts))]) \
+            if texts else np.empty((0, self.components.shape[0]), dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return (matrix / np.where(norms == 0, 1, norms)).astype(np.float32)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.transform(texts).tolist()
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.transform([text])[0].tolist()
+
+    def save(self, path: str):
+        np.savez(path, idf=self.idf, components=self.components)
+
+    @classmethod
+    def load(cls, path: str) -> "TfidfSvdEmbeddings":
+        data = np.load(path)
+        embedding = cls(features=data["idf"].shape[0], components=data["components"].shape[0])
+        embedding.idf = data["idf"]
+        embedding.components = data["components"]
+        embedding.finalize()
+        return embedding
+
+    @classmethod
+    def load_or_fit(cls, path: str, load_texts: Callable[[], list[str]]) -> "TfidfSvdEmbeddings":
+        """Loads the saved model; the training texts are only loaded when there is none to fit it."""
+        if os.path.exists(path):
+            return cls.load(path)
+        embedding = cls().fit(load_texts())
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        embedding.save(path)
+        return embedding
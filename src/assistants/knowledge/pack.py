@@ -0,0 +1,124 @@
+import hashlib
+import mmap
+import os
+import struct
+from collections.abc import Sequence
+from functools import lru_cache
+from typing import Callable, Optional
+import numpy as np
+import orjson
+from langchain_core.documents import Document
+
+MAGIC = b"FLETPACK"
+HEADER = struct.Struct("<8sII64sQQ")    # magic, version, count, corpus fingerprint, table offset, id table offset
+TABLE_DTYPE = np.dtype([("offset", "<u8"), ("length", "<u4"), ("tokens", "<u4")])
+ID_DTYPE = np.dtype([("key", "<u8"), ("row", "<u4")])
+
+
+def id_key(chunk_id: str) -> int:
+    return int.from_bytes(hashlib.blake2b(chunk_id.encode(), digest_size=8).digest(), "little")
+
+
+class KnowledgePack(Sequence):
+    """
+    All knowledge chunks in one binary file, read lazily through mmap.
+
+    Layout:
+        header      magic, format version, document count, corpus fingerprint,
+                    offsets of the two tables
+        records     one orjson object per document: page_content and metadata
+        table       per row: record offset, record length, token count
+        id table    (hash of chunk_id, row), sorted by hash, for lookups by id
+
+    Opening a pack only maps the file and reads the header; a document is
+    parsed when it is accessed, so the process pays for the chunks it uses.
+    It behaves as a read-only sequence of Documents.
+    """
+    VERSION = 1
+    CACHE_SIZE = 1024
+
+    def __init__(self, path: str):
+        self.path = path
+        self.file = open(path, "rb")
+        self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, fingerprint, table_offset, ids_offset = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC or version != self.VERSION:
+            self.close()
+            raise ValueError(f"KnowledgePack: {path} is not a version {self.VERSION} pack")
+        self.fingerprint = fingerprint.rstrip(b"\0").decode()
+        self.table = np.frombuffer(self.mm, dtype=TABLE_DTYPE, count=count, offset=table_offset)
+        self.ids = np.frombuffer(self.mm, dtype=ID_DTYPE, count=count, offset=ids_offset)
+        self.get = lru_cache(maxsize=self.CACHE_SIZE)(self.get)
+
+    @classmethod
+    def compile(cls, documents: list[Document], path: str, fingerprint: str = "",
+                count_tokens: Optional[Callable[[str], int]] = None) -> str:
+        """Writes the documents to a pack at path (through a temporary file) and returns the path."""
+        table = np.zeros(len(documents), dtype=TABLE_DTYPE)
+        ids = np.zeros(len(documents), dtype=ID_DTYPE)
+        with open(path + ".tmp", "wb") as f:
+            f.write(b"\0" * HEADER.size)
+            for row, document in enumerate(documents):
+                record = orjson.dumps({"page_content": document.page_content, "metadata": document.metadata})
+                table[row] = (f.tell(), len(record), count_tokens(document.page_content) if count_tokens else 0)
+                ids[row] = (id_key(str(document.metadata.get("chunk_id", row))), row)
+                f.write(record)
+            # np.frombuffer needs the tables aligned to their item size
+            f.write(b"\0" * (-f.tell() % 8))
+            table_offset = f.tell()
+            f.write(table.tobytes())
+            f.write(b"\0" * (-f.tell() % 8))
+            ids_offset = f.tell()
+            f.write(np.sort(ids, order="key").tobytes())
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, cls.VERSION, len(documents), fingerprint.encode()[:64], table_offset, ids_offset))
+        os.replace(path + ".tmp", path)
+        return path
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [self.get(i) for i in range(*row.indices(len(self)))]
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError(row)
+        return self.get(int(row))
+
+    def get(self, row: int) -> Document:
+        offset, length, _ = self.table[row]
+        record = orjson.loads(self.mm[offset:offset + length])
+        return Document(page_content=record["page_content"], metadata=record["metadata"])
+
+    def text(self, row: int) -> str:
+        return self[row].page_content
+
+    def token_count(self, row: int) -> int:
+        return int(self.table[row]["tokens"])
+
+    def row_of(self, chunk_id: str) -> Optional[int]:
+        key = id_key(chunk_id)
+        position = int(np.searchsorted(self.ids["key"], key))
+        while position < len(self.ids) and self.ids[position]["key"] == key:
+            row = int(self.ids[position]["row"])
+            if self[row].metadata.get("chunk_id") == chunk_id:
+                return row
+            position += 1
+        return None
+
+    def get_by_id(self, chunk_id: str) -> Optional[Document]:
+        row = self.row_of(chunk_id)
+        return None if row is None else self[row]
+
+    def close(self):
+        # The NumPy views must go before the map can be closed
+        self.table = self.ids = None
+        if getattr(self, "get", None) is not None and hasattr(self.get, "cache_clear"):
+            self.get.cache_clear()
+        try:
+            self.mm.close()
+        except BufferError:
+            pass
+        self.file.close()
@@ -0,0 +1,104 @@
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from langchain_core.documents import Document
+from assistants.knowledge.bm25 import BM25Index
+from assistants.knowledge.index import KnowledgeIndex
+from assistants.knowledge.symbols import SymbolIndex
+
+# ft.Card, on_long_press, CupertinoSlidingSegmentedButton, page.update()...
+IDENTIFIER_PATTERN = re.compile(r"(ft\.\w+|\w+[._]\w+|[A-Za-z]*[a-z][A-Z]\w*)(\(\))?")
+
+
+class HybridRetriever:
+    """
+    Retrieval over the knowledge chunks combining BM25 and vector search with
+    reciprocal rank fusion (RRF).
+
+    Both legs run concurrently. Queries made only of identifiers (control names,
+    properties, events) are answered by BM25 alone when it finds matches, which
+    skips the embedding call.
+
+    Before either leg, the Flet controls named in the query (ft.Card, DatePicker)
+    are looked up in the SymbolIndex: a query made only of them is answered with
+    their examples directly, otherwise their chunks are a third ranking in the fusion.
+
+    Attributes:
+        RRF_K (int): Rank offset of the fusion; higher values flatten the rank weights.
+        CANDIDATES (int): Results taken from each leg before fusion.
+        MAX_LEXICAL_WORDS (int): Longest query that can be treated as lexical-only.
+    """
+    RRF_K = 60
+    CANDIDATES = 20
+    MAX_LEXICAL_WORDS = 3
+    HYBRID = "hybrid"
+    LEXICAL = "lexical"
+    VECTOR = "vector"
+
+    def __init__(self, index: KnowledgeIndex, bm25: Optional[BM25Index] = None, symbols: Optional[SymbolIndex] = None):
+        self.index = index
+        # A saved index comes with its BM25 postings and symbol table; in-memory ones are indexed here
+        self.bm25 = bm25 or index.bm25 or BM25Index(index.documents)
+        if symbols is None:
+            symbols = index.symbols if index.symbols is not None else SymbolIndex(index.documents)
+        self.symbols = symbols
+        self.executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="retriever")
+
+    @classmethod
+    def is_lexical_query(cls, query: str) -> bool:
+        words = [w.strip("?!.,:;`'\"") for w in query.split()]
+        words = [w for w in words if w]
+        return 0 < len(words) <= cls.MAX_LEXICAL_WORDS and all(IDENTIFIER_PATTERN.fullmatch(w) for w in words)
+
+    def vector_search(self, query: str, k: int) -> list[tuple[int, float]]:
+        return self.index.search_by_vector(self.index.embedding.embed_query(query), k)
+
+    def retrieve(self, query: str, k: int = 4, mode: str = HYBRID, timings: Optional[dict] = None) -> list[Document]:
+        """
+        Returns the k best chunks for the query.
+
+        Args:
+            mode: "hybrid" (default), "lexical" (BM25 only) or "vector" (embeddings only).
+            timings: When given, filled with the seconds spent in each leg and in the fusion.
+        """
+        return [self.index.documents[row] for row in self.retrieve_rows(query, k, mode, timings)]
+
+    def retrieve_rows(self, query: str, k: int = 4, mode: str = HYBRID, timings: Optional[dict] = None) -> list[int]:
+        """Index rows of the k best chunks for the query, best first (see retrieve())."""
+        timings = {} if timings is None else timings
+
+        def timed(name, function, *args):
+            start = time.perf_counter()
+            result = function(*args)
+            timings[name] = time.perf_counter() - start
+            return result
+
+        named = timed("symbols", self.symbols.lookup, query, self.CANDIDATES) if mode == self.HYBRID else []
+        if mode == self.HYBRID and self.is_lexical_query(query):
+            if named:
+                return [row for row, _ in named[:k]]
+            lexical = timed("bm25", self.bm25.search, query, self.CANDIDATES)
+            if lexical:
+                return [row for row, _ in lexical[:k]]
+            return [row for row, _ in timed("vector", self.vector_search, query, k)]
+
+        if mode == self.LEXICAL:
+            return [row for row, _ in timed("bm25", self.bm25.search, query, k)]
+        if mode == self.VECTOR:
+            return [row for row, _ in timed("vector", self.vector_search, query, k)]
+        if mode != self.HYBRID:
+            raise ValueError(f"Invalid retrieval mode: {mode}")
+
+        vector_future = self.executor.submit(timed, "vector", self.vector_search, query, self.CANDIDATES)
+        lexical = timed("bm25", self.bm25.search, query, self.CANDIDATES)
+        vector = vector_future.result()
+        return timed("fusion", self.fuse, [named, vector, lexical], k)
+
+    def fuse(self, rankings: list[list[tuple[int, float]]], k: int) -> list[int]:
+        """Reciprocal rank fusion: each ranking adds 1 / (RRF_K + rank) to the rows it contains."""
+        scores: dict[int, float] = {}
+        for ranking in rankings:
+            for rank, (row, _) in enumerate(ranking, start=1):
+                scores[row] = scores.get(row, 0.0) + 1.0 / (self.RRF_K + rank)
+        return sorted(scores, key=scores.get, reverse=True)[:k]
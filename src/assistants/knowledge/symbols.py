@@ -0,0 +1,109 @@
+import ast
+import json
+import os
+import re
+from collections import Counter, defaultdict
+from collections.abc import Sequence
+from typing import Optional
+from langchain_core.documents import Document
+from assistants.knowledge.corpus import CODE_FOLDERS
+
+SYMBOL_PATTERN = re.compile(r"\bft\.([A-Z]\w*)")
+WORD_PATTERN = re.compile(r"\b(ft\.)?([A-Za-z]\w*)")
+CONTROL_FILE_PATTERN = re.compile(r"^docs_controls_(\w+?)(?:_json)?\.\w+$")
+
+
+def code_symbols(text: str) -> Counter:
+    """ft.<Name> attributes used by a piece of code; text that does not parse falls back to a regex."""
+    try:
+        tree = ast.parse(text)
+    except (SyntaxError, ValueError):
+        return Counter(SYMBOL_PATTERN.findall(text))
+    return Counter(node.attr for node in ast.walk(tree)
+                   if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name)
+                   and node.value.id == "ft" and node.attr[:1].isupper())
+
+
+class SymbolIndex:
+    """
+    Inverted index from Flet symbols (ft.<Name>) to the knowledge chunks that
+    use or document them, built with the knowledge index and saved next to it.
+
+    Chunks of the code folders are parsed with ast; the other chunks are
+    scanned for ft.<Name>. The chunks of a control's own documentation files
+    (docs_controls_<name>.py, docs_controls_<name>_json.py...) come first in
+    its postings, code examples before prose, then the chunks that mention it most.
+
+    Attributes:
+        MAX_POSTINGS (int): Rows kept per symbol.
+    """
+    MAX_POSTINGS = 64
+
+    def __init__(self, documents: Sequence[Document] = ()):
+        mentions: dict[str, Counter] = defaultdict(Counter)
+        own_files: dict[str, list[tuple[bool, int]]] = defaultdict(list)
+        for row, document in enumerate(documents):
+            text = document.page_content
+            is_code = document.metadata.get("kind") in CODE_FOLDERS
+            symbols = code_symbols(text) if is_code else Counter(SYMBOL_PATTERN.findall(text))
+            for symbol, count in symbols.items():
+                mentions[symbol][row] += count
+            # A merged chunk belongs to the documentation files of all of its duplicates
+            for source in document.metadata.get("sources") or [document.metadata.get("source", "")]:
+                match = CONTROL_FILE_PATTERN.match(os.path.basename(source))
+                if match:
+                    own_files[match.group(1).replace("_", "")].append((not is_code, row))
+
+        self.rows: dict[str, list[int]] = {}
+        for symbol, counter in mentions.items():
+            own = [row for _, row in sorted(own_files.get(symbol.lower(), []))]
+            owned = set(own)
+            ranked = own + [row for row, _ in counter.most_common() if row not in owned]
+            self.rows[symbol] = ranked[:self.MAX_POSTINGS]
+        self.finalize()
+
+    def finalize(self):
+        # ft.datepicker, ft.Datepicker... resolve to the symbol spelled in the corpus
+        self.names = {symbol.lower(): symbol for symbol in self.rows}
+
+    def save(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.rows, f)
+
+    @classmethod
+    def load(cls, path: str) -> "SymbolIndex":
+        symbols = cls()
+        with open(path, encoding="utf-8") as f:
+            symbols.rows = json.load(f)
+        symbols.finalize()
+        return symbols
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def mentions(self, query: str) -> list[str]:
+        """Known symbols named in the query: ft.<name> in any case, or a bare Name spelled as in the corpus."""
+        found = []
+        for prefix, word in WORD_PATTERN.findall(query):
+            if word[0].isupper() and word in self.rows:
+                symbol = word
+            else:
+                symbol = self.names.get(word.lower()) if prefix else None
+            if symbol is not None and symbol not in found:
+                found.append(symbol)
+        return found
+
+    def lookup(self, query: str, k: Optional[int] = None) -> list[tuple[int, float]]:
+        """
+        (row, score) of the chunks of the symbols named in the query, best first,
+        the postings of several symbols interleaved; [] when none is named.
+        """
+        postings = [self.rows[symbol] for symbol in self.mentions(query)]
+        ranked, seen = [], set()
+        for position in range(max((len(p) for p in postings), default=0)):
+            for rows in postings:
+                if position < len(rows) and rows[position] not in seen:
+                    seen.add(rows[position])
+                    ranked.append(rows[position])
+        ranked = ranked[:k] if k is not None else ranked
+        return [(row, 1.0 / (rank + 1)) for rank, row in enumerate(ranked)]
@@ -1,42 +1,147 @@
+import os
+import time
+from typing import Iterator, Optional
 from openai import OpenAI
 from dotenv import load_dotenv
+from assistants.knowledge.context import MENTION_PATTERN, ContextBuilder
+from assistants.utils.response_cache import ResponseCache
 load_dotenv(".env")
 
 class Programador:
-    CLIENT = OpenAI()
+    CLIENT = OpenAI()   # OPENAI_BASE_URL permite apontar para um servidor compatível local
     TEMPERATURE = 0.7
     MODEL = "gpt-3.5-turbo"
-    # VECTOR_STORE = None
-    def get_response(self, input, conversation_history) -> str:
+    ERROR_RESPONSE = "I'm not feeling ok... Would you mind if we talk another time?"
+    SYSTEM_MESSAGES = [
+        {'role': 'system', 'content': 'Você é um programador sênior especialista em Flet, OpenAI integrations, Python e LangChain'},
+        {'role': 'system', 'content': 'Você é bem descontraído em suas e piadista. Também sarcástico com suas respostas.'},
+        {'role': 'system', 'content': 'Responda às questões do usuário com um especilista técnico.  arguments'},
+        {'role': 'system', 'content': 'Dê respostas técnicas, estruturadas e detalhadas, preferindo manter as boas práticas de programação.'},
+        {'role': 'system', 'content': 'Prevaleça nas respostas para produção de código os princípios SOLID.'}]
+    # Com contexto da documentação, a resposta deve se apoiar nele e ser curta
+    GROUNDED_MESSAGE = ('Use os trechos da documentação do Flet abaixo quando forem relevantes para a pergunta. '
+                        'Responda de forma concisa: o código necessário e uma explicação curta, sem repetir a documentação.'
+                        '\n\n{context}')
+    # Respostas já dadas, por modelo/temperatura/pergunta/base de conhecimento; RESPONSE_CACHE_PATH="" desliga o disco
+    CACHE = ResponseCache(disk_path=os.getenv("RESPONSE_CACHE_PATH", "response_cache.db") or None)
+
+    def __init__(self, context_builder: Optional[ContextBuilder] = None):
+        # Sem índice da base de conhecimento, responde só com o modelo, como antes
+        self.context_builder = context_builder
+
+    def build_messages(self, input, conversation_history: list[dict], context: str = "") -> list[dict]:
+        # O histórico entra como mensagens de chat, já cortado ao orçamento de tokens da sala
+        grounding = [{'role': 'system', 'content': self.GROUNDED_MESSAGE.format(context=context)}] if context else []
+        return [
+            *self.SYSTEM_MESSAGES,
+            *grounding,
+            *conversation_history,
+            {'role': 'user', 'content': f'{input}'}]
+
+    def knowledge_version(self) -> str:
+        return self.context_builder.version if self.context_builder is not None else ""
+
+    def cache_key(self, input) -> str:
+        # A chave não leva o histórico da sala: ele cresce a cada mensagem e a pergunta repetida nunca
+        # coincidiria. O contexto recuperado depende só da pergunta e da base de conhecimento, então basta
+        # a versão da base, sem fazer a busca. A menção (@Programador) sai da pergunta, para que
+        # "@programador X" e "X @Programador" coincidam
+        question = MENTION_PATTERN.sub(" ", f"{input}")
+        return self.CACHE.make_key(self.MODEL, self.TEMPERATURE, question,
+                                   [self.SYSTEM_MESSAGES, self.knowledge_version()])
+
+    def cached_response(self, input) -> Optional[str]:
+        """Answer already given to the question, looked up before any API call."""
+        return self.CACHE.get(self.cache_key(input))
+
+    def retrieve_context(self, input, timings: dict) -> str:
+        if self.context_builder is None:
+            return ""
+        try:
+            return self.context_builder.build(input, timings)
+        except Exception as e:
+            print(f"Programador: retrieve_context() Error {e}")
+            return ""
+
+    @staticmethod
+    def log_timings(method: str, timings: dict):
+        if timings:
+            print(f"Programador: {method}() timings: " + ", ".join(f"{stage} {seconds * 1000:.0f} ms" for stage, seconds in timings.items()))
+
+    def get_response(self, input, conversation_history, lookup_cache: bool = True) -> str:
         print("Programador: get_response()")
+        key = self.cache_key(input)
+        cached = self.CACHE.get(key) if lookup_cache else None
+        if cached is not None:
+            return cached
 
+        timings = {}
+        context = self.retrieve_context(input, timings)
         try:
+            start = time.perf_counter()
             completion = self.CLIENT.chat.completions.create(
                 model=self.MODEL, # This model is better for extractions
                 # response_format={"type": "json_object"},
                 temperature=self.TEMPERATURE,
-                messages=[
-                    {'role': 'system', 'content': 'Você é um programador sênior especialista em Flet, OpenAI integrations, Python e LangChain'},
-                    {'role': 'system', 'content': 'Você é bem descontraído em suas e piadista. Também sarcástico com suas respostas.'},
-                    {'role': 'system', 'content': 'Responda às questões do usuário com um especilista técnico.  arguments'},
-                    {'role': 'system', 'content': 'Dê respostas técnicas, estruturadas e detalhadas, preferindo manter as boas práticas de programação.'},
-                    {'role': 'system', 'content': 'Prevaleça nas respostas para produção de código os princípios SOLID.'},
-                    {'role': 'system', 'content': f'Histórico de conversação:\n {conversation_history}'},
-                    {'role': 'user', 'content': f'{input}'}],
+                messages=self.build_messages(input, conversation_history, context),
                 # tools=functions_descriptions,
                 # tool_choice=tool_choice)
             )
+            timings["completion"] = time.perf_counter() - start
             print("Programador: get_response(): \n", completion)
             response = completion.choices[0].message.content
+            if response:
+                self.CACHE.put(key, response)
 
         except Exception as e:
             print(f"Programador: get_response() Error {e}")
-            response = "I'm not feeling ok... Would you mind if we talk another time?"
+            response = self.ERROR_RESPONSE
 
         finally:
+            self.log_timings("get_response", timings)
             return response
 
+    def stream_response(self, input, conversation_history, lookup_cache: bool = True) -> Iterator[str]:
+        """
+        Yields the completion text piece by piece, as the API streams it.
+
+        Args:
+            lookup_cache: False when the caller already missed cached_response() for this input.
+        """
+        print("Programador: stream_response()")
+        key = self.cache_key(input)
+        cached = self.CACHE.get(key) if lookup_cache else None
+        if cached is not None:
+            yield cached
+            return
+
+        timings = {}
+        context = self.retrieve_context(input, timings)
+        try:
+            start = time.perf_counter()
+            stream = self.CLIENT.chat.completions.create(
+                model=self.MODEL,
+                temperature=self.TEMPERATURE,
+                messages=self.build_messages(input, conversation_history, context),
+                stream=True,
+            )
+            parts = []
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    if not parts:
+                        timings["first_token"] = time.perf_counter() - start
+                    parts.append(chunk.choices[0].delta.content)
+                    yield parts[-1]
+            timings["completion"] = time.perf_counter() - start
+            self.log_timings("stream_response", timings)
+            if parts:
+                self.CACHE.put(key, "".join(parts))
+
+        except Exception as e:
+            print(f"Programador: stream_response() Error {e}")
+            yield self.ERROR_RESPONSE
+
 if __name__ == "__main__":
     programador = Programador()
     response = programador.get_response("Hello", conversation_history=[])
-    print(response)
\ No newline at end of file
+    print(response)
@@ -0,0 +1,96 @@
+import threading
+import time
+from collections import OrderedDict, deque
+from assistants.knowledge.chunker import get_encoding
+
+
+class RoomHistory:
+    """Chat messages of one room, with their token counts."""
+
+    def __init__(self):
+        self.messages: deque[tuple[dict, int]] = deque()
+        self.total_tokens = 0
+        self.last_used = time.monotonic()
+
+
+class ConversationMemory:
+    """
+    Conversation history kept per room and trimmed to a token budget.
+
+    Messages are stored as chat completion messages ({'role', 'content'}) and
+    the oldest ones are dropped once the room goes over `token_budget`.
+    Rooms that stay idle for `idle_ttl` seconds, or fall out of the
+    `max_rooms` most recently used ones, are evicted.
+
+    The memory is shared by the handler thread and the assistant worker pool, so
+    every access to the rooms goes through a lock (re-entrant: append and
+    get_messages call touch and evict_cold_rooms while holding it).
+
+    Attributes:
+        TOKEN_BUDGET (int): Default token budget of one room history.
+        MAX_ROOMS (int): Default number of room histories kept in memory.
+        IDLE_TTL (int): Default seconds without activity before a room is evicted.
+    """
+    TOKEN_BUDGET = 2000
+    MAX_ROOMS = 256
+    IDLE_TTL = 30 * 60
+    MESSAGE_OVERHEAD = 4    # Tokens the chat format adds around each message
+
+    def __init__(self, model: str, token_budget: int = TOKEN_BUDGET, max_rooms: int = MAX_ROOMS, idle_ttl: int = IDLE_TTL):
+        self.token_budget = token_budget
+        self.max_rooms = max_rooms
+        self.idle_ttl = idle_ttl
+        self.rooms: OrderedDict[str, RoomHistory] = OrderedDict()
+        self.lock = threading.RLock()
+        self.encoding = get_encoding(model)
+
+    def count_tokens(self, text: str) -> int:
+        if self.encoding is None:
+            return len(text) // 4 + 1    # Rough estimate when the tokenizer files are unavailable
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+    def append(self, room_id: str, role: str, content: str):
+        # Tokens are counted before taking the lock: the tokenizer is the slow part
+        tokens = self.count_tokens(content) + self.MESSAGE_OVERHEAD
+        with self.lock:
+            history = self.touch(room_id)
+            history.messages.append(({"role": role, "content": content}, tokens))
+            history.total_tokens += tokens
+
+            # Keeps at least the newest message, even when it alone is over budget
+            while history.total_tokens > self.token_budget and len(history.messages) > 1:
+                _, dropped = history.messages.popleft()
+                history.total_tokens -= dropped
+
+            self.evict_cold_rooms()
+
+    def get_messages(self, room_id: str) -> list[dict]:
+        with self.lock:
+            history = self.rooms.get(room_id)
+            if history is None:
+                return []
+            self.touch(room_id)
+            return [message for message, _ in history.messages]
+
+    def touch(self, room_id: str) -> RoomHistory:
+        with self.lock:
+            history = self.rooms.get(room_id)
+            if history is None:
+                history = self.rooms[room_id] = RoomHistory()
+            history.last_used = time.monotonic()
+            self.rooms.move_to_end(room_id)
+            return history
+
+    def evict_cold_rooms(self):
+        # Rooms are ordered by last use, so cold rooms are always at the front
+        now = time.monotonic()
+        with self.lock:
+            while self.rooms:
+                room_id, history = next(iter(self.rooms.items()))
+                if len(self.rooms) <= self.max_rooms and now - history.last_used < self.idle_ttl:
+                    break
+                del self.rooms[room_id]
+
+    def clear(self, room_id: str):
+        with self.lock:
+            self.rooms.pop(room_id, None)
@@ -1,8 +1,13 @@
-from tenacity import retry, wait_random_exponential, stop_after_attempt
+from tenacity import retry, retry_if_exception_type, wait_random_exponential, stop_after_attempt
 
 
 class ManagerTools:
-    RETRY = lambda: retry(wait=wait_random_exponential(multiplier=1, max=40), stop=stop_after_attempt(3))
+    # Jittered exponential backoff; retry_on limits the retries to transient errors
+    RETRY = lambda retry_on=Exception, attempts=3, multiplier=1, max_wait=40: retry(
+        wait=wait_random_exponential(multiplier=multiplier, max=max_wait),
+        stop=stop_after_attempt(attempts),
+        retry=retry_if_exception_type(retry_on),
+        reraise=True)
 
     @classmethod
     def debugger_exception_decorator(cls, func):
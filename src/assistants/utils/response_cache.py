@@ -0,0 +1,116 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+
+class ResponseCache:
+    """
+    Exact-match cache of assistant answers, with an in-memory LRU in front of a SQLite file.
+
+    Keys are built from the model, the temperature, the normalized question and a
+    hash of the context the answer depends on (system prompt, version of the
+    knowledge base...).
+    Entries expire after `ttl` seconds in both tiers; a disk hit is promoted
+    to the memory tier.
+
+    Attributes:
+        MAX_ENTRIES (int): Default number of answers kept in memory.
+        TTL (int): Default seconds an answer stays valid.
+    """
+    MAX_ENTRIES = 1024
+    TTL = 7 * 24 * 60 * 60
+
+    def __init__(self, disk_path: Optional[str] = None, max_entries: int = MAX_ENTRIES, ttl: int = TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self.lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self.db = None
+        if disk_path:
+            self.db = sqlite3.connect(disk_path, check_same_thread=False)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, response TEXT NOT NULL, created REAL NOT NULL)")
+            self.db.commit()
+
+    @staticmethod
+    def normalize(question: str) -> str:
+        return " ".join(question.casefold().split()).rstrip(" ?!.")
+
+    @classmethod
+    def make_key(cls, model: str, temperature: float, question: str, context) -> str:
+        context_hash = hashlib.sha256(json.dumps(context, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+        raw = json.dumps([model, temperature, cls.normalize(question), context_hash], ensure_ascii=False)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                response, created = entry
+                if now - created < self.ttl:
+                    self.entries.move_to_end(key)
+                    self.memory_hits += 1
+                    return response
+                del self.entries[key]
+
+            if self.db is not None:
+                row = self.db.execute("SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is not None and now - row[1] < self.ttl:
+                    self.remember(key, row[0], row[1])
+                    self.disk_hits += 1
+                    return row[0]
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, response: str):
+        created = time.time()
+        with self.lock:
+            self.remember(key, response, created)
+            if self.db is not None:
+                self.db.execute("INSERT OR REPLACE INTO responses (key, response, created) VALUES (?, ?, ?)",
+                                (key, response, created))
+                self.db.commit()
+
+    def remember(self, key: str, response: str, created: float):
+        self.entries[key] = (response, created)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def invalidate(self, key: str):
+        with self.lock:
+            self.entries.pop(key, None)
+            if self.db is not None:
+                self.db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.db.commit()
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            if self.db is not None:
+                self.db.execute("DELETE FROM responses")
+                self.db.commit()
+
+    def stats(self) -> dict:
+        with self.lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {"memory_hits": self.memory_hits,
+                    "disk_hits": self.disk_hits,
+                    "misses": self.misses,
+                    "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+                    "entries": len(self.entries)}
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
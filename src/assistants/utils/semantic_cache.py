@@ -0,0 +1,112 @@
+import hashlib
+import json
+import threading
+from typing import Callable, Optional
+import numpy as np
+
+
+class SemanticCache:
+    """
+    Cache of answers looked up by similarity of the question embedding.
+
+    Question vectors are kept normalized in one NumPy matrix, so a lookup is a
+    single matrix-vector product. An answer is returned when the cosine
+    similarity of the closest question is at least `threshold`. Once the
+    matrix is full, the oldest entries are overwritten.
+
+    An answer can depend on more than the question (the knowledge base it was
+    grounded on): `context` is hashed with each entry, and a lookup only
+    matches entries added with the same context.
+
+    Attributes:
+        THRESHOLD (float): Default minimum cosine similarity of a hit.
+        MAX_ENTRIES (int): Default number of questions kept.
+    """
+    THRESHOLD = 0.92
+    MAX_ENTRIES = 1024
+
+    def __init__(self, embed: Callable[[str], np.ndarray], threshold: float = THRESHOLD, max_entries: int = MAX_ENTRIES):
+        self.embed = embed
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.matrix: Optional[np.ndarray] = None    # Allocated on the first add, when the dimension is known
+        self.questions: list[Optional[str]] = [None] * max_entries
+        self.answers: list[Optional[str]] = [None] * max_entries
+        self.contexts = np.zeros(max_entries, dtype=np.uint64)
+        self.size = 0
+        self.next_slot = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def vector(self, question: str) -> Optional[np.ndarray]:
+        try:
+            vector = np.asarray(self.embed(question), dtype=np.float32)
+        except Exception as e:
+            print(f"SemanticCache - embed() Error: {e}")
+            return None
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    @staticmethod
+    def context_hash(context) -> np.uint64:
+        digest = hashlib.sha256(json.dumps(context, sort_keys=True, ensure_ascii=False).encode()).digest()
+        return np.uint64(int.from_bytes(digest[:8], "little"))
+
+    def search(self, vector: np.ndarray, context=None) -> tuple[int, float]:
+        """Returns the slot of the closest question and its similarity, or (-1, 0.0) when none matches the context."""
+        with self.lock:
+            return self.closest(vector, self.context_hash(context))
+
+    def closest(self, vector: np.ndarray, context_hash: np.uint64) -> tuple[int, float]:
+        # Callers hold the lock
+        if self.size == 0:
+            return -1, 0.0
+        scores = np.where(self.contexts[:self.size] == context_hash, self.matrix[:self.size] @ vector, -np.inf)
+        slot = int(np.argmax(scores))
+        return (slot, float(scores[slot])) if np.isfinite(scores[slot]) else (-1, 0.0)
+
+    def lookup(self, question: str, vector: Optional[np.ndarray] = None, context=None) -> Optional[str]:
+        vector = self.vector(question) if vector is None else vector
+        if vector is None:
+            return None
+        context_hash = self.context_hash(context)
+        # Search and read under the same lock, so a concurrent add() cannot overwrite the slot in between
+        with self.lock:
+            slot, score = self.closest(vector, context_hash)
+            if slot >= 0 and score >= self.threshold:
+                self.hits += 1
+                return self.answers[slot]
+            self.misses += 1
+            return None
+
+    def add(self, question: str, answer: str, vector: Optional[np.ndarray] = None, context=None):
+        vector = self.vector(question) if vector is None else vector
+        if vector is None:
+            return
+        context_hash = self.context_hash(context)
+        with self.lock:
+            if self.matrix is None:
+                self.matrix = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+            slot = self.next_slot
+            self.matrix[slot] = vector
+            self.questions[slot] = question
+            self.answers[slot] = answer
+            self.contexts[slot] = context_hash
+            self.next_slot = (slot + 1) % self.max_entries
+            self.size = max(self.size, slot + 1)
+
+    def clear(self):
+        with self.lock:
+            self.size = 0
+            self.next_slot = 0
+            self.questions = [None] * self.max_entries
+            self.answers = [None] * self.max_entries
+
+    def stats(self) -> dict:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {"hits": self.hits,
+                    "misses": self.misses,
+                    "hit_rate": self.hits / lookups if lookups else 0.0,
+                    "entries": self.size}
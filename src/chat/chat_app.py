@@ -1,35 +1,89 @@
+import itertools
 import os
+import threading
+from collections import OrderedDict
 from chat.chat_room import ChatRoom
 from chat.entities.message import Message
-from typing import Optional
+from typing import Callable, Optional
 from chat.entities.user import User
 from chat.entities.room import Room
 from chat.entities.message import Message
+from chat.entities.message_event import MessageEvent
+from chat.storage.base import ChatStorage
+from chat.storage.memory import MemoryStorage
+from chat.storage.sqlite import SQLiteStorage
+from assistants.assistants import Assistants
 
 class ChatApp:
-    def __init__(self):
-        self.rooms = {
-            "geral": ChatRoom("geral", "Sala Geral"),
-            "casual": ChatRoom("casual", "Bate-papo Casual"),
-            "estudos": ChatRoom("estudos", "Sala de Estudos"),
-            "programador": ChatRoom("programador", "Bate-papo com Assistente"),
-        }
+    DEFAULT_ROOMS = {
+        "geral": "Sala Geral",
+        "casual": "Bate-papo Casual",
+        "estudos": "Sala de Estudos",
+        "programador": "Bate-papo com Assistente",
+    }
+    PRESENCE_TOPIC = "presence"
+    LOG_DIR = "chat_log/"
+    DATABASE_PATH = "chat.db"
+    ASSISTANT_ROOMS = {"programador": "Programador"}    # Sala -> assistente que responde nela
+    MAX_DISPATCHED_IDS = 4096   # Ids de mensagens já despachadas mantidos para idempotência
+
+    def __init__(self, storage: Optional[ChatStorage] = None):
+        # Backend escolhido pela variável CHAT_STORAGE ("memory" ou "sqlite")
+        self.storage = storage or self.create_storage(os.getenv("CHAT_STORAGE", "memory"))
+        self.rooms: dict[str, ChatRoom] = {}
+        for room in self.storage.list_rooms():
+            chat_room = ChatRoom(room.room_id, room.room_name, owner=room.owner, private=room.private, storage=self.storage)
+            if room.current_users:
+                chat_room.room.current_users = list(room.current_users)
+            self.rooms[room.room_id] = chat_room
+        for room_id, room_name in self.DEFAULT_ROOMS.items():
+            if room_id not in self.rooms:
+                self.rooms[room_id] = ChatRoom(room_id, room_name, storage=self.storage)
+
         self.active_users: dict[str, User] = {}
         self.current_room = "geral"
         self.upload_dir = "uploads/"
         self.download_url = "http://127.0.0.1:3000/download/{filename}"
         os.makedirs(self.upload_dir, exist_ok=True)
 
+        # Um assistente por sala, compartilhado por todas as sessões
+        self.assistants = {room_id: Assistants(nome=nome) for room_id, nome in self.ASSISTANT_ROOMS.items()}
+        self.dispatched_ids: OrderedDict[str, None] = OrderedDict()
+        self.dispatch_lock = threading.Lock()
+
+    @classmethod
+    def create_storage(cls, backend: str) -> ChatStorage:
+        if backend == "memory":
+            return MemoryStorage(log_dir=cls.LOG_DIR)
+        if backend == "sqlite":
+            return SQLiteStorage(database_path=cls.DATABASE_PATH)
+        raise ValueError(f"Invalid storage backend: {backend}")
+
+    @staticmethod
+    def room_topic(room_id: str) -> str:
+        # Tópico pubsub da sala: só as sessões inscritas nela recebem as mensagens
+        return f"room:{room_id}"
+
     def add_user(self, user_name: str, user_id):
         new_user = User(user_name=user_name, 
                         user_id=user_id,
                         current_room_id='geral')
         
         self.active_users[user_id] = new_user
+        self.storage.save_user(new_user)
         print(f"User added: {self.active_users[user_id]}")
+
+    def remove_user(self, user_id: str) -> Optional[User]:
+        user = self.active_users.pop(user_id, None)
+        if user:
+            print(f"User removed: {user}")
+        return user
+
+    def get_user(self, user_id: str) -> Optional[User]:
+        return self.active_users.get(user_id) or self.storage.get_user(user_id)
     
     def new_room(self, room_id, room_name):
-        self.rooms[room_id] = ChatRoom(room_id, room_name)
+        self.rooms[room_id] = ChatRoom(room_id, room_name, storage=self.storage)
         print(f"Room added: {self.rooms[room_id].room}")
 
     def new_private_room(self, owner: str, reciver: str, room_id: str):
@@ -37,7 +91,8 @@ class ChatApp:
         self.rooms[room_id] = ChatRoom(room_id, 
                                 room_name,
                                 owner=owner,
-                                private=True)
+                                private=True,
+                                storage=self.storage)
         
         private_room = self.rooms[room_id]
         private_room.add_user(reciver)
@@ -46,4 +101,58 @@ class ChatApp:
     
     def add_message_to_room(self, message: Message):
         self.rooms[message.room_id].add_message(message)
-        print("Room current messages: \n", self.rooms[message.room_id].room.messages)
+        print(f"Message added to {message.room_id}: seq {message.seq}")
+
+    def post_message(self, message: Message, publish: Callable[[str, object], None]):
+        """
+        Entrada única das mensagens enviadas pelos usuários: salva a mensagem,
+        a publica na sala e, se for o caso, pede a resposta ao assistente da sala.
+
+        Args:
+            publish: send_all_on_topic do pubsub de uma sessão (o hub é comum a todas).
+        """
+        self.add_message_to_room(message)
+        publish(self.room_topic(message.room_id), message)
+        self.dispatch_to_assistant(message, publish)
+
+    def dispatch_to_assistant(self, message: Message, publish: Callable[[str, object], None]):
+        assistant = self.assistants.get(message.room_id)
+        if assistant is None or message.message_type != "chat_message" or message.user_name == assistant.nome:
+            return
+
+        # Cada mensagem é despachada uma única vez, mesmo que chegue repetida
+        with self.dispatch_lock:
+            if message.message_id in self.dispatched_ids:
+                return
+            self.dispatched_ids[message.message_id] = None
+            while len(self.dispatched_ids) > self.MAX_DISPATCHED_IDS:
+                self.dispatched_ids.popitem(last=False)
+
+        if not assistant.is_called(message):
+            assistant.process_message(message)
+            return
+
+        # A resposta é uma mensagem normal da sala, atualizada em todas as sessões à medida que chega
+        reply = assistant.format_response(Assistants.THINKING_TEXT)
+        reply.room_id = message.room_id
+        self.add_message_to_room(reply)
+        publish(self.room_topic(reply.room_id), reply)
+
+        # Cada patch é um evento separado no pubsub; o número crescente deixa as sessões descartarem os atrasados
+        versions = itertools.count(1)
+
+        def on_patch(text: str, done: bool):
+            version = next(versions)
+            if done:
+                self.edit_message(reply.room_id, reply.message_id, text)
+            publish(self.room_topic(reply.room_id),
+                    MessageEvent("edit", reply.room_id, reply.message_id, text, version=version))
+
+        if not assistant.submit_stream(message, on_patch):
+            on_patch(Assistants.BUSY_TEXT, True)
+
+    def edit_message(self, room_id: str, message_id: str, text: str) -> Optional[Message]:
+        return self.rooms[room_id].edit_message(message_id, text)
+
+    def delete_message(self, room_id: str, message_id: str) -> bool:
+        return self.rooms[room_id].delete_message(message_id)
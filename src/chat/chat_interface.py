@@ -1,14 +1,20 @@
 import os
+import threading
 import flet as ft
+from typing import Optional, Union
 from chat.chat_app import ChatApp
 from chat.chat_message import ChatMessage
 from chat.entities.message import Message
-from assistants.assistants import Assistants
+from chat.entities.message_event import MessageEvent
+from chat.entities.presence_event import PresenceEvent
 from chat.use_cases.dialogs import WelcomeDialog, NewRoomDialog
 from chat.utils.file_handler import FileHandler
 
 class ChatInterface:
-    programador_assistant = Assistants(nome="Programador")
+    HISTORY_PAGE_SIZE = 50          # Mensagens carregadas ao entrar, trocar de sala ou subir no chat
+    MAX_RENDERED_MESSAGES = 150     # Controles mantidos no ListView; os mais distantes são liberados
+    SCROLL_EDGE = 20                # Distância (px) ao topo/fundo que conta como "no limite"
+    PRESENCE_FLUSH_INTERVAL = 0.25  # Janela (s) em que entradas/saídas são agrupadas em uma só atualização
 
     def __init__(self, page: ft.Page, chat_app: ChatApp):
         self.page = page
@@ -16,6 +22,17 @@ class ChatInterface:
         self.page.title = "Chat em Tempo Real"
         self.user_name: str
         self.current_room = self.page.session.get("current_room") or self.chat_app.current_room
+        self.message_controls: dict[str, ChatMessage] = {}  # message_id -> controle exibido
+        self.history_exhausted = False      # Não há mensagens mais antigas para carregar
+        self.detached_from_tail = False     # As mensagens mais recentes foram liberadas do ListView
+        self.chat_at_bottom = True
+        self.loading_older = False
+        self.user_tiles: dict[str, ft.ListTile] = {}        # user_id -> ListTile no drawer
+        self.pending_presence: list[PresenceEvent] = []
+        self.presence_lock = threading.Lock()
+        self.presence_timer: Optional[threading.Timer] = None
+        # O Flet roda cada handler do pubsub em uma thread: os eventos de uma mensagem são aplicados um por vez
+        self.events_lock = threading.Lock()
 
         # Instancia os componentes de diálogo e file handler
         self.welcome_dialog = WelcomeDialog(self.join_chat_click)
@@ -26,8 +43,12 @@ class ChatInterface:
         self.page.overlay.append(self.welcome_dialog.dialog)
         self.page.overlay.append(self.new_room_dialog.dialog)
 
-        # Inscreve-se para receber mensagens via pubsub
-        self.page.pubsub.subscribe(self.on_message)
+        # Inscreve-se no tópico pubsub da sala atual
+        self.subscribed_room = None
+        self.subscribe_room(self.current_room)
+        # Entradas e saídas de usuários chegam como deltas no tópico de presença
+        self.page.pubsub.subscribe_topic(ChatApp.PRESENCE_TOPIC, self.on_presence)
+        self.page.on_close = self.on_page_close
 
         # Cria os componentes da interface divididos em blocos
         self.__create_menu_drawer()  # Menu lateral com salas e usuários online
@@ -61,14 +82,7 @@ class ChatInterface:
                     expand=True,
                 ),
                 # Bloco de usuários
-                ft.Column(
-                    controls=[
-                        ft.Divider(),
-                        ft.Text("Usuários Online", size=16, weight="bold", text_align="center"),
-                        *self.users_drawer_controls  # Lista de ListTile dos usuários
-                    ],
-                    alignment=ft.MainAxisAlignment.END
-                ),
+                self.users_column,
                 ft.Row([self.new_room_btn], alignment=ft.MainAxisAlignment.CENTER),
             ]
         )
@@ -99,36 +113,60 @@ class ChatInterface:
         ]
 
     def __create_users_drawer(self):
-        # Obtém os nomes dos usuários ativos a partir do dicionário active_users
-        current_users = [user.user_name for user in self.chat_app.active_users.values()]
-        self.users_drawer_controls = [
-            ft.ListTile(
-                leading=ft.Icon(ft.Icons.ACCOUNT_CIRCLE),
-                title=ft.Text(user),
-                on_click=lambda e, user=user: self.send_private_message(user),
-            ) for user in current_users
-        ]
-
-    def update_users_drawer(self):
-        # Atualiza dinamicamente a lista de usuários online utilizando active_users
-        current_users = [user.user_name for user in self.chat_app.active_users.values()]
-        self.users_drawer_controls = [
-            ft.ListTile(
-                leading=ft.Icon(ft.Icons.ACCOUNT_CIRCLE),
-                title=ft.Text(user),
-                on_click=lambda e, user=user: self.send_private_message(user),
-            ) for user in current_users
-        ]
-        # Atualiza o bloco de usuários dentro do menu_drawer
-        self.menu_drawer.controls[-2] = ft.Column(
+        # Obtém os usuários ativos a partir do dicionário active_users
+        self.user_tiles = {
+            user_id: self.create_user_tile(user.user_name)
+            for user_id, user in list(self.chat_app.active_users.items())
+        }
+        self.users_column = ft.Column(
             controls=[
                 ft.Divider(),
                 ft.Text("Usuários Online", size=16, weight="bold", text_align="center"),
-                *self.users_drawer_controls
+                *self.user_tiles.values()  # Lista de ListTile dos usuários
             ],
             alignment=ft.MainAxisAlignment.END
         )
-        self.page.update()
+
+    def create_user_tile(self, user_name: str) -> ft.ListTile:
+        return ft.ListTile(
+            leading=ft.Icon(ft.Icons.ACCOUNT_CIRCLE),
+            title=ft.Text(user_name),
+            on_click=lambda e, user=user_name: self.send_private_message(user),
+        )
+
+    def on_presence(self, topic: str, event: PresenceEvent):
+        # Agrupa as alterações de presença que chegam em rajada em uma só atualização do drawer
+        with self.presence_lock:
+            self.pending_presence.append(event)
+            if self.presence_timer is None:
+                self.presence_timer = threading.Timer(self.PRESENCE_FLUSH_INTERVAL, self.update_users_drawer)
+                self.presence_timer.daemon = True
+                self.presence_timer.start()
+
+    def update_users_drawer(self):
+        with self.presence_lock:
+            events, self.pending_presence = self.pending_presence, []
+            self.presence_timer = None
+
+        # Aplica os deltas como inserções/remoções por user_id na coluna existente
+        changed = False
+        for event in events:
+            if event.event_type == "join" and event.user_id not in self.user_tiles:
+                tile = self.create_user_tile(event.user_name)
+                self.user_tiles[event.user_id] = tile
+                self.users_column.controls.append(tile)
+                changed = True
+            elif event.event_type == "leave" and event.user_id in self.user_tiles:
+                self.users_column.controls.remove(self.user_tiles.pop(event.user_id))
+                changed = True
+
+        if changed and self.users_column.page:
+            self.users_column.update()
+
+    def on_page_close(self, e):
+        user_id = self.page.session.get("user_id")
+        if user_id and self.chat_app.remove_user(user_id):
+            self.page.pubsub.send_all_on_topic(ChatApp.PRESENCE_TOPIC, PresenceEvent("leave", user_id, self.page.session.get("user_name")))
 
     def open_drawer(self):
         self.page.drawer.open = True
@@ -159,7 +197,8 @@ class ChatInterface:
 
     def __create_chat_room(self):
         # Área de exibição das mensagens do chat
-        self.chat = ft.ListView(expand=True, spacing=10, auto_scroll=True)
+        # Sem auto_scroll: inserir páginas antigas no topo não deve pular para o fim
+        self.chat = ft.ListView(expand=True, spacing=10, on_scroll=self.on_chat_scroll, on_scroll_interval=100)
         self.chat_room_container = ft.Container(
             content=self.chat,
             border=ft.border.all(1, ft.Colors.OUTLINE),
@@ -237,17 +276,27 @@ class ChatInterface:
         private_room_id = self.chat_app.new_private_room(owner=self.user_name, reciver=user, room_id=private_room_id)
         self.change_room_by_id(private_room_id)
         
+    def subscribe_room(self, room_id: str):
+        # Troca a inscrição pubsub: sai do tópico da sala anterior e entra no da nova
+        if self.subscribed_room == room_id:
+            return
+        if self.subscribed_room is not None:
+            self.page.pubsub.unsubscribe_topic(ChatApp.room_topic(self.subscribed_room))
+        self.page.pubsub.subscribe_topic(ChatApp.room_topic(room_id), self.on_room_message)
+        self.subscribed_room = room_id
+
+    def publish(self, message: Union[Message, MessageEvent]):
+        self.page.pubsub.send_all_on_topic(ChatApp.room_topic(message.room_id), message)
+
     def change_room_by_id(self, room_id):
         print(f"Changing room to: {room_id}")
         self.page.session.set("current_room", room_id)
         # self.current_room = room_id
         self.current_room = room_id
+        self.subscribe_room(room_id)
         self.room_name.value = f"Sala: {self.chat_app.rooms[room_id].room.room_name}"
-        self.chat.controls.clear()
-        for msg in self.chat_app.rooms[room_id].room.messages:
-            self.on_message(msg) 
         self.page.drawer.open = False
-        self.page.update()
+        self.render_latest_messages()
 
     def save_new_room(self, e):
         room_name = self.new_room_dialog.room_name_field.value.strip()
@@ -281,8 +330,8 @@ class ChatInterface:
                 room_id=self.current_room,
             )
 
-            self.chat_app.add_message_to_room(message)
-            self.page.pubsub.send_all(message)
+            # O ChatApp salva, publica e despacha para o assistente uma única vez por mensagem
+            self.chat_app.post_message(message, self.page.pubsub.send_all_on_topic)
 
             self.new_message.value = ""
             self.new_message.focus()
@@ -302,33 +351,39 @@ class ChatInterface:
             self.user_name = self.page.session.get("user_name")
             self.user_id = self.page.session.get("user_id")
             self.current_room = self.page.session.get("current_room")
+            self.subscribe_room(self.current_room)
 
             self.chat_app.add_user(user_name=self.user_name, user_id=self.user_id)
             self.welcome_dialog.dialog.open = False
 
             # Carrega as mensagens existentes da sala atual
-            for msg in self.chat_app.rooms[self.current_room].room.messages:
-                self.on_message(msg) 
-
-            self.page.update()
+            self.render_latest_messages()
             
-            # Atualiza o drawer para que os usuários conectados vejam a lista atualizada
+            # Avisa a sala e atualiza o drawer de todas as sessões com o novo usuário
             msg = Message(user_name=user_name,
                           text=f"{user_name} entrou no chat.",
                           message_type="login_message",
                           room_id=self.current_room)
             
             self.chat_app.add_message_to_room(msg)
-            self.page.pubsub.send_all(msg)
+            self.publish(msg)
+            self.page.pubsub.send_all_on_topic(ChatApp.PRESENCE_TOPIC, PresenceEvent("join", self.user_id, self.user_name))
 
     def on_edit(self, chat_message: ChatMessage):
         def save_edit(e):
-            chat_message.message.text = edit_field.value
+            message = chat_message.message
+            edit_dlg.open = False
+            if message.message_id and self.chat_app.edit_message(message.room_id, message.message_id, edit_field.value):
+                # A edição é aplicada em todas as sessões da sala através do pubsub
+                self.publish(MessageEvent("edit", message.room_id, message.message_id, edit_field.value,
+                                          version=chat_message.version + 1))
+                self.page.update()
+                return
+            message.text = edit_field.value
             # Atualiza a interface da mensagem editada
             chat_message.controls[1].controls[1].value = chat_message.message.text  
             chat_message.controls[1].controls[1].update()
             chat_message.update()
-            edit_dlg.open = False
             self.page.update()
 
         edit_field = ft.TextField(value=chat_message.message.text)
@@ -345,31 +400,55 @@ class ChatInterface:
         self.page.update()
 
     def on_delete(self, chat_message: ChatMessage):
+        message = chat_message.message
+        if message.message_id and self.chat_app.delete_message(message.room_id, message.message_id):
+            self.publish(MessageEvent("delete", message.room_id, message.message_id))
+            return
         self.chat.controls.remove(chat_message)
         self.page.update()
 
+    def on_message_event(self, event: MessageEvent):
+        with self.events_lock:
+            chat_message = self.message_controls.get(event.message_id)
+            if chat_message is None:
+                return
+            if event.event_type == "edit":
+                # Os handlers podem terminar fora de ordem: um patch atrasado não sobrescreve o texto final
+                if not chat_message.set_text(event.text, event.version):
+                    return
+            elif event.event_type == "delete":
+                del self.message_controls[event.message_id]
+                self.chat.controls.remove(chat_message)
+        self.page.update()
+
+    def on_room_message(self, topic: str, message: Union[Message, MessageEvent]):
+        if isinstance(message, MessageEvent):
+            self.on_message_event(message)
+            return
+        self.on_message(message)
+
     def on_message(self, message: Message):
-        # Processa apenas mensagens da sala atual
+        # Processa apenas mensagens da sala atual (protege contra entregas
+        # que chegam durante uma troca de sala)
         if message.room_id != self.page.session.get("current_room"):
             return
 
         if message.message_type == "chat_message":
-            m = ChatMessage(message, self.on_edit, self.on_delete)
             print("Messagem enviada: \n", message)
         
-        if message.message_type == "login_message":
+        self.append_message_control(self.create_message_control(message))
+
+    # ========================
+    # Renderização em janela do histórico
+    # ========================
+    def create_message_control(self, message: Message) -> Optional[ft.Control]:
+        if message.message_type == "chat_message":
+            m = ChatMessage(message, self.on_edit, self.on_delete)
+            if message.message_id:
+                self.message_controls[message.message_id] = m
+
+        elif message.message_type == "login_message":
             m = ft.Text(message.text, italic=True, color=ft.Colors.WHITE, size=12)
-            self.chat.controls.append(m)
-            self.update_users_drawer()
-            self.page.update()
-            return
-        
-        elif message.room_id == "programador":
-            assistant_response = self.programador_assistant.process_message(message)
-            if assistant_response:
-                ass_m = ChatMessage(assistant_response, self.on_edit, self.on_delete)
-                self.chat.controls.append(ass_m)
-                self.page.update()
 
         elif message.message_type == "file_message":
             file_ext = os.path.splitext(message.file.file_path)[1].lower()
@@ -386,13 +465,87 @@ class ChatInterface:
                         on_click=lambda _: self.page.launch_url(message.file.file_url)
                     )
                 ])
+        else:
+            return None
 
-        self.chat.controls.append(m)
+        # O seq identifica o controle para paginação e para o scroll_to
+        if message.seq is not None:
+            m.data = message.seq
+            m.key = f"msg-{message.seq}"
+        return m
+
+    def render_latest_messages(self):
+        # Materializa apenas a página mais recente da sala atual
+        self.chat.controls.clear()
+        self.message_controls.clear()
+        messages = self.chat_app.rooms[self.current_room].get_latest_messages(self.HISTORY_PAGE_SIZE)
+        self.chat.controls.extend(c for c in map(self.create_message_control, messages) if c)
+        self.history_exhausted = len(messages) < self.HISTORY_PAGE_SIZE
+        self.detached_from_tail = False
+        self.chat_at_bottom = True
         self.page.update()
+        self.chat.scroll_to(offset=-1)
 
-        if message.room_id == "programador":
-            assistant_response = self.programador_assistant.process_message(message)
-            if assistant_response:
-                ass_m = ChatMessage(assistant_response, self.on_edit, self.on_delete)
-                self.chat.controls.append(ass_m)
-                self.page.update()
\ No newline at end of file
+    def append_message_control(self, control: Optional[ft.Control]):
+        # Enquanto o usuário lê páginas antigas, o fim da lista não está materializado;
+        # as mensagens novas aparecem quando ele voltar ao fundo do chat
+        if control is None:
+            return
+        if self.detached_from_tail:
+            self.forget_message_control(control)
+            return
+        self.chat.controls.append(control)
+        self.release_message_controls(from_top=True)
+        self.page.update()
+        if self.chat_at_bottom:
+            self.chat.scroll_to(offset=-1, duration=200)
+
+    def on_chat_scroll(self, e: ft.OnScrollEvent):
+        self.chat_at_bottom = e.pixels >= e.max_scroll_extent - self.SCROLL_EDGE
+        if e.pixels <= e.min_scroll_extent + self.SCROLL_EDGE:
+            self.load_older_messages()
+        elif self.chat_at_bottom and self.detached_from_tail:
+            self.render_latest_messages()
+
+    def load_older_messages(self):
+        if self.history_exhausted or self.loading_older:
+            return
+        before_seq = next((c.data for c in self.chat.controls if c.data is not None), None)
+        if before_seq is None:
+            return
+
+        self.loading_older = True
+        try:
+            messages = self.chat_app.rooms[self.current_room].get_messages(before_seq=before_seq, limit=self.HISTORY_PAGE_SIZE)
+            self.history_exhausted = len(messages) < self.HISTORY_PAGE_SIZE
+            if not messages:
+                return
+            anchor = self.chat.controls[0].key
+            self.chat.controls[0:0] = [c for c in map(self.create_message_control, messages) if c]
+            self.release_message_controls(from_top=False)
+            self.page.update()
+            # Mantém visível a mensagem que estava no topo antes de carregar a página
+            if anchor:
+                self.chat.scroll_to(key=anchor)
+        finally:
+            self.loading_older = False
+
+    def release_message_controls(self, from_top: bool):
+        # Libera os controles mais distantes da posição de leitura do usuário
+        excess = len(self.chat.controls) - self.MAX_RENDERED_MESSAGES
+        if excess <= 0:
+            return
+        if from_top:
+            released = self.chat.controls[:excess]
+            del self.chat.controls[:excess]
+            self.history_exhausted = False
+        else:
+            released = self.chat.controls[-excess:]
+            del self.chat.controls[-excess:]
+            self.detached_from_tail = True
+        for control in released:
+            self.forget_message_control(control)
+
+    def forget_message_control(self, control: ft.Control):
+        if isinstance(control, ChatMessage) and control.message.message_id:
+            self.message_controls.pop(control.message.message_id, None)
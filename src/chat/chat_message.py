@@ -5,6 +5,7 @@ class ChatMessage(ft.Row):
     def __init__(self, message: Message, on_edit, on_delete):
         super().__init__()
         self.message = message
+        self.version = 0    # version do último MessageEvent aplicado ao texto
         self.controls = [
             ft.CircleAvatar(
                 content=ft.Text(self.get_initials(message.user_name)),
@@ -20,6 +21,15 @@ class ChatMessage(ft.Row):
             ft.IconButton(icon=ft.Icons.DELETE, on_click=lambda e: on_delete(self)),
         ]
 
+    def set_text(self, text: str, version: int = 0) -> bool:
+        """Troca o texto exibido; retorna False (e não faz nada) se já foi aplicada uma versão mais nova."""
+        if version < self.version:
+            return False
+        self.version = version
+        self.message.text = text
+        self.controls[1].controls[1].value = text
+        return True
+
     def get_initials(self, user_name: str):
         return user_name[:1].capitalize() if user_name else "?"
 
@@ -1,15 +1,31 @@
+import threading
+import uuid
+from collections import OrderedDict
 from typing import Optional
 from chat.entities.message import Message
 from chat.entities.room import Room
+from chat.storage.base import ChatStorage
+from chat.storage.memory import MemoryStorage
 
 
 class ChatRoom:
-    def __init__(self, room_id: str, room_name: str, owner=None, private=False):
+    HOT_WINDOW = 500    # Mensagens mais recentes mantidas em memória na sala
+    PAGE_SIZE = 50      # Tamanho padrão de uma página de histórico
+
+    def __init__(self, room_id: str, room_name: str, owner=None, private=False,
+                 hot_window: Optional[int] = None, storage: Optional[ChatStorage] = None):
         self.room = Room(room_id=room_id, 
                          room_name=room_name,
                          owner=owner if owner else 'system',
-                         messages=[],
+                         messages=OrderedDict(),
                          private=private)
+        self.hot_window = hot_window or self.HOT_WINDOW
+        self.storage = storage or MemoryStorage()
+        # message_id -> seq das mensagens da janela quente; as outras são buscadas no storage
+        self.hot_ids: dict[str, int] = {}
+        # O Flet roda os handlers em threads: o seq, a janela quente e a gravação no storage
+        # de uma sala mudam juntos, sob este lock
+        self.lock = threading.RLock()
         
         if private and owner:
             try:
@@ -19,24 +35,90 @@ class ChatRoom:
         
             except Exception as ex:
                 print(ex)
+
+        # O storage armazena o histórico completo; a janela quente é carregada dele
+        self.storage.save_room(self.room)
+        self.next_seq = self.storage.last_seq(room_id) + 1
+        for message in self.storage.get_messages(room_id, None, self.hot_window):
+            self.room.messages[message.seq] = message
+            self.hot_ids[message.message_id] = message.seq
         
     def add_message(self, message: Message):
         if message.room_id != self.room.room_id:
             return
-        self.room.messages.append(message)
+        with self.lock:
+            message.seq = self.next_seq
+            message.message_id = message.message_id or uuid.uuid4().hex
+            self.next_seq += 1
+            self.storage.save_message(message)
+            self.room.messages[message.seq] = message
+            self.hot_ids[message.message_id] = message.seq
+
+            # Quando a janela quente enche, a mensagem mais antiga fica só no storage
+            if len(self.room.messages) > self.hot_window:
+                _, oldest = self.room.messages.popitem(last=False)
+                self.hot_ids.pop(oldest.message_id, None)
+
+    def find_seq(self, message_id: str) -> Optional[int]:
+        with self.lock:
+            seq = self.hot_ids.get(message_id)
+            return seq if seq is not None else self.storage.find_seq(self.room.room_id, message_id)
+
+    def edit_message(self, message_id: str, text: str) -> Optional[Message]:
+        """Edita a mensagem (na janela quente ou só no storage) e a retorna, ou None se não existir."""
+        with self.lock:
+            seq = self.find_seq(message_id)
+            if seq is None:
+                return None
+            self.storage.update_message(self.room.room_id, seq, text)
+            message = self.room.messages.get(seq)
+            if message is None:
+                return self.storage.get_message(self.room.room_id, seq)
+            message.text = text
+            return message
+
+    def delete_message(self, message_id: str) -> bool:
+        with self.lock:
+            seq = self.find_seq(message_id)
+            if seq is None:
+                return False
+            self.hot_ids.pop(message_id, None)
+            self.room.messages.pop(seq, None)
+            self.storage.remove_message(self.room.room_id, seq)
+            return True
 
     def remove_message(self, message: Message):
-        self.room.messages.remove(message)
+        self.delete_message(message.message_id)
 
     def add_user(self, user_name):
         self.room.current_users.append(user_name)
+        self.storage.add_room_user(self.room.room_id, user_name)
 
     def remove_user(self, user_name):
         self.room.current_users.remove(user_name)
 
-    def get_messages(self) -> Optional[list[Message]]:
-        return self.room.messages
+    def get_messages(self, before_seq: Optional[int] = None, limit: int = PAGE_SIZE) -> list[Message]:
+        """Retorna até `limit` mensagens com seq anterior a `before_seq`, da mais antiga para a mais recente."""
+        with self.lock:
+            page = []
+            for message in reversed(self.room.messages.values()):
+                if len(page) >= limit:
+                    break
+                if before_seq is None or message.seq < before_seq:
+                    page.append(message)
+            page.reverse()
+
+            if len(page) < limit:
+                cold_before = page[0].seq if page else before_seq
+                oldest_hot_seq = next(iter(self.room.messages), None)
+                if oldest_hot_seq is not None and (cold_before is None or cold_before > oldest_hot_seq):
+                    cold_before = oldest_hot_seq
+                page = self.storage.get_messages(self.room.room_id, cold_before, limit - len(page)) + page
+            return page
+
+    def get_latest_messages(self, limit: int = PAGE_SIZE) -> list[Message]:
+        return self.get_messages(limit=limit)
 
     def get_users(self) -> Optional[list[str]]:
         return self.room.current_users
-    
\ No newline at end of file
+    
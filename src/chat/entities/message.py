@@ -8,4 +8,6 @@ class Message:
     message_type: str
     room_id: Optional[str] = None
     to_user: Optional[str] = None
-    file: Optional[File] = None
\ No newline at end of file
+    file: Optional[File] = None
+    seq: Optional[int] = None
+    message_id: Optional[str] = None
\ No newline at end of file
@@ -0,0 +1,12 @@
+from dataclasses import dataclass
+from typing import Optional
+
+@dataclass
+class MessageEvent:
+    # Alteração a uma mensagem já enviada ("edit" ou "delete"), endereçada pelo message_id
+    event_type: str
+    room_id: str
+    message_id: str
+    text: Optional[str] = None
+    # Edições de uma mesma mensagem em ordem crescente (patches do streaming); a sessão descarta as atrasadas
+    version: int = 0
@@ -0,0 +1,8 @@
+from dataclasses import dataclass
+
+@dataclass
+class PresenceEvent:
+    # Entrada ("join") ou saída ("leave") de um usuário, enviada a todas as sessões
+    event_type: str
+    user_id: str
+    user_name: str
@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, OrderedDict
 from chat.entities.message import Message
 from chat.entities.user import User
 
@@ -8,6 +8,6 @@ class Room:
     room_id: str
     room_name: str
     owner: Optional[str] = None
-    messages: Optional[list[Message]] = None
+    messages: Optional[OrderedDict[int, Message]] = None   # seq -> Message (janela quente)
     current_users: Optional[list[str]] = None
     private: bool = False
\ No newline at end of file
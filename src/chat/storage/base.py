@@ -0,0 +1,77 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+from chat.entities.message import Message
+from chat.entities.room import Room
+from chat.entities.user import User
+
+
+class ChatStorage(ABC):
+    """Interface de armazenamento do ChatApp: salas, mensagens e usuários.
+
+    As mensagens são identificadas por (room_id, seq); o seq é atribuído pelo
+    ChatRoom antes de save_message ser chamado.
+    """
+
+    # ========================
+    # Salas
+    # ========================
+    @abstractmethod
+    def save_room(self, room: Room) -> None:
+        """Salva a sala (sem as mensagens). Não faz nada se a sala já existir."""
+
+    @abstractmethod
+    def add_room_user(self, room_id: str, user_name: str) -> None:
+        ...
+
+    @abstractmethod
+    def list_rooms(self) -> list[Room]:
+        """Retorna as salas na ordem de criação, com current_users preenchido."""
+
+    # ========================
+    # Mensagens
+    # ========================
+    @abstractmethod
+    def save_message(self, message: Message) -> None:
+        ...
+
+    @abstractmethod
+    def update_message(self, room_id: str, seq: int, text: str) -> None:
+        ...
+
+    @abstractmethod
+    def remove_message(self, room_id: str, seq: int) -> None:
+        ...
+
+    @abstractmethod
+    def get_message(self, room_id: str, seq: int) -> Optional[Message]:
+        ...
+
+    @abstractmethod
+    def find_seq(self, room_id: str, message_id: str) -> Optional[int]:
+        """seq da mensagem com esse message_id, ou None se não existir (ou tiver sido removida)."""
+
+    @abstractmethod
+    def get_messages(self, room_id: str, before_seq: Optional[int], limit: int) -> list[Message]:
+        """Retorna até `limit` mensagens com seq < before_seq, da mais antiga para a mais recente."""
+
+    @abstractmethod
+    def last_seq(self, room_id: str) -> int:
+        """Maior seq já usado na sala (mesmo que a mensagem tenha sido removida), ou 0 se a sala não tiver mensagens."""
+
+    # ========================
+    # Usuários
+    # ========================
+    @abstractmethod
+    def save_user(self, user: User) -> None:
+        ...
+
+    @abstractmethod
+    def get_user(self, user_id: str) -> Optional[User]:
+        ...
+
+    @abstractmethod
+    def list_users(self) -> list[User]:
+        ...
+
+    def close(self) -> None:
+        pass
@@ -0,0 +1,190 @@
+from typing import Optional
+from chat.entities.message import Message
+from chat.entities.room import Room
+from chat.entities.user import User
+from chat.storage.base import ChatStorage
+from chat.utils.message_log import MessageLog, message_from_record, message_to_record
+
+
+class MessageSeqIndex:
+    """Histórico de uma sala em memória, indexado por seq.
+
+    As mensagens chegam em ordem de seq, por isso a posição na lista é
+    calculada a partir do seq e a paginação não precisa de percorrer o histórico.
+    """
+    def __init__(self):
+        self.first_seq: Optional[int] = None
+        self.messages: list[Optional[Message]] = []
+        self.ids: dict[str, int] = {}   # message_id -> seq
+
+    def append(self, message: Message):
+        if self.first_seq is None:
+            self.first_seq = message.seq
+        # Mensagens removidas deixam buracos na sequência
+        while self.first_seq + len(self.messages) < message.seq:
+            self.messages.append(None)
+        self.messages.append(message)
+        if message.message_id:
+            self.ids[message.message_id] = message.seq
+
+    def get(self, seq: int) -> Optional[Message]:
+        index = self.index_of(seq)
+        return None if index is None else self.messages[index]
+
+    def remove(self, seq: int) -> bool:
+        index = self.index_of(seq)
+        if index is None or self.messages[index] is None:
+            return False
+        self.ids.pop(self.messages[index].message_id, None)
+        self.messages[index] = None
+        return True
+
+    def index_of(self, seq: Optional[int]) -> Optional[int]:
+        if seq is None or self.first_seq is None:
+            return None
+        index = seq - self.first_seq
+        if 0 <= index < len(self.messages):
+            return index
+        return None
+
+    def page(self, before_seq: Optional[int], limit: int) -> list[Message]:
+        if self.first_seq is None or limit <= 0:
+            return []
+        end = len(self.messages) if before_seq is None else min(before_seq - self.first_seq, len(self.messages))
+        page = []
+        index = end - 1
+        while index >= 0 and len(page) < limit:
+            if self.messages[index] is not None:
+                page.append(self.messages[index])
+            index -= 1
+        page.reverse()
+        return page
+
+    def last_seq(self) -> int:
+        if self.first_seq is None:
+            return 0
+        return self.first_seq + len(self.messages) - 1
+
+
+class MemoryStorage(ChatStorage):
+    """Armazenamento em dicionários na memória do processo.
+
+    Com log_dir, cada alteração é também gravada no MessageLog e o estado é
+    reconstruído a partir dele na inicialização.
+    """
+    def __init__(self, log_dir: Optional[str] = None):
+        self.rooms: dict[str, Room] = {}
+        self.messages: dict[str, MessageSeqIndex] = {}
+        self.users: dict[str, User] = {}
+
+        self.replaying = False
+        self.message_log = MessageLog(log_dir) if log_dir else None
+        if self.message_log:
+            self.replay_log()
+
+    # ========================
+    # Salas
+    # ========================
+    def save_room(self, room: Room) -> None:
+        if room.room_id in self.rooms:
+            return
+        self.rooms[room.room_id] = Room(room_id=room.room_id,
+                                        room_name=room.room_name,
+                                        owner=room.owner,
+                                        current_users=list(room.current_users or []),
+                                        private=room.private)
+        self.messages[room.room_id] = MessageSeqIndex()
+        self.log_record({"type": "room",
+                         "room_id": room.room_id,
+                         "room_name": room.room_name,
+                         "owner": room.owner,
+                         "current_users": room.current_users,
+                         "private": room.private})
+
+    def add_room_user(self, room_id: str, user_name: str) -> None:
+        self.rooms[room_id].current_users.append(user_name)
+        self.log_record({"type": "room_user", "room_id": room_id, "user_name": user_name})
+
+    def list_rooms(self) -> list[Room]:
+        return list(self.rooms.values())
+
+    # ========================
+    # Mensagens
+    # ========================
+    def save_message(self, message: Message) -> None:
+        self.messages[message.room_id].append(message)
+        self.log_record(message_to_record(message))
+
+    def update_message(self, room_id: str, seq: int, text: str) -> None:
+        message = self.messages[room_id].get(seq)
+        if message is None:
+            return
+        message.text = text
+        self.log_record({"type": "edit_message", "room_id": room_id, "seq": seq, "text": text})
+
+    def remove_message(self, room_id: str, seq: int) -> None:
+        if self.messages[room_id].remove(seq):
+            self.log_record({"type": "remove_message", "room_id": room_id, "seq": seq})
+
+    def get_message(self, room_id: str, seq: int) -> Optional[Message]:
+        return self.messages[room_id].get(seq)
+
+    def find_seq(self, room_id: str, message_id: str) -> Optional[int]:
+        return self.messages[room_id].ids.get(message_id)
+
+    def get_messages(self, room_id: str, before_seq: Optional[int], limit: int) -> list[Message]:
+        return self.messages[room_id].page(before_seq, limit)
+
+    def last_seq(self, room_id: str) -> int:
+        return self.messages[room_id].last_seq()
+
+    # ========================
+    # Usuários
+    # ========================
+    def save_user(self, user: User) -> None:
+        self.users[user.user_id] = user
+        self.log_record({"type": "user", "user": user})
+
+    def get_user(self, user_id: str) -> Optional[User]:
+        return self.users.get(user_id)
+
+    def list_users(self) -> list[User]:
+        return list(self.users.values())
+
+    def close(self) -> None:
+        if self.message_log:
+            self.message_log.close()
+
+    # ========================
+    # Log durável
+    # ========================
+    def log_record(self, record: dict):
+        if self.message_log and not self.replaying:
+            self.message_log.append(record)
+
+    def replay_log(self):
+        self.replaying = True
+        count = 0
+        try:
+            for record in self.message_log.replay():
+                record_type = record.get("type")
+                if record_type == "message":
+                    self.save_message(message_from_record(record))
+                elif record_type == "edit_message":
+                    self.update_message(record["room_id"], record["seq"], record["text"])
+                elif record_type == "remove_message":
+                    self.remove_message(record["room_id"], record["seq"])
+                elif record_type == "room":
+                    self.save_room(Room(room_id=record["room_id"],
+                                        room_name=record["room_name"],
+                                        owner=record["owner"],
+                                        current_users=record["current_users"],
+                                        private=record["private"]))
+                elif record_type == "room_user":
+                    self.add_room_user(record["room_id"], record["user_name"])
+                elif record_type == "user":
+                    self.save_user(User(**record["user"]))
+                count += 1
+        finally:
+            self.replaying = False
+        print(f"MemoryStorage - {count} records replayed from log")
@@ -0,0 +1,279 @@
+import threading
+from dataclasses import asdict
+from itertools import groupby
+from typing import Optional
+import sqlalchemy as sa
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from chat.entities.file import File
+from chat.entities.message import Message
+from chat.entities.room import Room
+from chat.entities.user import User
+from chat.storage.base import ChatStorage
+
+metadata = sa.MetaData()
+
+rooms_table = sa.Table(
+    "rooms", metadata,
+    sa.Column("room_id", sa.String, primary_key=True),
+    sa.Column("room_name", sa.String, nullable=False),
+    sa.Column("owner", sa.String),
+    sa.Column("private", sa.Boolean, nullable=False, default=False),
+)
+
+room_users_table = sa.Table(
+    "room_users", metadata,
+    sa.Column("room_id", sa.String, primary_key=True),
+    sa.Column("user_name", sa.String, primary_key=True),
+)
+
+# A chave primária (room_id, seq) é o índice usado pela paginação do histórico
+messages_table = sa.Table(
+    "messages", metadata,
+    sa.Column("room_id", sa.String, primary_key=True),
+    sa.Column("seq", sa.Integer, primary_key=True),
+    sa.Column("message_id", sa.String),
+    sa.Column("user_name", sa.String, nullable=False),
+    sa.Column("text", sa.Text, nullable=False),
+    sa.Column("message_type", sa.String, nullable=False),
+    sa.Column("to_user", sa.String),
+    sa.Column("file", sa.JSON),
+)
+
+# Edições e remoções chegam pelo message_id
+message_id_index = sa.Index("ix_messages_message_id", messages_table.c.room_id, messages_table.c.message_id)
+
+# Maior seq removido de cada sala: o last_seq não recua quando a última mensagem é apagada
+removed_seqs_table = sa.Table(
+    "removed_seqs", metadata,
+    sa.Column("room_id", sa.String, primary_key=True),
+    sa.Column("seq", sa.Integer, nullable=False),
+)
+
+users_table = sa.Table(
+    "users", metadata,
+    sa.Column("user_id", sa.String, primary_key=True),
+    sa.Column("user_name", sa.String, nullable=False),
+    sa.Column("current_room_id", sa.String),
+    sa.Column("private_rooms", sa.JSON),
+)
+
+
+class SQLiteStorage(ChatStorage):
+    """Armazenamento em SQLite (modo WAL) através do SQLAlchemy Core.
+
+    Todas as escritas passam por uma única thread, que agrupa as operações
+    pendentes em uma só transação; quem escreve espera o commit do lote.
+    Se o lote falha, cada escrita é refeita na sua própria transação: só quem
+    causou o erro o recebe, e o writer continua rodando.
+    As leituras usam conexões próprias e rodam em paralelo com o writer.
+    """
+    # Statements compartilhados: o writer agrupa operações iguais em um só executemany
+    INSERT_ROOM = rooms_table.insert().prefix_with("OR IGNORE")
+    INSERT_ROOM_USER = room_users_table.insert().prefix_with("OR IGNORE")
+    INSERT_MESSAGE = messages_table.insert()
+    UPDATE_MESSAGE = messages_table.update().where(messages_table.c.room_id == sa.bindparam("b_room_id"),
+                                                   messages_table.c.seq == sa.bindparam("b_seq"))
+    DELETE_MESSAGE = messages_table.delete().where(messages_table.c.room_id == sa.bindparam("b_room_id"),
+                                                   messages_table.c.seq == sa.bindparam("b_seq"))
+    UPSERT_USER = users_table.insert().prefix_with("OR REPLACE")
+    UPSERT_REMOVED_SEQ = sqlite_insert(removed_seqs_table).on_conflict_do_update(
+        index_elements=[removed_seqs_table.c.room_id],
+        set_={"seq": sa.func.max(removed_seqs_table.c.seq, sa.literal_column("excluded.seq"))})
+
+    def __init__(self, database_path: str = "chat.db"):
+        self.engine = sa.create_engine(f"sqlite:///{database_path}")
+        sa.event.listen(self.engine, "connect", self.__configure_connection)
+        metadata.create_all(self.engine)
+        # Bancos criados antes do índice: o create_all não adiciona índices a tabelas existentes
+        message_id_index.create(self.engine, checkfirst=True)
+
+        self.cond = threading.Condition()
+        self.pending: list[tuple[int, list[tuple]]] = []    # (lsn, operações) de cada write_all
+        self.appended_lsn = 0
+        self.committed_lsn = 0
+        self.closed = False
+        self.errors: dict[int, Exception] = {}     # lsn -> erro da escrita que falhou
+        self.writer = threading.Thread(target=self.__run_writer, name="SQLiteStorageWriter", daemon=True)
+        self.writer.start()
+
+    @staticmethod
+    def __configure_connection(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+    # ========================
+    # Writer
+    # ========================
+    def write(self, statement, params: dict):
+        """Enfileira uma escrita para a thread do writer e espera o commit do lote."""
+        self.write_all([(statement, params)])
+
+    def write_all(self, operations: list[tuple]):
+        """Como write(), para várias escritas que ficam no mesmo lote (na mesma transação)."""
+        with self.cond:
+            if self.closed:
+                raise ValueError("SQLiteStorage: storage fechado")
+            self.appended_lsn += 1
+            lsn = self.appended_lsn
+            self.pending.append((lsn, operations))
+            self.cond.notify_all()
+            while self.committed_lsn < lsn:
+                self.cond.wait()
+            error = self.errors.pop(lsn, None)
+        if error is not None:
+            raise error
+
+    def __run_writer(self):
+        while True:
+            with self.cond:
+                while not self.pending and not self.closed:
+                    self.cond.wait()
+                if not self.pending and self.closed:
+                    return
+                batch, self.pending = self.pending, []
+                lsn = self.appended_lsn
+
+            errors = self.__write_batch(batch)
+
+            with self.cond:
+                self.errors.update(errors)
+                self.committed_lsn = lsn
+                self.cond.notify_all()
+
+    def __write_batch(self, batch: list[tuple[int, list[tuple]]]) -> dict[int, Exception]:
+        try:
+            self.__execute([operation for _, operations in batch for operation in operations])
+            return {}
+        except Exception as e:
+            if len(batch) == 1:
+                print(f"SQLiteStorage - write error: {e}")
+                return {batch[0][0]: e}
+
+        # O lote foi desfeito: cada write_all roda sozinho, e só as que falham recebem o erro
+        errors = {}
+        for lsn, operations in batch:
+            try:
+                self.__execute(operations)
+            except Exception as e:
+                print(f"SQLiteStorage - write error: {e}")
+                errors[lsn] = e
+        return errors
+
+    def __execute(self, operations: list[tuple]):
+        with self.engine.begin() as conn:
+            # Operações consecutivas com o mesmo statement vão em um só executemany
+            for statement, group in groupby(operations, key=lambda op: op[0]):
+                conn.execute(statement, [params for _, params in group])
+
+    def close(self) -> None:
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+        self.writer.join()
+        self.engine.dispose()
+
+    # ========================
+    # Salas
+    # ========================
+    def save_room(self, room: Room) -> None:
+        self.write(self.INSERT_ROOM,
+                   {"room_id": room.room_id, "room_name": room.room_name, "owner": room.owner, "private": room.private})
+        for user_name in room.current_users or []:
+            self.add_room_user(room.room_id, user_name)
+
+    def add_room_user(self, room_id: str, user_name: str) -> None:
+        self.write(self.INSERT_ROOM_USER,
+                   {"room_id": room_id, "user_name": user_name})
+
+    def list_rooms(self) -> list[Room]:
+        with self.engine.connect() as conn:
+            rows = conn.execute(sa.select(rooms_table).order_by(sa.literal_column("rowid"))).all()
+            users = conn.execute(sa.select(room_users_table).order_by(sa.literal_column("rowid"))).all()
+
+        current_users: dict[str, list[str]] = {}
+        for row in users:
+            current_users.setdefault(row.room_id, []).append(row.user_name)
+        return [Room(room_id=row.room_id,
+                     room_name=row.room_name,
+                     owner=row.owner,
+                     current_users=current_users.get(row.room_id),
+                     private=row.private) for row in rows]
+
+    # ========================
+    # Mensagens
+    # ========================
+    def save_message(self, message: Message) -> None:
+        self.write(self.INSERT_MESSAGE, {
+            "room_id": message.room_id,
+            "seq": message.seq,
+            "message_id": message.message_id,
+            "user_name": message.user_name,
+            "text": message.text,
+            "message_type": message.message_type,
+            "to_user": message.to_user,
+            "file": asdict(message.file) if message.file else None,
+        })
+
+    def update_message(self, room_id: str, seq: int, text: str) -> None:
+        self.write(self.UPDATE_MESSAGE, {"b_room_id": room_id, "b_seq": seq, "text": text})
+
+    def remove_message(self, room_id: str, seq: int) -> None:
+        self.write_all([(self.DELETE_MESSAGE, {"b_room_id": room_id, "b_seq": seq}),
+                        (self.UPSERT_REMOVED_SEQ, {"room_id": room_id, "seq": seq})])
+
+    def get_message(self, room_id: str, seq: int) -> Optional[Message]:
+        query = sa.select(messages_table).where(messages_table.c.room_id == room_id, messages_table.c.seq == seq)
+        with self.engine.connect() as conn:
+            row = conn.execute(query).first()
+        return self.message_from_row(row) if row else None
+
+    def find_seq(self, room_id: str, message_id: str) -> Optional[int]:
+        query = sa.select(messages_table.c.seq).where(messages_table.c.room_id == room_id,
+                                                      messages_table.c.message_id == message_id)
+        with self.engine.connect() as conn:
+            return conn.execute(query).scalar()
+
+    def get_messages(self, room_id: str, before_seq: Optional[int], limit: int) -> list[Message]:
+        query = sa.select(messages_table).where(messages_table.c.room_id == room_id)
+        if before_seq is not None:
+            query = query.where(messages_table.c.seq < before_seq)
+        query = query.order_by(messages_table.c.seq.desc()).limit(limit)
+
+        with self.engine.connect() as conn:
+            rows = conn.execute(query).all()
+        return [self.message_from_row(row) for row in reversed(rows)]
+
+    def last_seq(self, room_id: str) -> int:
+        saved = sa.select(sa.func.max(messages_table.c.seq)).where(messages_table.c.room_id == room_id)
+        removed = sa.select(removed_seqs_table.c.seq).where(removed_seqs_table.c.room_id == room_id)
+        with self.engine.connect() as conn:
+            return max(conn.execute(saved).scalar() or 0, conn.execute(removed).scalar() or 0)
+
+    @staticmethod
+    def message_from_row(row) -> Message:
+        return Message(user_name=row.user_name,
+                       text=row.text,
+                       message_type=row.message_type,
+                       room_id=row.room_id,
+                       to_user=row.to_user,
+                       file=File(**row.file) if row.file else None,
+                       seq=row.seq,
+                       message_id=row.message_id)
+
+    # ========================
+    # Usuários
+    # ========================
+    def save_user(self, user: User) -> None:
+        self.write(self.UPSERT_USER, asdict(user))
+
+    def get_user(self, user_id: str) -> Optional[User]:
+        with self.engine.connect() as conn:
+            row = conn.execute(sa.select(users_table).where(users_table.c.user_id == user_id)).first()
+        return User(**row._asdict()) if row else None
+
+    def list_users(self) -> list[User]:
+        with self.engine.connect() as conn:
+            rows = conn.execute(sa.select(users_table)).all()
+        return [User(**row._asdict()) for row in rows]
@@ -46,7 +46,7 @@ class FileHandler:
                             )
                         )
                         self.chat_app.add_message_to_room(message)
-                        self.page.pubsub.send_all(message)
+                        self.page.pubsub.send_all_on_topic(ChatApp.room_topic(message.room_id), message)
 
                     else:
                         raise Exception(f"[ERROR] Falha ao obter URL de upload para {file.name}")
@@ -0,0 +1,244 @@
+import os
+import struct
+import threading
+import zlib
+from typing import Iterator, Optional
+import orjson
+from chat.entities.file import File
+from chat.entities.message import Message
+
+
+def message_to_record(message: Message) -> dict:
+    # O orjson serializa dataclasses diretamente (incluindo o File aninhado)
+    return {"type": "message", "message": message}
+
+
+def message_from_record(record: dict) -> Message:
+    data = dict(record["message"])
+    if data.get("file"):
+        data["file"] = File(**data["file"])
+    return Message(**data)
+
+
+class MessageLog:
+    """Log append-only, em segmentos, com os eventos do ChatApp (salas e mensagens).
+
+    Cada registro é gravado como [tamanho][crc32][payload JSON]. As escritas são
+    agrupadas por uma thread única que faz um só fsync por lote (group commit),
+    por isso várias sessões enviando ao mesmo tempo compartilham o custo do fsync.
+    Na inicialização o log é relido com replay() e uma cauda incompleta é truncada;
+    um registro corrompido antes do fim do log faz replay() falhar.
+    """
+    HEADER = struct.Struct("<II")       # tamanho do payload, crc32 do payload
+    SEGMENT_SIZE = 64 * 1024 * 1024     # Tamanho máximo de cada arquivo de segmento
+    SEGMENT_SUFFIX = ".log"
+
+    def __init__(self, log_dir: str, segment_size: int = SEGMENT_SIZE):
+        self.log_dir = log_dir
+        self.segment_size = segment_size
+        os.makedirs(self.log_dir, exist_ok=True)
+
+        self.recovered = False
+        self.segment = None
+        self.segment_index = 0
+        self.error: Optional[Exception] = None     # Falha de um lote sem ninguém esperando, para o flush()
+
+        self.cond = threading.Condition()
+        self.pending: list[tuple[int, bytes]] = []     # (lsn, registro)
+        self.waiting: set[int] = set()                 # lsns de quem espera em append(wait=True)
+        self.errors: dict[int, Exception] = {}
+        self.appended_lsn = 0
+        self.durable_lsn = 0
+        self.closed = False
+        self.writer = threading.Thread(target=self.__run_writer, name="MessageLogWriter", daemon=True)
+        self.writer.start()
+
+    # ========================
+    # Escrita
+    # ========================
+    def append(self, record: dict, wait: bool = True):
+        """Adiciona um registro ao log. Com wait=True só retorna depois do fsync do lote."""
+        payload = orjson.dumps(record)
+        data = self.HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+        with self.cond:
+            if self.closed:
+                raise ValueError("MessageLog: log fechado")
+            self.appended_lsn += 1
+            lsn = self.appended_lsn
+            self.pending.append((lsn, data))
+            self.cond.notify_all()
+            if not wait:
+                return
+
+            self.waiting.add(lsn)
+            while self.durable_lsn < lsn:
+                self.cond.wait()
+            self.waiting.discard(lsn)
+            error = self.errors.pop(lsn, None)
+        if error is not None:
+            raise error
+
+    def flush(self):
+        """Espera até que todos os registros aceitos estejam em disco (ou falha, se algum lote sem espera falhou)."""
+        with self.cond:
+            lsn = self.appended_lsn
+            while self.durable_lsn < lsn:
+                self.cond.wait()
+            error, self.error = self.error, None
+        if error is not None:
+            raise error
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            with self.cond:
+                self.closed = True
+                self.cond.notify_all()
+            self.writer.join()
+            if self.segment:
+                self.segment.close()
+                self.segment = None
+
+    def __run_writer(self):
+        while True:
+            with self.cond:
+                while not self.pending and not self.closed:
+                    self.cond.wait()
+                if not self.pending and self.closed:
+                    return
+                batch, self.pending = self.pending, []
+                lsn = self.appended_lsn
+
+            error = None
+            try:
+                self.__write_batch(b"".join(data for _, data in batch))
+            except Exception as e:
+                print(f"MessageLog - write error: {e}")
+                error = e
+
+            with self.cond:
+                if error is not None:
+                    # Só os registros do lote falham; o writer continua para os próximos
+                    for record_lsn, _ in batch:
+                        if record_lsn in self.waiting:
+                            self.errors[record_lsn] = error
+                        else:
+                            self.error = error
+                self.durable_lsn = lsn
+                self.cond.notify_all()
+
+    def __write_batch(self, data: bytes):
+        if self.segment is None:
+            self.__open_active_segment()
+        elif self.segment.tell() and self.segment.tell() + len(data) > self.segment_size:
+            self.__rotate_segment()
+
+        position = self.segment.tell()
+        try:
+            self.segment.write(data)
+            self.segment.flush()
+            os.fsync(self.segment.fileno())
+        except Exception:
+            self.__discard_write(position)
+            raise
+
+    def __discard_write(self, position: int):
+        # O lote falhou: seus bytes não podem ficar antes dos próximos registros. O segmento é
+        # reaberto (e relido) na próxima escrita, caso o truncate também falhe
+        path = self.segment.name
+        self.recovered = False
+        try:
+            self.segment.close()
+        except Exception:
+            pass
+        self.segment = None
+        try:
+            os.truncate(path, position)
+        except Exception as e:
+            print(f"MessageLog - truncate error: {e}")
+
+    def __open_active_segment(self):
+        # Garante que a cauda do último segmento está íntegra antes de escrever depois dela
+        if not self.recovered:
+            for _ in self.replay():
+                pass
+        segments = self.list_segments()
+        self.segment_index = self.segment_number(segments[-1]) if segments else 1
+        self.segment = open(self.segment_path(self.segment_index), "ab")
+
+    def __rotate_segment(self):
+        os.fsync(self.segment.fileno())
+        self.segment.close()
+        self.segment = None
+        self.segment_index += 1
+        self.segment = open(self.segment_path(self.segment_index), "ab")
+
+    # ========================
+    # Leitura / recuperação
+    # ========================
+    def replay(self) -> Iterator[dict]:
+        """
+        Relê todos os registros em ordem.
+
+        Um registro inválido só é tratado como cauda incompleta (e truncado) quando
+        está no último segmento e não há nenhum registro válido depois dele; caso
+        contrário o log está corrompido e replay() falha sem apagar nada.
+        """
+        segments = self.list_segments()
+
+        for position, path in enumerate(segments):
+            with open(path, "rb") as f:
+                data = f.read()
+
+            offset = 0
+            size = len(data)
+            while offset < size:
+                end = self.frame_end(data, offset)
+                if end is None:
+                    break
+                yield orjson.loads(data[offset + self.HEADER.size:end])
+                offset = end
+
+            if offset < size:
+                if position != len(segments) - 1 or self.has_frame_after(data, offset):
+                    raise ValueError(f"MessageLog: registro corrompido em {path} (offset {offset})")
+                print(f"MessageLog - truncating torn tail of {path}: {size - offset} bytes")
+                with open(path, "r+b") as f:
+                    f.truncate(offset)
+                    os.fsync(f.fileno())
+
+        self.recovered = True
+
+    def frame_end(self, data: bytes, offset: int) -> Optional[int]:
+        """Fim do registro que começa em offset, ou None se ali não há um registro íntegro."""
+        start = offset + self.HEADER.size
+        if start > len(data):
+            return None
+        length, checksum = self.HEADER.unpack_from(data, offset)
+        end = start + length
+        # O payload nunca é vazio: um cabeçalho zerado é espaço alocado e não escrito
+        if length == 0 or end > len(data) or zlib.crc32(data[start:end]) != checksum:
+            return None
+        return end
+
+    def has_frame_after(self, data: bytes, offset: int) -> bool:
+        # Todo payload é um objeto JSON: só as posições antes de um "{" podem começar um registro
+        brace = data.find(b"{", offset + 1 + self.HEADER.size)
+        while brace != -1:
+            if self.frame_end(data, brace - self.HEADER.size) is not None:
+                return True
+            brace = data.find(b"{", brace + 1)
+        return False
+
+    def list_segments(self) -> list[str]:
+        names = sorted(name for name in os.listdir(self.log_dir) if name.endswith(self.SEGMENT_SUFFIX))
+        return [os.path.join(self.log_dir, name) for name in names]
+
+    def segment_path(self, index: int) -> str:
+        return os.path.join(self.log_dir, f"{index:08d}{self.SEGMENT_SUFFIX}")
+
+    @staticmethod
+    def segment_number(path: str) -> int:
+        return int(os.path.basename(path).split(".")[0])
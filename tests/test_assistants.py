@@ -0,0 +1,64 @@
+"""Respostas do assistente no pool de workers."""
+import os
+import threading
+
+os.environ.setdefault("OPENAI_API_KEY", "stub")
+os.environ["RESPONSE_CACHE_PATH"] = ""
+
+from assistants.assistants import Assistants
+from assistants.knowledge.local_embeddings import HashingEmbeddings
+from assistants.programador import Programador
+from chat.entities.message import Message
+
+
+class StubSpecialist:
+    """Especialista sem cache exata, que conta as chamadas à API."""
+    def __init__(self):
+        self.calls = 0
+
+    def cached_response(self, input):
+        return None
+
+    def knowledge_version(self) -> str:
+        return "v1"
+
+    def stream_response(self, input, conversation_history, lookup_cache=True):
+        self.calls += 1
+        yield f"resposta {self.calls}"
+
+
+class FailingSpecialist(StubSpecialist):
+    def stream_response(self, input, conversation_history, lookup_cache=True):
+        raise RuntimeError("API fora do ar")
+
+
+def make_message(text: str) -> Message:
+    return Message(user_name="ana", text=text, message_type="chat_message", room_id="geral")
+
+
+def test_specialist_error_is_reported_as_an_error():
+    assistant = Assistants(nome="Testador", embed=HashingEmbeddings().embed_query)
+    assistant.specialist = FailingSpecialist()
+    patches, done = [], threading.Event()
+
+    def on_patch(text: str, finished: bool):
+        patches.append((text, finished))
+        if finished:
+            done.set()
+
+    assert assistant.submit_stream(make_message("@testador olá"), on_patch)
+    assert done.wait(5)
+    assert patches[-1] == (Programador.ERROR_RESPONSE, True)
+
+
+def test_repeated_question_in_the_same_room_hits_the_semantic_cache():
+    assistant = Assistants(nome="Testador", embed=HashingEmbeddings().embed_query)
+    assistant.specialist = StubSpecialist()
+
+    answers = [assistant.stream_message(make_message(text), lambda text, finished: None)
+               for text in ("@testador como faço um Card clicável?", "@testador como faço um Card clicável?",
+                            "@Testador como faço um card clicável")]
+
+    assert answers == ["resposta 1"] * 3
+    assert assistant.specialist.calls == 1
+    assert assistant.semantic_cache.stats()["hits"] == 2
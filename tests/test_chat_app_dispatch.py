@@ -0,0 +1,108 @@
+"""Despacho das mensagens ao assistente da sala: uma única vez por message_id."""
+import os
+import threading
+from dataclasses import replace
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "stub")
+os.environ["RESPONSE_CACHE_PATH"] = ""
+
+from assistants.assistants import Assistants
+from assistants.knowledge.local_embeddings import HashingEmbeddings
+from chat.chat_app import ChatApp
+from chat.entities.message import Message
+from chat.entities.message_event import MessageEvent
+from chat.storage.memory import MemoryStorage
+
+
+class StubSpecialist:
+    def __init__(self):
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def cached_response(self, input):
+        return None
+
+    def knowledge_version(self) -> str:
+        return ""
+
+    def stream_response(self, input, conversation_history, lookup_cache=True):
+        with self.lock:
+            self.calls += 1
+        yield "use um "
+        yield "Container com on_click"
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)     # O ChatApp cria a pasta de uploads no diretório atual
+    app = ChatApp(storage=MemoryStorage())
+    assistant = Assistants(nome="Programador", embed=HashingEmbeddings().embed_query)
+    assistant.specialist = StubSpecialist()
+    app.assistants["programador"] = assistant
+    return app
+
+
+class Published(list):
+    """publish() de todas as sessões: o hub do pubsub é um só."""
+    def __init__(self):
+        super().__init__()
+        self.lock = threading.Lock()
+
+    def __call__(self, topic: str, message):
+        with self.lock:
+            self.append((topic, message))
+
+
+def ask(text: str, user_name: str = "ana", message_id: str = "m1") -> Message:
+    return Message(user_name=user_name, text=text, message_type="chat_message", room_id="programador",
+                   message_id=message_id)
+
+
+def test_assistant_answers_once_per_message_across_sessions(app):
+    assistant = app.assistants["programador"]
+    published = Published()
+    message = ask("@programador como faço um Card clicável?")
+    app.post_message(message, published)
+
+    # A mesma mensagem chegando de novo, por várias sessões ao mesmo tempo
+    sessions = [threading.Thread(target=app.dispatch_to_assistant, args=(replace(message), published))
+                for _ in range(8)]
+    for session in sessions:
+        session.start()
+    for session in sessions:
+        session.join()
+    assistant.executor.shutdown(wait=True)
+
+    replies = [m for _, m in published if isinstance(m, Message) and m.user_name == "Programador"]
+    patches = [m for _, m in published if isinstance(m, MessageEvent)]
+    assert assistant.specialist.calls == 1
+    assert len(replies) == 1
+    assert all(patch.message_id == replies[0].message_id for patch in patches)
+    assert [patch.version for patch in patches] == sorted(patch.version for patch in patches)
+    assert patches[-1].text == "use um Container com on_click"
+    assert app.rooms["programador"].find_seq(replies[0].message_id) is not None
+    assert app.rooms["programador"].get_latest_messages()[-1].text == "use um Container com on_click"
+
+
+def test_message_without_mention_is_remembered_but_not_answered(app):
+    assistant = app.assistants["programador"]
+    published = Published()
+
+    app.post_message(ask("alguém já usou o Flet?"), published)
+
+    assert assistant.specialist.calls == 0
+    assert [m.text for _, m in published] == ["alguém já usou o Flet?"]
+    assert assistant.memory.get_messages("programador") == [{"role": "user", "content": "ana: alguém já usou o Flet?"}]
+
+
+def test_assistant_messages_are_not_dispatched(app):
+    assistant = app.assistants["programador"]
+    published = Published()
+
+    app.post_message(ask("@programador respondendo a mim mesmo", user_name="Programador"), published)
+    app.post_message(replace(ask("@programador em outra sala", message_id="m2"), room_id="geral"), published)
+
+    assert assistant.specialist.calls == 0
+    assert len(published) == 2
+    assert assistant.memory.get_messages("programador") == []
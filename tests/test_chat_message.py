@@ -0,0 +1,26 @@
+"""Texto de uma ChatMessage atualizado pelos patches do streaming."""
+from chat.chat_message import ChatMessage
+from chat.entities.message import Message
+
+
+def make_control() -> ChatMessage:
+    message = Message(user_name="Programador", text="Pensando…", message_type="chat_message",
+                      room_id="programador", message_id="r1")
+    return ChatMessage(message, on_edit=lambda control: None, on_delete=lambda control: None)
+
+
+def test_late_patch_does_not_overwrite_the_final_text():
+    control = make_control()
+
+    assert control.set_text("resposta completa", version=3)
+    assert not control.set_text("resp", version=2)
+
+    assert control.message.text == "resposta completa"
+    assert control.controls[1].controls[1].value == "resposta completa"
+
+
+def test_edits_without_version_apply_to_new_controls():
+    control = make_control()
+
+    assert control.set_text("editada")
+    assert control.message.text == "editada"
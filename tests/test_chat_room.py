@@ -0,0 +1,78 @@
+"""Envio, edição e remoção de mensagens na ChatRoom, dentro e fora da janela quente."""
+import threading
+import pytest
+from chat.chat_room import ChatRoom
+from chat.entities.message import Message
+from chat.storage.memory import MemoryStorage
+from chat.storage.sqlite import SQLiteStorage
+
+
+def make_room(tmp_path, count: int, hot_window: int = 3) -> ChatRoom:
+    room = ChatRoom("geral", "Geral", hot_window=hot_window, storage=MemoryStorage(log_dir=str(tmp_path)))
+    for n in range(1, count + 1):
+        room.add_message(Message(user_name="ana", text=f"mensagem {n}", message_type="chat_message",
+                                 room_id="geral", message_id=f"m{n}"))
+    return room
+
+
+def test_edit_message_outside_the_hot_window(tmp_path):
+    room = make_room(tmp_path, 10)
+
+    edited = room.edit_message("m2", "editada")
+
+    assert edited is not None and edited.seq == 2 and edited.text == "editada"
+    assert room.get_messages(before_seq=3, limit=1)[0].text == "editada"
+    assert len(room.hot_ids) == room.hot_window
+
+
+def test_edit_message_in_the_hot_window(tmp_path):
+    room = make_room(tmp_path, 10)
+
+    edited = room.edit_message("m10", "editada")
+
+    assert edited is room.room.messages[10]
+    assert edited.text == "editada"
+
+
+def test_edit_or_delete_unknown_message(tmp_path):
+    room = make_room(tmp_path, 2)
+
+    assert room.edit_message("nao-existe", "x") is None
+    assert not room.delete_message("nao-existe")
+
+
+def test_delete_message_outside_the_hot_window(tmp_path):
+    room = make_room(tmp_path, 10)
+
+    assert room.delete_message("m1")
+
+    assert [m.seq for m in room.get_messages(before_seq=5, limit=10)] == [2, 3, 4]
+    assert room.edit_message("m1", "x") is None
+
+
+@pytest.mark.parametrize("make_storage", [lambda path: MemoryStorage(log_dir=str(path / "chat_log")),
+                                          lambda path: SQLiteStorage(str(path / "chat.db"))],
+                         ids=["memory", "sqlite"])
+def test_concurrent_sends_get_distinct_seqs(tmp_path, make_storage):
+    storage = make_storage(tmp_path)
+    room = ChatRoom("geral", "Geral", hot_window=50, storage=storage)
+    threads, per_thread = 8, 200
+
+    def send(user: int):
+        for n in range(per_thread):
+            room.add_message(Message(user_name=f"user{user}", text=f"{user}-{n}", message_type="chat_message",
+                                     room_id="geral"))
+
+    workers = [threading.Thread(target=send, args=(user,)) for user in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    total = threads * per_thread
+    history = storage.get_messages("geral", None, total)
+    assert [m.seq for m in history] == list(range(1, total + 1))
+    assert all(storage.get_message("geral", m.seq) is not None and storage.get_message("geral", m.seq).seq == m.seq
+               for m in history)
+    assert [m.seq for m in room.get_messages(limit=50)] == list(range(total - 49, total + 1))
+    storage.close()
@@ -0,0 +1,46 @@
+"""ConversationMemory compartilhada entre a thread do chat e o pool de assistentes."""
+import threading
+from assistants.utils.conversation_memory import ConversationMemory
+
+
+def test_concurrent_append_and_read():
+    memory = ConversationMemory(model="gpt-3.5-turbo", token_budget=200, max_rooms=4)
+    errors = []
+
+    def writer(room_id: str):
+        try:
+            for n in range(2000):
+                memory.append(room_id, "user", f"ana: mensagem {n}")
+        except Exception as e:
+            errors.append(e)
+
+    def reader():
+        try:
+            for n in range(2000):
+                memory.get_messages(f"sala{n % 6}")
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(f"sala{n}",)) for n in range(6)]
+    threads += [threading.Thread(target=reader) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(memory.rooms) <= 4
+    for history in memory.rooms.values():
+        assert history.total_tokens == sum(tokens for _, tokens in history.messages)
+        assert history.total_tokens <= 200
+
+
+def test_budget_keeps_the_newest_messages():
+    memory = ConversationMemory(model="gpt-3.5-turbo", token_budget=60)
+    for n in range(20):
+        memory.append("geral", "user", f"ana: mensagem {n}")
+
+    messages = memory.get_messages("geral")
+
+    assert messages[-1] == {"role": "user", "content": "ana: mensagem 19"}
+    assert 1 < len(messages) < 20
@@ -0,0 +1,45 @@
+"""Política de retentativas do EmbeddingClient: longa para o índice, curta para as perguntas."""
+import os
+from types import SimpleNamespace
+import httpx
+import openai
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "stub")
+
+from assistants.knowledge.embeddings import EmbeddingClient
+
+
+class DownClient:
+    """Cliente da OpenAI fora do ar, que registra o timeout de cada chamada."""
+    def __init__(self, timeout=None, calls=None):
+        self.timeout = timeout
+        self.calls = [] if calls is None else calls
+        self.embeddings = SimpleNamespace(create=self.create)
+
+    def with_options(self, timeout=None, **kwargs):
+        return DownClient(timeout, self.calls)
+
+    def create(self, model, input):
+        self.calls.append(self.timeout)
+        raise openai.APIConnectionError(request=httpx.Request("POST", "http://stub/embeddings"))
+
+
+def test_query_fails_fast_with_a_short_timeout():
+    client = DownClient()
+    embeddings = EmbeddingClient(client=client, backoff=0.001, max_backoff=0.001)
+
+    with pytest.raises(openai.APIConnectionError):
+        embeddings.embed_query("como faço um Card clicável")
+
+    assert client.calls == [EmbeddingClient.QUERY_TIMEOUT] * EmbeddingClient.QUERY_ATTEMPTS
+
+
+def test_documents_keep_the_build_retry_policy():
+    client = DownClient()
+    embeddings = EmbeddingClient(client=client, backoff=0.001, max_backoff=0.001)
+
+    with pytest.raises(openai.APIConnectionError):
+        embeddings.embed_documents(["ft.Card"])
+
+    assert client.calls == [None] * EmbeddingClient.MAX_ATTEMPTS
@@ -0,0 +1,92 @@
+"""Construção, gravação e carregamento do índice da base de conhecimento, sobre um corpus pequeno."""
+import json
+import os
+import pytest
+from assistants.knowledge.index import KnowledgeIndex, build_knowledge_index, load_knowledge_index
+from assistants.knowledge.local_embeddings import HashingEmbeddings, TfidfSvdEmbeddings
+from assistants.knowledge.retriever import HybridRetriever
+
+CORPUS = {
+    "__organized_code/docs_controls_card.py":
+        "import flet as ft\n\ndef main(page: ft.Page):\n    page.add(ft.Card(content=ft.Text('Card')))\n\nft.app(main)\n",
+    "__organized_code/docs_controls_datepicker.py":
+        "import flet as ft\n\ndef main(page: ft.Page):\n    page.open(ft.DatePicker(on_change=print))\n\nft.app(main)\n",
+    "__generated_json/docs_controls_snackbar.json":
+        {"file": "docs_controls_snackbar", "description": "SnackBar shows a brief message at the bottom of the page.",
+         "examples": "page.open(ft.SnackBar(ft.Text('Saved')))"},
+}
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    knowledge_dir = tmp_path / "knowledge"
+    for relpath, content in CORPUS.items():
+        path = knowledge_dir / relpath
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content if isinstance(content, str) else json.dumps(content), encoding="utf-8")
+    return str(knowledge_dir), str(tmp_path / "index")
+
+
+def test_loaded_index_brings_its_lexical_indexes(corpus):
+    knowledge_dir, index_dir = corpus
+    built = build_knowledge_index(HashingEmbeddings(), knowledge_dir, index_dir)
+
+    index = load_knowledge_index(HashingEmbeddings(), knowledge_dir, index_dir)
+
+    assert index is not None
+    assert index.bm25 is not None and index.symbols is not None
+    assert sorted(index.symbols.rows) == sorted(built.symbols.rows)
+    for query in ("ft.Card", "DatePicker on_change", "como mostro uma mensagem na SnackBar"):
+        assert (HybridRetriever(index).retrieve_rows(query, 3)
+                == HybridRetriever(KnowledgeIndex.build(list(built.documents), HashingEmbeddings(), "x")).retrieve_rows(query, 3))
+    index.close()
+
+
+def test_touched_corpus_is_not_stale(corpus):
+    knowledge_dir, index_dir = corpus
+    build_knowledge_index(HashingEmbeddings(), knowledge_dir, index_dir)
+    path = os.path.join(knowledge_dir, "__organized_code/docs_controls_card.py")
+    os.utime(path, ns=(0, 0))
+
+    index = load_knowledge_index(HashingEmbeddings(), knowledge_dir, index_dir)
+
+    assert index is not None
+    index.close()
+
+
+def test_changed_corpus_is_stale(corpus):
+    knowledge_dir, index_dir = corpus
+    build_knowledge_index(HashingEmbeddings(), knowledge_dir, index_dir)
+    with open(os.path.join(knowledge_dir, "__organized_code/docs_controls_card.py"), "a", encoding="utf-8") as f:
+        f.write("# editado\n")
+
+    assert load_knowledge_index(HashingEmbeddings(), knowledge_dir, index_dir) is None
+
+
+@pytest.mark.parametrize("name", KnowledgeIndex.FILES)
+def test_missing_index_file_is_reported_as_no_index(corpus, name):
+    knowledge_dir, index_dir = corpus
+    build_knowledge_index(HashingEmbeddings(), knowledge_dir, index_dir)
+    os.remove(os.path.join(KnowledgeIndex.version_dir(index_dir), name))
+
+    assert load_knowledge_index(HashingEmbeddings(), knowledge_dir, index_dir) is None
+
+
+def test_truncated_vectors_are_reported_as_no_index(corpus):
+    knowledge_dir, index_dir = corpus
+    build_knowledge_index(HashingEmbeddings(), knowledge_dir, index_dir)
+    with open(os.path.join(KnowledgeIndex.version_dir(index_dir), "vectors.npy"), "r+b") as f:
+        f.truncate(10)
+
+    assert load_knowledge_index(HashingEmbeddings(), knowledge_dir, index_dir) is None
+
+
+def test_saved_tfidf_model_is_loaded_without_the_corpus(tmp_path):
+    path = str(tmp_path / "tfidf_svd.npz")
+    texts = ["ft.Card com on_click", "ft.Container com bgcolor", "ft.SnackBar depois de salvar"]
+    fitted = TfidfSvdEmbeddings.load_or_fit(path, lambda: texts)
+
+    def corpus_not_needed():
+        raise AssertionError("a base não deveria ser lida com o modelo salvo")
+
+    assert TfidfSvdEmbeddings.load_or_fit(path, corpus_not_needed).model == fitted.model
@@ -0,0 +1,88 @@
+"""Recuperação do MessageLog: cauda incompleta e registros corrompidos."""
+import os
+import pytest
+from chat.utils.message_log import MessageLog
+
+RECORDS = [{"type": "room_user", "room_id": "geral", "user_name": f"user{n}"} for n in range(5)]
+
+
+def write_log(log_dir) -> str:
+    log = MessageLog(str(log_dir))
+    for record in RECORDS:
+        log.append(record)
+    log.close()
+    return log.list_segments()[-1]
+
+
+def replay(log_dir) -> list[dict]:
+    log = MessageLog(str(log_dir))
+    try:
+        return list(log.replay())
+    finally:
+        log.close()
+
+
+def test_replay_reads_every_record(tmp_path):
+    write_log(tmp_path)
+
+    assert replay(tmp_path) == RECORDS
+
+
+@pytest.mark.parametrize("tail", [b"\x07\x00", b"\x40\x00\x00\x00\x12\x34\x56\x78{\"type\"", bytes(64)],
+                         ids=["header", "payload", "zeros"])
+def test_torn_tail_is_truncated(tmp_path, tail):
+    path = write_log(tmp_path)
+    size = os.path.getsize(path)
+    with open(path, "ab") as f:
+        f.write(tail)
+
+    assert replay(tmp_path) == RECORDS
+    assert os.path.getsize(path) == size
+
+
+@pytest.mark.parametrize("byte", [0, MessageLog.HEADER.size + 2], ids=["length", "payload"])
+def test_corrupted_record_before_the_tail_fails_without_truncating(tmp_path, byte):
+    path = write_log(tmp_path)
+    with open(path, "r+b") as f:
+        data = bytearray(f.read())
+        data[byte] ^= 0xFF
+        f.seek(0)
+        f.write(data)
+
+    with pytest.raises(ValueError):
+        replay(tmp_path)
+    with open(path, "rb") as f:
+        assert f.read() == bytes(data)
+
+
+def test_appends_after_recovery_follow_the_valid_records(tmp_path):
+    path = write_log(tmp_path)
+    with open(path, "ab") as f:
+        f.write(b"\x07\x00")
+
+    log = MessageLog(str(tmp_path))
+    log.append({"type": "room_user", "room_id": "geral", "user_name": "nova"})
+    log.close()
+
+    assert replay(tmp_path) == RECORDS + [{"type": "room_user", "room_id": "geral", "user_name": "nova"}]
+
+
+def test_failed_write_only_fails_its_records(tmp_path, monkeypatch):
+    path = write_log(tmp_path)
+    log = MessageLog(str(tmp_path))
+    fsync = os.fsync
+    failures = [OSError("disco cheio")]
+
+    def flaky_fsync(fd):
+        if failures:
+            raise failures.pop()
+        fsync(fd)
+
+    monkeypatch.setattr(os, "fsync", flaky_fsync)
+    with pytest.raises(OSError):
+        log.append({"type": "room_user", "room_id": "geral", "user_name": "perdida"})
+    log.append({"type": "room_user", "room_id": "geral", "user_name": "nova"})
+    log.close()
+
+    assert replay(tmp_path) == RECORDS + [{"type": "room_user", "room_id": "geral", "user_name": "nova"}]
+    assert path == log.list_segments()[-1]
@@ -0,0 +1,70 @@
+"""Chave da cache de respostas do Programador."""
+import os
+from types import SimpleNamespace
+
+os.environ.setdefault("OPENAI_API_KEY", "stub")
+os.environ["RESPONSE_CACHE_PATH"] = ""
+
+from assistants.programador import Programador
+from assistants.utils.response_cache import ResponseCache
+
+HISTORY = [{"role": "user", "content": "ana: como faço um botão arredondado?"}]
+
+
+class StubCompletions:
+    def __init__(self):
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=f"resposta {self.calls}"))])
+
+
+class StubContextBuilder:
+    version = "v1"
+
+    def __init__(self):
+        self.builds = 0
+
+    def build(self, question, timings=None):
+        self.builds += 1
+        return "ft.Card(on_click=...)"
+
+
+def make_programador(context_builder=None) -> Programador:
+    programador = Programador(context_builder=context_builder)
+    programador.CACHE = ResponseCache()
+    programador.CLIENT = SimpleNamespace(chat=SimpleNamespace(completions=StubCompletions()))
+    return programador
+
+
+def test_mention_does_not_change_the_key():
+    programador = Programador()
+
+    assert programador.cache_key("@Programador e no Android?") == programador.cache_key("e no android? @programador")
+
+
+def test_knowledge_version_is_part_of_the_key():
+    builder = StubContextBuilder()
+    programador = Programador(context_builder=builder)
+    key = programador.cache_key("Card")
+    builder.version = "v2"
+
+    assert programador.cache_key("Card") != key
+    assert Programador().cache_key("Card") != key
+
+
+def test_repeated_question_in_a_live_room_is_served_from_cache():
+    builder = StubContextBuilder()
+    programador = make_programador(builder)
+    history = list(HISTORY)
+
+    first = programador.get_response("@programador como faço um Card clicável?", history)
+    history += [{"role": "user", "content": "ana: @programador como faço um Card clicável?"},
+                {"role": "assistant", "content": first}]
+    again = programador.get_response("como faço um card clicável @Programador", history)
+
+    assert again == first
+    assert programador.CLIENT.chat.completions.calls == 1
+    # O acerto vem antes da busca na base de conhecimento
+    assert builder.builds == 1
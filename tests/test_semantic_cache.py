@@ -0,0 +1,35 @@
+"""Cache semântica de respostas, com o embedder local."""
+from assistants.knowledge.local_embeddings import HashingEmbeddings
+from assistants.utils.semantic_cache import SemanticCache
+
+def make_cache(**kwargs) -> SemanticCache:
+    return SemanticCache(embed=HashingEmbeddings().embed_query, threshold=0.8, **kwargs)
+
+
+def test_paraphrase_hits():
+    cache = make_cache()
+    cache.add("como faço um Card clicável", "use on_click")
+
+    assert cache.lookup("Como faço um Card clicável?") == "use on_click"
+    assert cache.lookup("como mostro um AlertDialog") is None
+
+
+def test_answers_are_kept_per_context():
+    cache = make_cache()
+    cache.add("como faço um Card clicável", "sem base")
+    cache.add("como faço um Card clicável", "base v1", context="v1")
+
+    assert cache.lookup("como faço um Card clicável") == "sem base"
+    assert cache.lookup("como faço um Card clicável", context="v1") == "base v1"
+    assert cache.lookup("como faço um Card clicável", context="v2") is None
+
+
+def test_oldest_entries_are_overwritten():
+    cache = make_cache(max_entries=2)
+    cache.add("como faço um Card clicável", "1")
+    cache.add("como mudo a cor de fundo de um Container", "2")
+    cache.add("como mostro uma SnackBar", "3")
+
+    assert cache.lookup("como faço um Card clicável") is None
+    assert cache.lookup("como mostro uma SnackBar") == "3"
+    assert cache.stats()["entries"] == 2
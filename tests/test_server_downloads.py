@@ -0,0 +1,77 @@
+"""Downloads do server.py: Range, If-Range e GET condicional."""
+import importlib
+import os
+import sys
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+CONTENT = bytes(range(256)) * 40
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)     # O server.py cria a pasta de uploads no diretório atual ao ser importado
+    server = importlib.import_module("server")
+    monkeypatch.setattr(server, "UPLOAD_DIR", str(tmp_path))
+    (tmp_path / "arquivo.bin").write_bytes(CONTENT)
+    return TestClient(server.app)
+
+
+def test_full_download_has_validators(client):
+    response = client.get("/download/arquivo.bin")
+
+    assert response.status_code == 200
+    assert response.content == CONTENT
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["etag"].startswith('"')
+    assert "last-modified" in response.headers
+
+
+def test_range_returns_partial_content(client):
+    response = client.get("/download/arquivo.bin", headers={"Range": "bytes=100-199"})
+
+    assert response.status_code == 206
+    assert response.content == CONTENT[100:200]
+    assert response.headers["content-range"] == f"bytes 100-199/{len(CONTENT)}"
+
+
+def test_if_range_with_a_stale_etag_returns_the_whole_file(client):
+    etag = client.get("/download/arquivo.bin").headers["etag"]
+
+    current = client.get("/download/arquivo.bin", headers={"Range": "bytes=0-9", "If-Range": etag})
+    stale = client.get("/download/arquivo.bin", headers={"Range": "bytes=0-9", "If-Range": '"outra-versao"'})
+
+    assert current.status_code == 206 and current.content == CONTENT[:10]
+    assert stale.status_code == 200 and stale.content == CONTENT
+
+
+def test_unsatisfiable_range(client):
+    response = client.get("/download/arquivo.bin", headers={"Range": f"bytes={len(CONTENT) + 10}-"})
+
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(CONTENT)}"
+
+
+def test_conditional_get_returns_not_modified(client):
+    first = client.get("/download/arquivo.bin")
+
+    by_etag = client.get("/download/arquivo.bin", headers={"If-None-Match": f'W/{first.headers["etag"]}'})
+    by_date = client.get("/download/arquivo.bin", headers={"If-Modified-Since": first.headers["last-modified"]})
+    changed = client.get("/download/arquivo.bin", headers={"If-None-Match": '"outra-versao"'})
+
+    assert by_etag.status_code == 304 and by_etag.content == b""
+    assert by_etag.headers["etag"] == first.headers["etag"]
+    assert by_date.status_code == 304
+    assert changed.status_code == 200
+
+
+def test_changed_file_gets_a_new_etag(client, tmp_path):
+    etag = client.get("/download/arquivo.bin").headers["etag"]
+    (tmp_path / "arquivo.bin").write_bytes(CONTENT[::-1] + b"!")
+
+    response = client.get("/download/arquivo.bin", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
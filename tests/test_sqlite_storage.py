@@ -0,0 +1,53 @@
+"""Writer do SQLiteStorage: uma escrita que falha não derruba as outras."""
+import threading
+import pytest
+from sqlalchemy.exc import IntegrityError
+from chat.entities.message import Message
+from chat.entities.room import Room
+from chat.storage.sqlite import SQLiteStorage
+
+
+def make_message(seq: int) -> Message:
+    return Message(user_name="ana", text=f"mensagem {seq}", message_type="chat_message",
+                   room_id="geral", seq=seq, message_id=f"m{seq}")
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = SQLiteStorage(str(tmp_path / "chat.db"))
+    storage.save_room(Room(room_id="geral", room_name="Geral", owner="system"))
+    yield storage
+    storage.close()
+
+
+def test_writer_survives_a_failed_write(storage):
+    storage.save_message(make_message(1))
+
+    with pytest.raises(IntegrityError):
+        storage.save_message(make_message(1))
+    storage.save_message(make_message(2))
+
+    assert [m.seq for m in storage.get_messages("geral", None, 10)] == [1, 2]
+
+
+def test_failed_write_does_not_fail_its_batch(storage):
+    storage.save_message(make_message(1))
+    errors = []
+    start = threading.Barrier(17)
+
+    def save(seq: int):
+        start.wait()
+        try:
+            storage.save_message(make_message(seq))
+        except IntegrityError as e:
+            errors.append((seq, e))
+
+    # O seq 1 já existe: só essa escrita deve falhar, mesmo no lote das outras
+    threads = [threading.Thread(target=save, args=(seq,)) for seq in [1] + list(range(2, 18))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [seq for seq, _ in errors] == [1]
+    assert [m.seq for m in storage.get_messages("geral", None, 50)] == list(range(1, 18))
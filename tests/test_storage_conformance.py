@@ -0,0 +1,234 @@
+"""Testes de conformidade do ChatStorage: os mesmos casos rodam em todos os backends."""
+import pytest
+from chat.entities.file import File
+from chat.entities.message import Message
+from chat.entities.room import Room
+from chat.entities.user import User
+from chat.storage.memory import MemoryStorage
+from chat.storage.sqlite import SQLiteStorage
+
+BACKENDS = {
+    "memory": lambda path: MemoryStorage(log_dir=str(path / "chat_log")),
+    "sqlite": lambda path: SQLiteStorage(str(path / "chat.db")),
+}
+
+
+@pytest.fixture(params=list(BACKENDS))
+def open_storage(request, tmp_path):
+    """Abre o backend sobre tmp_path; chamar de novo reabre os mesmos dados."""
+    opened = []
+
+    def factory():
+        storage = BACKENDS[request.param](tmp_path)
+        opened.append(storage)
+        return storage
+
+    yield factory
+    for storage in opened:
+        storage.close()
+
+
+@pytest.fixture
+def storage(open_storage):
+    storage = open_storage()
+    storage.save_room(Room(room_id="geral", room_name="Geral", owner="system"))
+    return storage
+
+
+def add_messages(storage, count: int, room_id: str = "geral", start: int = 1) -> list[Message]:
+    messages = [Message(user_name=f"user{seq % 3}", text=f"mensagem {seq}", message_type="chat_message",
+                        room_id=room_id, seq=seq, message_id=f"id-{room_id}-{seq}")
+                for seq in range(start, start + count)]
+    for message in messages:
+        storage.save_message(message)
+    return messages
+
+
+def seqs(messages: list[Message]) -> list[int]:
+    return [message.seq for message in messages]
+
+
+# ========================
+# Salas
+# ========================
+def test_list_rooms_in_creation_order(storage):
+    storage.save_room(Room(room_id="b", room_name="B", owner="ana", private=True, current_users=["ana"]))
+    storage.save_room(Room(room_id="a", room_name="A"))
+
+    rooms = storage.list_rooms()
+
+    assert [room.room_id for room in rooms] == ["geral", "b", "a"]
+    assert rooms[1].room_name == "B" and rooms[1].owner == "ana" and rooms[1].private
+    assert rooms[1].current_users == ["ana"]
+
+
+def test_save_room_twice_keeps_the_first(storage):
+    storage.save_room(Room(room_id="geral", room_name="Outro nome"))
+
+    rooms = storage.list_rooms()
+
+    assert len(rooms) == 1
+    assert rooms[0].room_name == "Geral"
+
+
+def test_room_users(storage):
+    storage.add_room_user("geral", "ana")
+    storage.add_room_user("geral", "bruno")
+
+    room = storage.list_rooms()[0]
+
+    assert room.current_users == ["ana", "bruno"]
+
+
+# ========================
+# Mensagens
+# ========================
+def test_messages_keep_seq_order_and_fields(storage):
+    file = File(file_url="/download/a.png", file_name="a.png", file_path="src/uploads/a.png", file_size="10")
+    storage.save_message(Message(user_name="ana", text="olá", message_type="chat_message",
+                                 room_id="geral", seq=1, message_id="m1"))
+    storage.save_message(Message(user_name="bruno", text="arquivo", message_type="file_message",
+                                 room_id="geral", to_user="ana", file=file, seq=2, message_id="m2"))
+
+    messages = storage.get_messages("geral", None, 10)
+
+    assert seqs(messages) == [1, 2]
+    assert messages[1] == Message(user_name="bruno", text="arquivo", message_type="file_message",
+                                  room_id="geral", to_user="ana", file=file, seq=2, message_id="m2")
+    assert storage.last_seq("geral") == 2
+
+
+def test_empty_room(storage):
+    assert storage.get_messages("geral", None, 10) == []
+    assert storage.last_seq("geral") == 0
+
+
+def test_messages_are_kept_per_room(storage):
+    storage.save_room(Room(room_id="outra", room_name="Outra"))
+    add_messages(storage, 3)
+    add_messages(storage, 2, room_id="outra")
+
+    assert seqs(storage.get_messages("geral", None, 10)) == [1, 2, 3]
+    assert seqs(storage.get_messages("outra", None, 10)) == [1, 2]
+    assert storage.last_seq("outra") == 2
+
+
+def test_paging_from_newest(storage):
+    add_messages(storage, 10)
+
+    assert seqs(storage.get_messages("geral", None, 3)) == [8, 9, 10]
+    assert seqs(storage.get_messages("geral", 8, 3)) == [5, 6, 7]
+    assert seqs(storage.get_messages("geral", 3, 3)) == [1, 2]
+    assert storage.get_messages("geral", 1, 3) == []
+
+
+def test_paging_walks_the_whole_history(storage):
+    add_messages(storage, 23)
+
+    pages, before = [], None
+    while True:
+        page = storage.get_messages("geral", before, 5)
+        if not page:
+            break
+        pages.append(seqs(page))
+        before = page[0].seq
+
+    assert [seq for page in reversed(pages) for seq in page] == list(range(1, 24))
+    assert [len(page) for page in pages] == [5, 5, 5, 5, 3]
+
+
+def test_paging_before_a_seq_past_the_end(storage):
+    add_messages(storage, 4)
+
+    assert seqs(storage.get_messages("geral", 100, 10)) == [1, 2, 3, 4]
+
+
+def test_update_message(storage):
+    add_messages(storage, 3)
+
+    storage.update_message("geral", 2, "editada")
+
+    assert [m.text for m in storage.get_messages("geral", None, 10)] == ["mensagem 1", "editada", "mensagem 3"]
+    assert storage.get_message("geral", 2).text == "editada"
+
+
+def test_remove_message(storage):
+    add_messages(storage, 3)
+
+    storage.remove_message("geral", 2)
+
+    assert seqs(storage.get_messages("geral", None, 10)) == [1, 3]
+    assert storage.get_message("geral", 2) is None
+    assert storage.find_seq("geral", "id-geral-2") is None
+
+
+def test_removing_the_last_message_keeps_last_seq(storage):
+    add_messages(storage, 3)
+
+    storage.remove_message("geral", 3)
+
+    assert seqs(storage.get_messages("geral", None, 10)) == [1, 2]
+    assert storage.last_seq("geral") == 3
+
+
+def test_get_message_and_find_seq(storage):
+    storage.save_room(Room(room_id="outra", room_name="Outra"))
+    messages = add_messages(storage, 5)
+
+    assert storage.get_message("geral", 4) == messages[3]
+    assert storage.get_message("geral", 9) is None
+    assert storage.find_seq("geral", "id-geral-4") == 4
+    assert storage.find_seq("geral", "nao-existe") is None
+    assert storage.find_seq("outra", "id-geral-4") is None
+
+
+# ========================
+# Usuários
+# ========================
+def test_users(storage):
+    storage.save_user(User(user_name="ana", user_id="u1", current_room_id="geral", private_rooms=["p1"]))
+    storage.save_user(User(user_name="bruno", user_id="u2", current_room_id="geral"))
+    storage.save_user(User(user_name="ana", user_id="u1", current_room_id="p1", private_rooms=["p1"]))
+
+    assert storage.get_user("u1") == User(user_name="ana", user_id="u1", current_room_id="p1", private_rooms=["p1"])
+    assert storage.get_user("nao-existe") is None
+    assert sorted(user.user_id for user in storage.list_users()) == ["u1", "u2"]
+
+
+# ========================
+# Persistência
+# ========================
+def test_reopen_keeps_rooms_users_and_messages(open_storage, storage):
+    storage.save_room(Room(room_id="p1", room_name="Privada", owner="ana", private=True, current_users=["ana"]))
+    storage.add_room_user("geral", "bruno")
+    storage.save_user(User(user_name="ana", user_id="u1", current_room_id="p1", private_rooms=["p1"]))
+    messages = add_messages(storage, 7)
+    storage.close()
+
+    reopened = open_storage()
+
+    rooms = reopened.list_rooms()
+    assert [room.room_id for room in rooms] == ["geral", "p1"]
+    assert rooms[0].current_users == ["bruno"]
+    assert rooms[1].private and rooms[1].owner == "ana" and rooms[1].current_users == ["ana"]
+    assert reopened.get_user("u1") == User(user_name="ana", user_id="u1", current_room_id="p1", private_rooms=["p1"])
+    assert reopened.get_messages("geral", None, 10) == messages
+    assert reopened.last_seq("geral") == 7
+
+
+
+def test_reopen_keeps_edits_and_removals(open_storage, storage):
+    add_messages(storage, 4)
+    storage.update_message("geral", 1, "editada")
+    storage.remove_message("geral", 2)
+    storage.remove_message("geral", 4)
+    storage.close()
+
+    reopened = open_storage()
+
+    messages = reopened.get_messages("geral", None, 10)
+    assert seqs(messages) == [1, 3]
+    assert messages[0].text == "editada"
+    assert reopened.find_seq("geral", "id-geral-3") == 3
+    assert reopened.find_seq("geral", "id-geral-2") is None
+    assert reopened.last_seq("geral") == 4